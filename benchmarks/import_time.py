@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Repository root, where the classiccrypto package and the scripts live
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules timed by default: the core package, the headless cracker, and the GUI histogram module
+# which headless runs used to load
+DEFAULT_MODULES = [
+    'classiccrypto.cryptoschemes.compiled',
+    'classiccrypto.cryptoschemes.cracking.vigenere',
+    'cracker',
+    'classiccrypto.utils.gui.histogram',
+]
+
+# Packages reported when an import pulls them in
+HEAVY_PACKAGES = ['numpy', 'matplotlib', 'tkinter', 'PIL', 'concurrent.futures']
+
+# Code run in a fresh interpreter to time a single import
+PROBE = '''
+import importlib, json, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+elapsed = time.perf_counter() - start
+heavy = [name for name in sys.argv[2:] if name in sys.modules]
+print(json.dumps({"seconds": elapsed, "heavy": heavy}))
+'''
+
+
+def parse_arguments() -> object:
+    # Create the parser
+    parser = argparse.ArgumentParser(description='Import time benchmark. '
+                                                 'Times the import of modules in fresh interpreters, and '
+                                                 'reports which heavy packages they pull in.')
+
+    parser.add_argument('--repeat',
+                        metavar='repeat',
+                        type=int,
+                        default=5,
+                        help='Number of fresh interpreters per module; the median time is reported (defaults to 5)')
+
+    parser.add_argument('--root',
+                        metavar='root',
+                        type=str,
+                        default=ROOT,
+                        help='Root of the tree whose modules are imported, e.g. a worktree of an older '
+                             'revision to compare against (defaults to this repository)')
+
+    parser.add_argument('--json',
+                        action='store_true',
+                        help='Print the results as JSON')
+
+    parser.add_argument('modules',
+                        metavar='module',
+                        type=str,
+                        nargs='*',
+                        default=DEFAULT_MODULES,
+                        help='Modules to import (defaults to the core package, the cracker and the GUI histograms)')
+
+    return parser.parse_args()
+
+
+def time_import(module: str, root: str, repeat: int) -> dict:
+    """
+    Time the import of a module, each time in a fresh interpreter so nothing is cached in memory.
+
+    :param str module: The name of the module.
+    :param str root: The directory the module is imported from.
+    :param int repeat: The number of interpreters.
+
+    :return: A dictionary with the module, the median import time in seconds and the heavy packages
+             it loaded.
+    :rtype: dict
+    """
+    times = []
+    heavy = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', PROBE, module, *HEAVY_PACKAGES],
+                                cwd=root,
+                                capture_output=True,
+                                text=True,
+                                check=True).stdout
+        result = json.loads(output)
+        times.append(result['seconds'])
+        heavy = result['heavy']
+
+    return {'module': module, 'seconds': statistics.median(times), 'heavy': heavy}
+
+
+def main():
+    args = parse_arguments()
+
+    results = []
+    for module in args.modules:
+        try:
+            results.append(time_import(module, args.root, args.repeat))
+        except subprocess.CalledProcessError as e:
+            print(f"Error importing {module}: {e.stderr.strip().splitlines()[-1]}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    width = max(len(result['module']) for result in results) if results else 0
+    for result in results:
+        print(f"{result['module']:<{width}}  {result['seconds'] * 1000:8.1f} ms  "
+              f"{', '.join(result['heavy']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
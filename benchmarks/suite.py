@@ -0,0 +1,453 @@
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import zlib
+
+import numpy as np
+
+# The benchmarks run against the classiccrypto package of this repository, wherever they are run from
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classiccrypto.cryptoschemes import affine, caesar, vigenere
+from classiccrypto.cryptoschemes.cracking import affine as affine_cracking
+from classiccrypto.cryptoschemes.cracking import caesar as caesar_cracking
+from classiccrypto.cryptoschemes.cracking import vigenere as vigenere_cracking
+from classiccrypto.cryptoschemes.keys.affine import AffineKey
+from classiccrypto.cryptoschemes.keys.caesar import CaesarKey
+from classiccrypto.cryptoschemes.keys.vigenere import VigenereKey
+from classiccrypto.utils import Engine, Language, LetterCase, Mode
+from classiccrypto.utils import alphabets, frequency
+from classiccrypto.utils.cleaning import Cleaner
+
+# Sizes of the plaintexts, in characters, benchmarked by default
+DEFAULT_SIZES = ['1K', '10K', '100K', '1M']
+
+# Multipliers of the size suffixes accepted by --sizes
+SIZE_SUFFIXES = {'K': 1000, 'M': 1000 ** 2, 'G': 1000 ** 3}
+
+# Fraction of the characters of the synthetic plaintexts which are spaces, about one every six
+# characters as in running text
+SPACE_FREQUENCY = 1 / 6
+
+# Shortest and longest Vigenere keys drawn
+VIGENERE_KEY_LENGTHS = (3, 12)
+
+# Largest plaintext the character by character PYTHON engine is benchmarked on, since it would take
+# minutes on the largest ones
+PYTHON_ENGINE_MAX_SIZE = 1000 ** 2
+
+# Relative slowdown, and relative increase of the peak memory, above which a benchmark regressed
+DEFAULT_TIME_THRESHOLD = 0.10
+DEFAULT_MEMORY_THRESHOLD = 0.10
+
+# Timings below this many seconds are too noisy to be compared
+MIN_COMPARED_SECONDS = 0.001
+
+# Translation modules of every cryptoscheme
+SCHEMES = {'caesar': caesar, 'affine': affine, 'vigenere': vigenere}
+
+
+def parse_arguments() -> object:
+    # Create the parser
+    parser = argparse.ArgumentParser(description='Benchmark suite. '
+                                                 'Times the translation, histogram and cracking functions on '
+                                                 'deterministic synthetic texts of several sizes, and compares '
+                                                 'the results with a previous run.')
+
+    parser.add_argument('--sizes',
+                        metavar='size',
+                        type=str,
+                        nargs='+',
+                        default=DEFAULT_SIZES,
+                        help='Sizes of the plaintexts in characters, with an optional K, M or G suffix '
+                             f'(defaults to {" ".join(DEFAULT_SIZES)})')
+
+    parser.add_argument('--langs',
+                        metavar='lang',
+                        type=str,
+                        nargs='+',
+                        choices=['ESP', 'ENG'],
+                        default=['ESP', 'ENG'],
+                        help='Languages of the plaintexts (defaults to both)')
+
+    parser.add_argument('--benchmarks',
+                        metavar='pattern',
+                        type=str,
+                        nargs='+',
+                        default=['*'],
+                        help='Shell-style patterns of the benchmarks to run, e.g. "*.crack*" (defaults to all of them)')
+
+    parser.add_argument('--repeat',
+                        metavar='repeat',
+                        type=int,
+                        default=3,
+                        help='Timed runs of every benchmark per key (defaults to 3)')
+
+    parser.add_argument('--trials',
+                        metavar='trials',
+                        type=int,
+                        default=3,
+                        help='Random keys per benchmark and size; crackers report the fraction of them they '
+                             'found (defaults to 3)')
+
+    parser.add_argument('--seed',
+                        metavar='seed',
+                        type=int,
+                        default=0,
+                        help='Seed of the plaintexts and keys, so runs with the same seed benchmark the same '
+                             'inputs (defaults to 0)')
+
+    parser.add_argument('--output',
+                        metavar='output',
+                        type=str,
+                        help='Path of the JSON file where the results are saved')
+
+    parser.add_argument('--load',
+                        metavar='results',
+                        type=str,
+                        help='Load the results from a JSON file instead of running the benchmarks, e.g. to '
+                             'compare two saved runs')
+
+    parser.add_argument('--baseline',
+                        metavar='baseline',
+                        type=str,
+                        help='JSON results of a previous run to compare with. The exit status is 1 if any '
+                             'benchmark regressed')
+
+    parser.add_argument('--time-threshold',
+                        metavar='threshold',
+                        type=float,
+                        default=DEFAULT_TIME_THRESHOLD,
+                        help='Relative slowdown above which a benchmark regressed '
+                             f'(defaults to {DEFAULT_TIME_THRESHOLD})')
+
+    parser.add_argument('--memory-threshold',
+                        metavar='threshold',
+                        type=float,
+                        default=DEFAULT_MEMORY_THRESHOLD,
+                        help='Relative increase of the peak memory above which a benchmark regressed '
+                             f'(defaults to {DEFAULT_MEMORY_THRESHOLD})')
+
+    parser.add_argument('--list',
+                        action='store_true',
+                        help='List the benchmarks and exit')
+
+    return parser.parse_args()
+
+
+def parse_size(size: str) -> int:
+    """
+    Parse a size such as "100K" or "1M".
+
+    :param str size: The size, with an optional K, M or G suffix.
+
+    :return: The size in characters.
+    :rtype: int
+
+    :raises ValueError: If the size is not a positive number.
+    """
+    multiplier = SIZE_SUFFIXES.get(size[-1:].upper(), 1)
+    value = int(float(size[:-1] if size[-1:].upper() in SIZE_SUFFIXES else size) * multiplier)
+    if value < 1:
+        raise ValueError(f"Sizes must be positive, not {size}")
+    return value
+
+
+def format_size(size: int) -> str:
+    for suffix, multiplier in sorted(SIZE_SUFFIXES.items(), key=lambda item: -item[1]):
+        if size >= multiplier and size % multiplier == 0:
+            return f'{size // multiplier}{suffix}'
+    return str(size)
+
+
+def generate_plaintext(lang: Language, size: int, seed: int) -> str:
+    """
+    Generate a deterministic synthetic plaintext.
+
+    Letters are drawn independently with the frequencies of the language, and mixed with spaces, so
+    the statistics the crackers rely on are those of real text.
+
+    :param Language lang: The language of the plaintext.
+    :param int size: The number of characters.
+    :param int seed: The seed of the generator.
+
+    :return: The plaintext, in lowercase.
+    :rtype: str
+    """
+    rng = np.random.default_rng([seed, lang.value, size])
+    letters = np.array([ord(c) for c in alphabets.alphabet(lang, LetterCase.LOWER)], dtype=np.uint8)
+    profile = frequency.language_histogram(lang).values
+
+    codes = letters[rng.choice(len(letters), size=size, p=profile / profile.sum())]
+    codes[rng.random(size) < SPACE_FREQUENCY] = ord(' ')
+    return codes.tobytes().decode('latin-1')
+
+
+def random_key(scheme: str, lang: Language, rng: np.random.Generator):
+    """
+    Draw a random key, which is never the identity.
+
+    :param str scheme: "caesar", "affine" or "vigenere".
+    :param Language lang: The language of the key.
+    :param np.random.Generator rng: The random generator.
+
+    :return: The key.
+    :rtype: Cipherkey
+    """
+    n = alphabets.get_alphabet(lang).size
+    if scheme == 'caesar':
+        return CaesarKey(int(rng.integers(1, n)), lang)
+    if scheme == 'affine':
+        a_values, b_values = affine_cracking.valid_keys(n)
+        candidates = np.flatnonzero(a_values != 1)
+        choice = int(rng.choice(candidates))
+        return AffineKey(int(a_values[choice]), int(b_values[choice]), lang)
+
+    upper = alphabets.alphabet(lang, LetterCase.UPPER)
+    length = int(rng.integers(VIGENERE_KEY_LENGTHS[0], VIGENERE_KEY_LENGTHS[1] + 1))
+    return VigenereKey(''.join(upper[i] for i in rng.integers(0, n, size=length)), lang)
+
+
+def encrypt(scheme: str, plaintext: str, key) -> str:
+    if scheme == 'vigenere':
+        return vigenere.translate(plaintext, key, Mode.ENCRYPTION, Engine.NUMPY)
+    return SCHEMES[scheme].translate(plaintext, key, Mode.ENCRYPTION)
+
+
+def translate_case(scheme: str, engine: Engine = None):
+    """
+    Build the setup of a benchmark encrypting the plaintext.
+    """
+    def setup(plaintext: str, key) -> tuple:
+        if engine is None:
+            return lambda: SCHEMES[scheme].translate(plaintext, key, Mode.ENCRYPTION), None
+        return lambda: SCHEMES[scheme].translate(plaintext, key, Mode.ENCRYPTION, engine), None
+    return setup
+
+
+def crack_case(scheme: str, fast: bool):
+    """
+    Build the setup of a benchmark cracking the cleaned ciphertext, and checking the key found.
+    """
+    def setup(plaintext: str, key) -> tuple:
+        ciphertext = Cleaner(key.lang).clean(encrypt(scheme, plaintext, key))
+        if scheme == 'vigenere':
+            function = lambda: vigenere_cracking.crack(ciphertext, key.lang, no_gui=True, fast=fast, auto=True)
+        elif scheme == 'caesar':
+            function = lambda: caesar_cracking.crack(ciphertext, key.lang, fast)
+        else:
+            function = lambda: affine_cracking.crack(ciphertext, key.lang, fast)
+        return function, lambda found: found.to_string() == key.to_string()
+    return setup
+
+
+def histogram_case(plaintext: str, key) -> tuple:
+    ciphertext = encrypt('caesar', plaintext, key)
+    return lambda: frequency.normalized_histogram(ciphertext, key.lang), None
+
+
+def best_match_case(plaintext: str, key) -> tuple:
+    language = frequency.language_histogram(key.lang)
+    histogram = frequency.normalized_histogram(encrypt('caesar', plaintext, key), key.lang)
+    return lambda: frequency.find_step_for_best_match(language, histogram), None
+
+
+def clean_case(plaintext: str, key) -> tuple:
+    ciphertext = encrypt('caesar', plaintext, key)
+    return lambda: Cleaner(key.lang).clean(ciphertext), None
+
+
+# Every benchmark: the scheme its keys are drawn for, the function building its timed callable and
+# success check from a plaintext and a key, and the largest size it runs on (None for no limit)
+BENCHMARKS = {
+    'caesar.translate': ('caesar', translate_case('caesar'), None),
+    'affine.translate': ('affine', translate_case('affine'), None),
+    'vigenere.translate[numpy]': ('vigenere', translate_case('vigenere', Engine.NUMPY), None),
+    'vigenere.translate[python]': ('vigenere', translate_case('vigenere', Engine.PYTHON), PYTHON_ENGINE_MAX_SIZE),
+    'cleaning.clean': ('caesar', clean_case, None),
+    'frequency.normalized_histogram': ('caesar', histogram_case, None),
+    'frequency.find_step_for_best_match': ('caesar', best_match_case, None),
+    'caesar.crack[fast]': ('caesar', crack_case('caesar', True), None),
+    'caesar.crack[full]': ('caesar', crack_case('caesar', False), None),
+    'affine.crack[fast]': ('affine', crack_case('affine', True), None),
+    'affine.crack[full]': ('affine', crack_case('affine', False), None),
+    'vigenere.crack[fast]': ('vigenere', crack_case('vigenere', True), None),
+    'vigenere.crack[full]': ('vigenere', crack_case('vigenere', False), None),
+}
+
+
+def run_benchmark(name: str, lang: Language, size: int, plaintext: str, repeat: int, trials: int, seed: int) -> dict:
+    """
+    Run a benchmark on a plaintext, with several random keys.
+
+    Every key is timed `repeat` times, then run once more under `tracemalloc` to measure the peak
+    memory, so tracing does not slow down the timed runs.
+
+    :param str name: The name of the benchmark.
+    :param Language lang: The language of the plaintext.
+    :param int size: The size of the plaintext.
+    :param str plaintext: The plaintext.
+    :param int repeat: The number of timed runs per key.
+    :param int trials: The number of keys.
+    :param int seed: The seed of the keys.
+
+    :return: The result of the benchmark: the median and minimum times in seconds, the peak memory in
+             bytes, and the fraction of keys found (None for benchmarks which do not look for keys).
+    :rtype: dict
+    """
+    scheme, setup, _ = BENCHMARKS[name]
+    rng = np.random.default_rng([seed, zlib.crc32(name.encode()), lang.value, size])
+
+    times = []
+    peaks = []
+    successes = []
+    for _ in range(trials):
+        function, check = setup(plaintext, random_key(scheme, lang, rng))
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = function()
+            times.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        function()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        if check is not None:
+            successes.append(check(result))
+
+    return {
+        'benchmark': name,
+        'lang': Language.to_string(lang),
+        'size': size,
+        'seconds': statistics.median(times),
+        'min_seconds': min(times),
+        'peak_bytes': max(peaks),
+        'success_rate': sum(successes) / len(successes) if successes else None,
+    }
+
+
+def run_suite(names: list, langs: list, sizes: list, repeat: int, trials: int, seed: int) -> list:
+    results = []
+    for lang in langs:
+        for size in sizes:
+            plaintext = generate_plaintext(lang, size, seed)
+            for name in names:
+                max_size = BENCHMARKS[name][2]
+                if max_size is not None and size > max_size:
+                    continue
+                result = run_benchmark(name, lang, size, plaintext, repeat, trials, seed)
+                print(format_result(result), flush=True)
+                results.append(result)
+    return results
+
+
+def format_result(result: dict) -> str:
+    success = f"{result['success_rate']:6.0%}" if result['success_rate'] is not None else '     -'
+    return (f"{result['benchmark']:<36} {result['lang']} {format_size(result['size']):>5}  "
+            f"{result['seconds'] * 1000:10.2f} ms  {result['peak_bytes'] / 1024 ** 2:9.2f} MiB  {success}")
+
+
+def compare(baseline: list, results: list, time_threshold: float, memory_threshold: float) -> list:
+    """
+    Compare the results of a run with a baseline.
+
+    A benchmark regressed if it got slower than `time_threshold` (ignoring timings below
+    MIN_COMPARED_SECONDS, which are too noisy), if its peak memory grew more than
+    `memory_threshold`, or if it found fewer keys.
+
+    :param list baseline: The results of the previous run.
+    :param list results: The results of the current run.
+    :param float time_threshold: The relative slowdown allowed.
+    :param float memory_threshold: The relative increase of the peak memory allowed.
+
+    :return: The description of every regression.
+    :rtype: list
+    """
+    previous = {(r['benchmark'], r['lang'], r['size']): r for r in baseline}
+
+    regressions = []
+    for result in results:
+        old = previous.get((result['benchmark'], result['lang'], result['size']))
+        if old is None:
+            continue
+
+        label = f"{result['benchmark']} {result['lang']} {format_size(result['size'])}"
+        if (max(old['seconds'], result['seconds']) >= MIN_COMPARED_SECONDS
+                and result['seconds'] > old['seconds'] * (1 + time_threshold)):
+            regressions.append(f"{label}: {old['seconds'] * 1000:.2f} ms -> {result['seconds'] * 1000:.2f} ms")
+        if result['peak_bytes'] > old['peak_bytes'] * (1 + memory_threshold):
+            regressions.append(f"{label}: {old['peak_bytes'] / 1024 ** 2:.2f} MiB -> "
+                               f"{result['peak_bytes'] / 1024 ** 2:.2f} MiB")
+        if old['success_rate'] is not None and result['success_rate'] < old['success_rate']:
+            regressions.append(f"{label}: success rate {old['success_rate']:.0%} -> {result['success_rate']:.0%}")
+
+    return regressions
+
+
+def main():
+    args = parse_arguments()
+
+    names = [name for name in BENCHMARKS if any(fnmatch.fnmatch(name, pattern) for pattern in args.benchmarks)]
+    if args.list:
+        print('\n'.join(names))
+        return
+
+    if args.load:
+        with open(args.load, 'r') as src:
+            report = json.load(src)
+    else:
+        try:
+            sizes = [parse_size(size) for size in args.sizes]
+        except ValueError as e:
+            print(f"Invalid size: {e}")
+            sys.exit(2)
+
+        if args.repeat < 1 or args.trials < 1:
+            print("The number of runs and trials must be positive")
+            sys.exit(2)
+
+        report = {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'trials': args.trials,
+            'results': run_suite(names,
+                                 [Language.from_string(lang) for lang in args.langs],
+                                 sizes,
+                                 args.repeat,
+                                 args.trials,
+                                 args.seed),
+        }
+
+    if args.output:
+        with open(args.output, 'w') as dst:
+            json.dump(report, dst, indent=2)
+
+    if args.load:
+        for result in report['results']:
+            print(format_result(result))
+
+    if args.baseline:
+        with open(args.baseline, 'r') as src:
+            baseline = json.load(src)
+
+        regressions = compare(baseline['results'], report['results'], args.time_threshold, args.memory_threshold)
+        if regressions:
+            print(f"{len(regressions)} regressions against {args.baseline}:")
+            print('\n'.join(regressions))
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+import argparse
+
+from classiccrypto.utils import Language
+from classiccrypto.utils.ngrams import NgramModel, DEFAULT_N, MAX_N, MIN_N
+
+
+def parse_arguments() -> object:
+    # Create the parser
+    parser = argparse.ArgumentParser(description='N-gram model builder. '
+                                                 'Builds the language model used by cracker.py --ngram-model '
+                                                 'from a corpus of plain text files.')
+
+    # Add the arguments
+    parser.add_argument('--lang',
+                        metavar='lang',
+                        type=str,
+                        choices=['ESP', 'ENG'],
+                        required=True,
+                        help='Language of the corpus: ESP or ENG')
+
+    parser.add_argument('--n',
+                        metavar='n',
+                        type=int,
+                        default=DEFAULT_N,
+                        help=f'Length of the n-grams, between {MIN_N} and {MAX_N} (defaults to {DEFAULT_N})')
+
+    parser.add_argument('--encoding',
+                        metavar='encoding',
+                        type=str,
+                        default='utf-8',
+                        help='Encoding of the corpus files (defaults to utf-8)')
+
+    parser.add_argument('--fold-accents',
+                        action='store_true',
+                        help='Count accented letters (á, é, ü...) as their base letter instead of dropping them')
+
+    parser.add_argument('--output',
+                        metavar='output',
+                        type=str,
+                        required=True,
+                        help='Path of the .npy file where the model is saved')
+
+    parser.add_argument('corpus',
+                        metavar='corpus',
+                        type=str,
+                        nargs='+',
+                        help='Plain text files in the language of the model')
+
+    args = parser.parse_args()
+    if not MIN_N <= args.n <= MAX_N:
+        parser.error(f'--n must be between {MIN_N} and {MAX_N}')
+
+    return args
+
+
+def main():
+    args = parse_arguments()
+
+    try:
+        model = NgramModel.from_files(args.corpus,
+                                      Language.from_string(args.lang),
+                                      args.n,
+                                      args.encoding,
+                                      args.fold_accents)
+    except IOError as e:
+        print(f"Error reading the corpus: {e}")
+        return
+
+    model.save(args.output)
+    print(f"Saved a model of {len(model.log_probabilities)} {model.n}-grams to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
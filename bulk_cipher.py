@@ -0,0 +1,240 @@
+import argparse
+import codecs
+import glob
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from classiccrypto.cryptoschemes import streaming
+from classiccrypto.cryptoschemes.keys.cipherkey import Cipherkey
+from classiccrypto.cryptoschemes.schemes import key_from_string
+from classiccrypto.utils import Cryptoscheme, Language, Mode
+
+# Characters which make a path component a glob pattern
+GLOB_WILDCARDS = '*?['
+
+
+def parse_arguments() -> object:
+    # Create the parser
+    parser = argparse.ArgumentParser(description='Classic Encryption bulk tool. '
+                                                 'Encrypts or decrypts many files in parallel, without any GUI.')
+
+    # Add the arguments
+    parser.add_argument('--cryptoscheme',
+                        metavar='cryptoscheme',
+                        type=str,
+                        choices=['vigenere', 'caesar', 'affine'],
+                        help='The cryptoscheme to use: vigenere, caesar, or affine',
+                        required=True)
+
+    parser.add_argument('--key',
+                        metavar='key',
+                        type=str,
+                        required=True,
+                        help='The key: a shift for caesar (e.g. 3), a pair a,b for affine (e.g. 5,8) '
+                             'or a word for vigenere')
+
+    parser.add_argument('--lang',
+                        metavar='lang',
+                        type=str,
+                        choices=['ESP', 'ENG'],
+                        required=True,
+                        help='Language of the messages: ESP or ENG')
+
+    parser.add_argument('--decrypt',
+                        action='store_true',
+                        help='Decrypt the files instead of encrypting them')
+
+    parser.add_argument('--output-dir',
+                        metavar='output_dir',
+                        type=str,
+                        required=True,
+                        help='Directory where the translated files are written')
+
+    parser.add_argument('--workers',
+                        metavar='workers',
+                        type=int,
+                        default=os.cpu_count(),
+                        help='Number of worker processes (defaults to the number of CPUs)')
+
+    parser.add_argument('--encoding',
+                        metavar='encoding',
+                        type=str,
+                        default='utf-8',
+                        help='Encoding of the files (defaults to utf-8)')
+
+    parser.add_argument('--chunk-size',
+                        metavar='chunk_size',
+                        type=int,
+                        default=streaming.DEFAULT_CHUNK_SIZE,
+                        help='Maximum number of characters held in memory per file')
+
+    parser.add_argument('inputs',
+                        metavar='input',
+                        type=str,
+                        nargs='+',
+                        help='Files, directories (processed recursively) or glob patterns to translate')
+
+    args = parser.parse_args()
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error('--workers and --chunk-size must be positive')
+    try:
+        codecs.lookup(args.encoding)
+    except LookupError:
+        parser.error(f'unknown encoding: {args.encoding}')
+
+    return args
+
+
+def collect_files(inputs: list) -> list:
+    """
+    Expand the input arguments into the list of files to translate.
+
+    Output paths are relative to the root of their input: a file is written under its own name, the
+    files of a directory keep their path inside it, and the files matched by a glob pattern keep
+    their path below the directories of the pattern without wildcards (e.g. "a/b.txt" for
+    "data/**/*.txt" matching "data/a/b.txt").
+
+    :param list inputs: Paths to files or directories, or glob patterns.
+
+    :return: A list of (source path, path relative to the output directory) pairs.
+    :rtype: list
+
+    :raises ValueError: If different files would be written to the same output path.
+    """
+    files = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            for root, _, filenames in os.walk(entry):
+                for filename in sorted(filenames):
+                    path = os.path.join(root, filename)
+                    files.append((path, os.path.relpath(path, entry)))
+        elif os.path.isfile(entry):
+            files.append((entry, os.path.basename(entry)))
+        else:
+            root = glob_root(entry)
+            for path in sorted(glob.glob(entry, recursive=True)):
+                if os.path.isfile(path):
+                    files.append((path, os.path.relpath(path, root)))
+
+    # The same file given twice (e.g. by a directory and a pattern) is translated once, but two
+    # different files would silently overwrite each other's output
+    sources = dict()
+    unique_files = []
+    for path, relative_path in files:
+        output = os.path.normpath(relative_path)
+        if output not in sources:
+            sources[output] = path
+            unique_files.append((path, relative_path))
+        elif os.path.realpath(sources[output]) != os.path.realpath(path):
+            raise ValueError(f"{sources[output]} and {path} would both be written to {output}")
+
+    return unique_files
+
+
+def check_outputs(files: list, output_dir: str):
+    """
+    Check that no output path is one of the files to translate, which opening it for writing would
+    erase before it is read.
+
+    :param list files: The (source path, path relative to the output directory) pairs to translate.
+    :param str output_dir: The directory where the translated files are written.
+
+    :raises ValueError: If an output path resolves to one of the source files.
+    """
+    sources = {os.path.realpath(path): path for path, _ in files}
+    for path, relative_path in files:
+        output = os.path.realpath(os.path.join(output_dir, relative_path))
+        if output in sources:
+            raise ValueError(f"The output of {path} would overwrite {sources[output]}")
+
+
+def glob_root(pattern: str) -> str:
+    """
+    Get the directory of a glob pattern above its first component with wildcards.
+
+    :param str pattern: The glob pattern.
+
+    :return: The leading directories of the pattern without wildcards, or "." if there are none.
+    :rtype: str
+    """
+    parts = pattern.split(os.sep)
+    for i, part in enumerate(parts[:-1]):
+        if any(wildcard in part for wildcard in GLOB_WILDCARDS):
+            return os.sep.join(parts[:i]) or (os.sep if i else '.')
+    return os.path.dirname(pattern) or '.'
+
+
+def translate_file(src_path: str, dst_path: str, key: Cipherkey, mode: Mode, chunk_size: int, encoding: str) -> tuple:
+    os.makedirs(os.path.dirname(dst_path) or '.', exist_ok=True)
+
+    start = time.perf_counter()
+    streaming.translate_file(src_path, dst_path, key, mode, chunk_size, encoding)
+    elapsed = time.perf_counter() - start
+
+    return os.getpid(), os.path.getsize(src_path), elapsed
+
+
+def main():
+    args = parse_arguments()
+    language = Language.from_string(args.lang)
+    cryptoscheme = Cryptoscheme.from_string(args.cryptoscheme)
+    mode = Mode.DECRYPTION if args.decrypt else Mode.ENCRYPTION
+
+    try:
+        key = key_from_string(cryptoscheme, args.key, language)
+    except ValueError as e:
+        print(f"Invalid key: {e}")
+        return
+
+    try:
+        files = collect_files(args.inputs)
+        check_outputs(files, args.output_dir)
+    except ValueError as e:
+        print(f"Invalid inputs: {e}")
+        return
+
+    if not files:
+        print("No files to process")
+        return
+
+    worker_bytes = defaultdict(int)
+    worker_time = defaultdict(float)
+    failures = 0
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(translate_file,
+                                   src_path,
+                                   os.path.join(args.output_dir, relative_path),
+                                   key,
+                                   mode,
+                                   args.chunk_size,
+                                   args.encoding): src_path
+                   for src_path, relative_path in files}
+
+        for future in as_completed(futures):
+            try:
+                pid, size, elapsed = future.result()
+            except (IOError, ValueError) as e:
+                failures += 1
+                print(f"Error processing {futures[future]}: {e}")
+                continue
+
+            worker_bytes[pid] += size
+            worker_time[pid] += elapsed
+
+    wall_time = time.perf_counter() - start
+    total_mb = sum(worker_bytes.values()) / 1e6
+
+    print(f"Processed {len(files) - failures} of {len(files)} files ({total_mb:.2f} MB) "
+          f"in {wall_time:.2f} s: {total_mb / wall_time:.2f} MB/s")
+    for pid in sorted(worker_bytes):
+        mb = worker_bytes[pid] / 1e6
+        throughput = mb / worker_time[pid] if worker_time[pid] else float('inf')
+        print(f"  worker {pid}: {mb:.2f} MB in {worker_time[pid]:.2f} s, {throughput:.2f} MB/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,64 +1,113 @@
+import functools
+
 from classiccrypto.cryptoschemes.keys.affine import AffineKey
 from classiccrypto.utils import Mode
 from classiccrypto.utils import alphabets
-from classiccrypto.utils import LetterCase
+from classiccrypto.utils import buffers
+from classiccrypto.utils import LetterCase, Language
+
+# Number of keys whose translation tables are kept, more than the valid keys of every alphabet
+TABLE_CACHE_SIZE = 1024
 
 
-def encrypt(message: str, key: AffineKey) -> str:
+def encrypt(message: str | bytes, key: AffineKey) -> str | bytearray:
     """
     Encrypt a message using the Affine cipher with the provided key.
 
-    :param str message: The message to be encrypted.
+    :param str | bytes message: The message to be encrypted.
     :param AffineKey key: The key to be used for encryption.
 
     :return: The encrypted message.
-    :rtype: str
+    :rtype: str | bytearray
     """
     return translate(message, key, Mode.ENCRYPTION)
 
 
-def decrypt(message: str, key: AffineKey) -> str:
+def decrypt(message: str | bytes, key: AffineKey) -> str | bytearray:
     """
     Decrypt a message using the Affine cipher with the provided key.
 
-    :param str message: The message to be decrypted.
+    :param str | bytes message: The message to be decrypted.
     :param AffineKey key: The key to be used for decryption.
 
     :return: The decrypted message.
-    :rtype: str
+    :rtype: str | bytearray
     """
     return translate(message, key, Mode.DECRYPTION)
 
 
-def translate(message: str, key: AffineKey, mode: Mode) -> str:
+def translate(message: str | bytes, key: AffineKey, mode: Mode) -> str | bytearray:
     """
     Translate (encrypt/decrypt) a message using the Affine cipher based on the provided key and mode.
 
-    :param str message: The message to be translated.
+    :param str | bytes message: The message to be translated. Byte buffers (bytes, bytearray, memoryview or
+                                 mmap) are interpreted as Latin-1 text, see `translate_buffer`.
     :param AffineKey key: The key to be used for translation.
     :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
 
-    :return: The translated message.
-    :rtype: str
+    :return: The translated message, as a string or as a bytearray if `message` is a byte buffer.
+    :rtype: str | bytearray
+    """
+    if buffers.is_buffer(message):
+        return translate_buffer(message, key, mode)
+
+    encryption_table, decryption_table = _translation_tables(key.a, key.b, key.lang)
+    return message.translate(encryption_table if mode == Mode.ENCRYPTION else decryption_table)
+
+
+def translate_buffer(buffer, key: AffineKey, mode: Mode, out=None) -> bytearray:
+    """
+    Translate (encrypt/decrypt) a Latin-1 encoded byte buffer using the Affine cipher.
+
+    The buffer is never decoded: its bytes are mapped through a 256-entry table, which makes this
+    the fastest way to process large ASCII or Latin-1 files (e.g. through an mmap object).
+
+    :param buffer: The message to be translated, as a bytes, bytearray, memoryview or mmap object.
+    :param AffineKey key: The key to be used for translation.
+    :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
+    :param out: Optional writable buffer, of the same length as `buffer`, where the result is written.
+
+    :return: The buffer holding the translated message.
+    :rtype: bytearray
+    """
+    encryption_table, decryption_table = _byte_translation_tables(key.a, key.b, key.lang)
+    return buffers.translate_buffer(buffer,
+                                    encryption_table if mode == Mode.ENCRYPTION else decryption_table,
+                                    out)
+
+
+@functools.lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _translation_tables(a: int, b: int, lang: Language) -> tuple:
+    """
+    Retrieve the encryption and decryption tables for an Affine key, to be used with `str.translate`.
+
+    Tables are built once and cached per (a, b, language), so ciphers which are used repeatedly with
+    the same key (e.g. when cracking) do not rebuild them.
+
+    :param int a: The 'a' parameter in the affine cipher key.
+    :param int b: The 'b' parameter in the affine cipher key.
+    :param Language lang: The language whose alphabet is transformed.
+
+    :return: A tuple with the encryption table and the decryption table.
+    :rtype: tuple
+    """
+    original_alphabet = alphabets.alphabet(lang, LetterCase.UPPER)
+    transformed_alphabet = alphabets.alphabet_affine(AffineKey(a, b, lang), LetterCase.UPPER)
+    return (alphabets.translation_table(original_alphabet, transformed_alphabet),
+            alphabets.translation_table(transformed_alphabet, original_alphabet))
+
+
+@functools.lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _byte_translation_tables(a: int, b: int, lang: Language) -> tuple:
+    """
+    Retrieve the encryption and decryption tables for an Affine key, to be used with Latin-1 byte buffers.
+
+    :param int a: The 'a' parameter in the affine cipher key.
+    :param int b: The 'b' parameter in the affine cipher key.
+    :param Language lang: The language whose alphabet is used.
+
+    :return: A tuple with the encryption table and the decryption table.
+    :rtype: tuple
     """
-    original_alphabet = alphabets.alphabet(key.lang,
-                                           LetterCase.UPPER)
-
-    transformed_alphabet = alphabets.alphabet_affine(key, LetterCase.UPPER)
-
-    if mode == Mode.ENCRYPTION:
-        src = original_alphabet
-        dst = transformed_alphabet
-    else:
-        src = transformed_alphabet
-        dst = original_alphabet
-
-    result = []
-    for c in message:
-        if c.upper() not in src:
-            translated = c
-        else:
-            translated = dst[src.index(c.upper())]
-        result.append(translated.upper() if c.isupper() else translated.lower())
-
-    return ''.join(result)
+    encryption_table, decryption_table = _translation_tables(a, b, lang)
+    return buffers.byte_table(encryption_table), buffers.byte_table(decryption_table)
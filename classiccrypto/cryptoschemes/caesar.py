@@ -1,52 +1,114 @@
+import functools
+
 from classiccrypto.cryptoschemes.keys.caesar import CaesarKey
 from classiccrypto.utils import Mode
 from classiccrypto.utils import alphabets
+from classiccrypto.utils import buffers
+from classiccrypto.utils import LetterCase, Language
+
+# Number of keys whose translation tables are kept, more than the shifts of every alphabet
+TABLE_CACHE_SIZE = 256
 
 
-def encrypt(message: str, key: CaesarKey) -> str:
+def encrypt(message: str | bytes, key: CaesarKey) -> str | bytearray:
     """
     Encrypt a message using the Caesar cipher with the provided key.
 
-    :param str message: The plaintext message to be encrypted.
+    :param str | bytes message: The plaintext message to be encrypted.
     :param CaesarKey key: The key (containing the shift value and language) to be used for encryption.
 
     :return: The encrypted message.
-    :rtype: str
+    :rtype: str | bytearray
     """
     return translate(message, key, Mode.ENCRYPTION)
 
 
-def decrypt(message: str, key: CaesarKey) -> str:
+def decrypt(message: str | bytes, key: CaesarKey) -> str | bytearray:
     """
     Decrypt a message using the Caesar cipher with the provided key.
 
-    :param str message: The ciphertext message to be decrypted.
+    :param str | bytes message: The ciphertext message to be decrypted.
     :param CaesarKey key: The key (containing the shift value and language) to be used for decryption.
 
     :return: The decrypted message.
-    :rtype: str
+    :rtype: str | bytearray
     """
     return translate(message, key, Mode.DECRYPTION)
 
 
-def translate(message: str, key: CaesarKey, mode: Mode) -> str:
+def translate(message: str | bytes, key: CaesarKey, mode: Mode) -> str | bytearray:
     """
     Translate (encrypt/decrypt) a message using the Caesar cipher based on the provided key and mode.
 
     This function performs the encryption or decryption (based on `mode`) by shifting each letter
     in `message` by the shift value defined in `key`.
 
-    :param str message: The message to be translated.
+    :param str | bytes message: The message to be translated. Byte buffers (bytes, bytearray, memoryview or
+                                 mmap) are interpreted as Latin-1 text, see `translate_buffer`.
     :param CaesarKey key: The key (containing the shift value and language) to be used for translation.
     :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
 
-    :return: The translated message.
-    :rtype: str
+    :return: The translated message, as a string or as a bytearray if `message` is a byte buffer.
+    :rtype: str | bytearray
+    """
+    if buffers.is_buffer(message):
+        return translate_buffer(message, key, mode)
+
+    encryption_table, decryption_table = _translation_tables(key.key, key.lang)
+    return message.translate(encryption_table if mode == Mode.ENCRYPTION else decryption_table)
+
+
+def translate_buffer(buffer, key: CaesarKey, mode: Mode, out=None) -> bytearray:
+    """
+    Translate (encrypt/decrypt) a Latin-1 encoded byte buffer using the Caesar cipher.
+
+    The buffer is never decoded: its bytes are mapped through a 256-entry table, which makes this
+    the fastest way to process large ASCII or Latin-1 files (e.g. through an mmap object).
+
+    :param buffer: The message to be translated, as a bytes, bytearray, memoryview or mmap object.
+    :param CaesarKey key: The key to be used for translation.
+    :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
+    :param out: Optional writable buffer, of the same length as `buffer`, where the result is written.
+
+    :return: The buffer holding the translated message.
+    :rtype: bytearray
     """
-    result = []
-    for c in message:
-        result += alphabets.shifted_letter(c,
-                                           key.lang,
-                                           key.key if mode == Mode.ENCRYPTION else -key.key)
+    encryption_table, decryption_table = _byte_translation_tables(key.key, key.lang)
+    return buffers.translate_buffer(buffer,
+                                    encryption_table if mode == Mode.ENCRYPTION else decryption_table,
+                                    out)
+
 
-    return ''.join(result)
+@functools.lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _translation_tables(step: int, lang: Language) -> tuple:
+    """
+    Retrieve the encryption and decryption tables for a Caesar shift, to be used with `str.translate`.
+
+    Tables are built once and cached per (step, language), so ciphers which are used repeatedly with
+    the same key (e.g. when cracking) do not rebuild them.
+
+    :param int step: The Caesar cipher shift value.
+    :param Language lang: The language whose alphabet is shifted.
+
+    :return: A tuple with the encryption table and the decryption table.
+    :rtype: tuple
+    """
+    clear_alphabet = alphabets.alphabet(lang, LetterCase.UPPER)
+    shifted_alphabet = alphabets.shifted_alphabet(lang, step, LetterCase.UPPER)
+    return (alphabets.translation_table(clear_alphabet, shifted_alphabet),
+            alphabets.translation_table(shifted_alphabet, clear_alphabet))
+
+
+@functools.lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _byte_translation_tables(step: int, lang: Language) -> tuple:
+    """
+    Retrieve the encryption and decryption tables for a Caesar shift, to be used with Latin-1 byte buffers.
+
+    :param int step: The Caesar cipher shift value.
+    :param Language lang: The language whose alphabet is used.
+
+    :return: A tuple with the encryption table and the decryption table.
+    :rtype: tuple
+    """
+    encryption_table, decryption_table = _translation_tables(step, lang)
+    return buffers.byte_table(encryption_table), buffers.byte_table(decryption_table)
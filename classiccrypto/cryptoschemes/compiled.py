@@ -0,0 +1,329 @@
+from abc import ABC, abstractmethod
+from typing import Iterable
+
+import numpy as np
+
+from classiccrypto.cryptoschemes import affine, caesar, vigenere
+from classiccrypto.cryptoschemes.keys.affine import AffineKey
+from classiccrypto.cryptoschemes.keys.caesar import CaesarKey
+from classiccrypto.cryptoschemes.keys.cipherkey import Cipherkey
+from classiccrypto.cryptoschemes.keys.vigenere import VigenereKey
+from classiccrypto.utils import Mode, Language, LetterCase
+from classiccrypto.utils import alphabets
+from classiccrypto.utils import buffers
+
+
+class CompiledCipher(ABC):
+    """
+    Abstract base class representing a cipher bound to a key, with all the work that only depends on
+    the key done in advance.
+
+    Compiled ciphers are immutable and hashable, so they can be shared freely and used as dictionary
+    keys. They snapshot the parameters of the key they were compiled from, so modifying that key
+    afterwards does not affect them.
+
+    Messages can be strings or Latin-1 byte buffers, exactly as in the cipher modules.
+
+    :ivar Language lang: Language of the key.
+    """
+
+    __slots__ = ('lang',)
+
+    def __init__(self, lang: Language):
+        """
+        Initializes a new instance of the CompiledCipher class.
+
+        :param Language lang: Language of the key.
+        """
+        object.__setattr__(self, 'lang', lang)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} objects are immutable")
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self._parameters() == other._parameters()
+
+    def __hash__(self) -> int:
+        return hash((type(self), self._parameters()))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.key().to_string()!r}, {self.lang})"
+
+    @abstractmethod
+    def _parameters(self) -> tuple:
+        """
+        Abstract method that, when implemented, should return the parameters identifying the cipher.
+
+        :return: A tuple with the language and the key parameters.
+        :rtype: tuple
+        """
+        pass
+
+    @abstractmethod
+    def key(self) -> Cipherkey:
+        """
+        Abstract method that, when implemented, should return a new key equivalent to the compiled one.
+
+        :return: The key of the cipher.
+        :rtype: Cipherkey
+        """
+        pass
+
+    @abstractmethod
+    def translate(self, message: str | bytes, mode: Mode) -> str | bytearray:
+        """
+        Abstract method that, when implemented, should translate (encrypt/decrypt) a message.
+
+        :param str | bytes message: The message to be translated.
+        :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
+
+        :return: The translated message.
+        :rtype: str | bytearray
+        """
+        pass
+
+    def encrypt(self, message: str | bytes) -> str | bytearray:
+        """
+        Encrypt a message.
+
+        :param str | bytes message: The plaintext message to be encrypted.
+
+        :return: The encrypted message.
+        :rtype: str | bytearray
+        """
+        return self.translate(message, Mode.ENCRYPTION)
+
+    def decrypt(self, message: str | bytes) -> str | bytearray:
+        """
+        Decrypt a message.
+
+        :param str | bytes message: The ciphertext message to be decrypted.
+
+        :return: The decrypted message.
+        :rtype: str | bytearray
+        """
+        return self.translate(message, Mode.DECRYPTION)
+
+    def encrypt_batch(self, messages: Iterable) -> list:
+        """
+        Encrypt several independent messages.
+
+        :param Iterable messages: The plaintext messages to be encrypted.
+
+        :return: The encrypted messages, in the same order.
+        :rtype: list
+        """
+        return self.translate_batch(messages, Mode.ENCRYPTION)
+
+    def decrypt_batch(self, messages: Iterable) -> list:
+        """
+        Decrypt several independent messages.
+
+        :param Iterable messages: The ciphertext messages to be decrypted.
+
+        :return: The decrypted messages, in the same order.
+        :rtype: list
+        """
+        return self.translate_batch(messages, Mode.DECRYPTION)
+
+    def translate_batch(self, messages: Iterable, mode: Mode) -> list:
+        """
+        Translate (encrypt/decrypt) several independent messages.
+
+        :param Iterable messages: The messages to be translated.
+        :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
+
+        :return: The translated messages, in the same order.
+        :rtype: list
+        """
+        translate = self.translate
+        return [translate(message, mode) for message in messages]
+
+
+class _TableCipher(CompiledCipher, ABC):
+    """
+    Base class for the ciphers which translate every letter independently, through a fixed table.
+    """
+
+    __slots__ = ('_tables',)
+
+    def __init__(self, lang: Language, str_tables: tuple, byte_tables: tuple):
+        """
+        Initializes a new instance of the _TableCipher class.
+
+        :param Language lang: Language of the key.
+        :param tuple str_tables: The encryption and decryption tables for `str.translate`.
+        :param tuple byte_tables: The encryption and decryption tables for byte buffers.
+        """
+        super().__init__(lang)
+        object.__setattr__(self, '_tables', {
+            Mode.ENCRYPTION: (str_tables[0], byte_tables[0]),
+            Mode.DECRYPTION: (str_tables[1], byte_tables[1]),
+        })
+
+    def translate(self, message: str | bytes, mode: Mode) -> str | bytearray:
+        """
+        Translate (encrypt/decrypt) a message.
+
+        :param str | bytes message: The message to be translated.
+        :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
+
+        :return: The translated message.
+        :rtype: str | bytearray
+        """
+        str_table, byte_table = self._tables[mode]
+        if buffers.is_buffer(message):
+            return buffers.translate_buffer(message, byte_table)
+        return message.translate(str_table)
+
+
+class CompiledCaesar(_TableCipher):
+    """
+    Class representing a compiled Caesar cipher.
+
+    :ivar int shift: The shift value, normalized to the size of the alphabet.
+    :ivar Language lang: Language of the key.
+    """
+
+    __slots__ = ('shift',)
+
+    def __init__(self, key: CaesarKey):
+        """
+        Initialize a new CompiledCaesar instance.
+
+        :param CaesarKey key: The key to compile.
+        """
+        shift = key.key % len(alphabets.alphabet(key.lang, LetterCase.UPPER))
+        super().__init__(key.lang,
+                         caesar._translation_tables(shift, key.lang),
+                         caesar._byte_translation_tables(shift, key.lang))
+        object.__setattr__(self, 'shift', shift)
+
+    def _parameters(self) -> tuple:
+        return self.lang, self.shift
+
+    def key(self) -> CaesarKey:
+        """
+        Get a new key equivalent to the compiled one.
+
+        :return: The key of the cipher.
+        :rtype: CaesarKey
+        """
+        return CaesarKey(self.shift, self.lang)
+
+
+class CompiledAffine(_TableCipher):
+    """
+    Class representing a compiled Affine cipher.
+
+    :ivar int a: The 'a' parameter of the key, normalized to the size of the alphabet.
+    :ivar int b: The 'b' parameter of the key, normalized to the size of the alphabet.
+    :ivar Language lang: Language of the key.
+    """
+
+    __slots__ = ('a', 'b')
+
+    def __init__(self, key: AffineKey):
+        """
+        Initialize a new CompiledAffine instance.
+
+        :param AffineKey key: The key to compile.
+        """
+        n = len(alphabets.alphabet(key.lang, LetterCase.UPPER))
+        a, b = key.a % n, key.b % n
+        super().__init__(key.lang,
+                         affine._translation_tables(a, b, key.lang),
+                         affine._byte_translation_tables(a, b, key.lang))
+        object.__setattr__(self, 'a', a)
+        object.__setattr__(self, 'b', b)
+
+    def _parameters(self) -> tuple:
+        return self.lang, self.a, self.b
+
+    def key(self) -> AffineKey:
+        """
+        Get a new key equivalent to the compiled one.
+
+        :return: The key of the cipher.
+        :rtype: AffineKey
+        """
+        return AffineKey(self.a, self.b, self.lang)
+
+
+class CompiledVigenere(CompiledCipher):
+    """
+    Class representing a compiled Vigenere cipher.
+
+    Messages are always translated with the NumPy engine.
+
+    :ivar str letters: The letters of the key.
+    :ivar Language lang: Language of the key.
+    """
+
+    __slots__ = ('letters', '_offsets')
+
+    def __init__(self, key: VigenereKey):
+        """
+        Initialize a new CompiledVigenere instance.
+
+        :param VigenereKey key: The key to compile.
+        """
+        super().__init__(key.lang)
+        object.__setattr__(self, 'letters', key.key)
+
+        offsets = {mode: vigenere.key_offsets(key, mode) for mode in Mode}
+        for array in offsets.values():
+            array.flags.writeable = False
+        object.__setattr__(self, '_offsets', offsets)
+
+    def _parameters(self) -> tuple:
+        return self.lang, self.letters.upper()
+
+    def key(self) -> VigenereKey:
+        """
+        Get a new key equivalent to the compiled one.
+
+        :return: The key of the cipher.
+        :rtype: VigenereKey
+        """
+        return VigenereKey(self.letters, self.lang)
+
+    def translate(self, message: str | bytes, mode: Mode) -> str | bytearray:
+        """
+        Translate (encrypt/decrypt) a message.
+
+        :param str | bytes message: The message to be translated.
+        :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
+
+        :return: The translated message.
+        :rtype: str | bytearray
+        """
+        offsets: np.ndarray = self._offsets[mode]
+        if buffers.is_buffer(message):
+            return vigenere._translate_buffer(message, self.lang, offsets, 0)[0]
+        return vigenere._translate_numpy(message, self.lang, offsets, 0)[0]
+
+
+def compile(key: Cipherkey) -> CompiledCipher:
+    """
+    Compile a key into an immutable cipher object, which precomputes everything that only depends on
+    the key, so it can be reused to translate many messages.
+
+    :param Cipherkey key: The key to compile.
+
+    :return: The compiled cipher.
+    :rtype: CompiledCipher
+
+    :raises ValueError: If the type of `key` does not belong to a known cipher.
+    """
+    if isinstance(key, CaesarKey):
+        return CompiledCaesar(key)
+    elif isinstance(key, AffineKey):
+        return CompiledAffine(key)
+    elif isinstance(key, VigenereKey):
+        return CompiledVigenere(key)
+    else:
+        raise ValueError(f"Unsupported key: {type(key).__name__}")
@@ -1,23 +1,39 @@
+import functools
 import math
 
+import numpy as np
+
 import classiccrypto.utils.frequency
-from classiccrypto.cryptoschemes.affine import decrypt, AffineKey
-from classiccrypto.utils import alphabets, Language, LetterCase
+from classiccrypto.cryptoschemes.affine import AffineKey
+from classiccrypto.cryptoschemes.cracking.sampling import SamplingPolicy
+from classiccrypto.utils import alphabets, Language
+from classiccrypto.utils import instrumentation
+from classiccrypto.utils.ranking import TopK
 
 
-def crack(ciphertext: str, lang: Language, fast: bool) -> AffineKey:
+def crack(ciphertext: str, lang: Language, fast: bool, sampling: SamplingPolicy = None) -> AffineKey:
     """
     Attempt to crack a ciphertext encrypted with the Affine cipher using statistical analysis.
 
     :param str ciphertext: The encrypted message.
     :param Language lang: The language object to be used for decryption.
     :param bool fast: If True, use a faster but possibly less accurate cracking method.
+    :param SamplingPolicy, optional sampling: If provided, the keys are brute-forced on growing samples
+                                              of the ciphertext, until the best one is clear.
 
     :return: The most likely key to have been used for the encryption.
     :rtype: AffineKey
     """
     if fast:
         return crack_congruence(ciphertext, lang)
+
+    if sampling is not None:
+        similarities = _sampled_similarities(ciphertext, lang, sampling)
+        if similarities is not None:
+            a_values, b_values = valid_keys(alphabets.get_alphabet(lang).size)
+            best = int(np.argmax(similarities))
+            return AffineKey(int(a_values[best]), int(b_values[best]), lang)
+
     return crack_bruteforce(ciphertext, lang)
 
 
@@ -25,9 +41,8 @@ def crack_bruteforce(ciphertext: str, lang: Language) -> AffineKey:
     """
     Attempt to crack an Affine cipher by brute-forcing all possible keys.
 
-    This function decrypts the `ciphertext` with all possible keys, comparing the decrypted text's
-    letter frequency histogram to the reference language histogram and selecting the key for which
-    the decrypted text has the highest similarity to the reference language.
+    This function scores all possible keys with `rank_keys` and selects the key for which the
+    decrypted text has the highest similarity to the reference language.
 
     :param str ciphertext: The encrypted message.
     :param Language lang: The language object to be used for decryption.
@@ -35,30 +50,134 @@ def crack_bruteforce(ciphertext: str, lang: Language) -> AffineKey:
     :return: The key that yields the most likely plaintext, based on letter frequency.
     :rtype: AffineKey
     """
-    clear_alphabet = alphabets.alphabet(lang, LetterCase.UPPER)
-    n = len(clear_alphabet)
+    return rank_keys(ciphertext, lang)[0][0]
+
+
+def rank_keys(ciphertext: str, lang: Language) -> list:
+    """
+    Score all possible Affine keys against a ciphertext, from the most to the least likely one.
+
+    :param str ciphertext: The encrypted message.
+    :param Language lang: The language object to be used for decryption.
+
+    :return: A list of (key, similarity) pairs for every valid key, sorted by decreasing similarity
+             of the decrypted text to the reference language. Keys with the same similarity keep the
+             order of their parameters.
+    :rtype: list
+    """
+    a_values, b_values = valid_keys(alphabets.get_alphabet(lang).size)
+    return crack_top_k(ciphertext, lang, len(a_values))
+
+
+def crack_top_k(ciphertext: str, lang: Language, k: int, sampling: SamplingPolicy = None) -> list:
+    """
+    Rank the Affine keys most likely to have been used for the encryption.
+
+    Decrypting with a key only relabels the letters, so the plaintext histogram of every key is a
+    permutation of the ciphertext histogram: the plaintext letter p is the ciphertext letter
+    (a * p + b) mod n. The ciphertext histogram is computed once, and the decrypted histograms of all
+    the keys are gathered from it with a single index matrix, so the cost does not depend on the
+    length of the text.
+
+    :param str ciphertext: The encrypted message.
+    :param Language lang: The language object to be used for decryption.
+    :param int k: The maximum number of keys returned.
+    :param SamplingPolicy, optional sampling: If provided, the keys are scored on the first sample of
+                                              the ciphertext whose best key is clear, as in `crack`.
+
+    :return: A list of at most k (key, similarity) pairs, sorted by decreasing similarity of the
+             decrypted text to the reference language. Keys with the same similarity keep the order
+             of their parameters.
+    :rtype: list
+    """
+    a_values, b_values = valid_keys(alphabets.get_alphabet(lang).size)
+    similarities = _sampled_similarities(ciphertext, lang, sampling) if sampling is not None else None
+    if similarities is None:
+        cipher_histogram = classiccrypto.utils.frequency.normalized_histogram(ciphertext, lang)
+        similarities = key_similarities(cipher_histogram.values, lang)
+        instrumentation.count('keys_tried', len(similarities))
+
+    best = TopK(k)
+    for candidate, similarity in enumerate(similarities.tolist()):
+        best.push(similarity, candidate)
+
+    return [(AffineKey(int(a_values[candidate]), int(b_values[candidate]), lang), similarity)
+            for candidate, similarity in best.items()]
+
+
+def _sampled_similarities(ciphertext: str, lang: Language, sampling: SamplingPolicy) -> np.ndarray | None:
+    """
+    Score every valid key on growing samples of a ciphertext, until the best one is clear.
+
+    :param str ciphertext: The encrypted message.
+    :param Language lang: The language object to be used for decryption.
+    :param SamplingPolicy sampling: The sampling policy.
+
+    :return: The similarity of every key on the first conclusive sample, in the order of
+             `valid_keys`, or None if no sample smaller than the ciphertext is conclusive.
+    :rtype: np.ndarray | None
+    """
+    n = alphabets.get_alphabet(lang).size
+    a_values, _ = valid_keys(n)
+    for sample in sampling.samples(ciphertext, lang):
+        instrumentation.count('samples')
+        instrumentation.count('letters_sampled', len(sample))
+        instrumentation.count('keys_tried', len(a_values))
+        similarities = key_similarities(classiccrypto.utils.frequency.normalized_frequencies(
+            np.bincount(sample.indices, minlength=n)), lang)
+        if sampling.confident(similarities):
+            return similarities
 
-    best_similarity = -1
-    key = None
+    return None
 
-    # Brute force both parameters
-    for a in range(1, n):
-        if math.gcd(a, n) != 1:
-            # Invalid value for a, don't try it
-            continue
 
-        for b in range(0, n):
-            candidate_key = AffineKey(a, b, lang)
-            candidate_decryption = decrypt(ciphertext, candidate_key)
-            similarity = classiccrypto.utils.frequency.similarity(
-                classiccrypto.utils.frequency.normalized_histogram(candidate_decryption, lang),
-                classiccrypto.utils.frequency.language_histogram(lang))
+def key_similarities(cipher_frequencies: np.ndarray, lang: Language) -> np.ndarray:
+    """
+    Score every valid key by the similarity between the language histogram and the histogram of the
+    text it decrypts the ciphertext into.
+
+    :param np.ndarray cipher_frequencies: The relative frequency of every letter in the ciphertext.
+    :param Language lang: The language object to be used for decryption.
+
+    :return: The similarity of every key, in the order of `valid_keys`.
+    :rtype: np.ndarray
+    """
+    encrypted_letters = _encrypted_letters(alphabets.get_alphabet(lang).size)
+    differences = cipher_frequencies[encrypted_letters] - classiccrypto.utils.frequency.language_histogram(lang).values
+    return 1 - np.einsum('ij,ij->i', differences, differences)
 
-            if similarity > best_similarity:
-                best_similarity = similarity
-                key = candidate_key
 
-    return key
+@functools.lru_cache(maxsize=None)
+def _encrypted_letters(n: int) -> np.ndarray:
+    """
+    Builds the matrix whose row k holds, for every plaintext letter, the ciphertext letter it is
+    encrypted into with the key k of `valid_keys`.
+
+    The matrix is built once and cached per alphabet size.
+
+    :param int n: The size of the alphabet.
+
+    :return: A (number of keys) x n matrix of letter positions.
+    :rtype: np.ndarray
+    """
+    a_values, b_values = valid_keys(n)
+    return (a_values[:, np.newaxis] * np.arange(n) + b_values[:, np.newaxis]) % n
+
+
+@functools.lru_cache(maxsize=None)
+def valid_keys(n: int) -> tuple:
+    """
+    Retrieves the parameters of all the valid Affine keys for an alphabet, ordered by a and then b.
+
+    Arrays are built once and cached per alphabet size.
+
+    :param int n: The size of the alphabet.
+
+    :return: A tuple with the array of 'a' parameters and the array of 'b' parameters.
+    :rtype: tuple
+    """
+    keys = [(a, b) for a in range(1, n) if math.gcd(a, n) == 1 for b in range(n)]
+    return np.array([a for a, _ in keys]), np.array([b for _, b in keys])
 
 
 def crack_congruence(ciphertext: str, lang: Language) -> AffineKey | None:
@@ -77,15 +196,15 @@ def crack_congruence(ciphertext: str, lang: Language) -> AffineKey | None:
     language_histogram = classiccrypto.utils.frequency.language_histogram(lang)
     cipher_histogram = classiccrypto.utils.frequency.normalized_histogram(ciphertext, lang)
 
-    def top_two(hist: list) -> list:
-        return [k for (k, v) in sorted(hist, key=lambda x: x[1], reverse=True)[:2]]
+    def top_two(hist: classiccrypto.utils.frequency.Histogram) -> list:
+        return np.argsort(-hist.values, kind='stable')[:2].tolist()
 
-    alphabet = alphabets.alphabet(lang, LetterCase.LOWER)
-    n = len(alphabet)
+    n = alphabets.get_alphabet(lang).size
 
-    most_common_clear_letters = [alphabet.index(c) for c in top_two(language_histogram)]
-    most_common_cipher_letters = [alphabet.index(c) for c in top_two(cipher_histogram)]
+    most_common_clear_letters = top_two(language_histogram)
+    most_common_cipher_letters = top_two(cipher_histogram)
 
+    instrumentation.count('keys_tried')
     cipher_diff = (most_common_cipher_letters[1] - most_common_cipher_letters[0]) % n
     clear_diff = (most_common_clear_letters[1] - most_common_clear_letters[0]) % n
 
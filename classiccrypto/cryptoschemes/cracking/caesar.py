@@ -1,9 +1,14 @@
+import numpy as np
+
 import classiccrypto.utils.frequency
 from classiccrypto.cryptoschemes.caesar import CaesarKey
-from classiccrypto.utils import Language, LetterCase, alphabets
+from classiccrypto.cryptoschemes.cracking.sampling import SamplingPolicy
+from classiccrypto.utils import Language, alphabets
+from classiccrypto.utils import instrumentation
+from classiccrypto.utils.ranking import TopK
 
 
-def crack(ciphertext: str, lang: Language, fast: bool) -> CaesarKey:
+def crack(ciphertext: str, lang: Language, fast: bool, sampling: SamplingPolicy = None) -> CaesarKey:
     """
     Attempt to crack a ciphertext encrypted with the Caesar cipher using statistical analysis.
 
@@ -13,13 +18,22 @@ def crack(ciphertext: str, lang: Language, fast: bool) -> CaesarKey:
     :param str ciphertext: The encrypted message.
     :param Language lang: The language object to be used for decryption.
     :param bool fast: If True, use a faster congruence method.
+    :param SamplingPolicy, optional sampling: If provided, the shifts are scored on growing samples of
+                                              the ciphertext, until the best one is clear.
 
     :return: The most likely key to have been used for the encryption.
     :rtype: CaesarKey
     """
     if fast:
         crack_congruence(ciphertext, lang)
+
+    if sampling is not None:
+        similarities = _sampled_similarities(ciphertext, lang, sampling)
+        if similarities is not None:
+            return CaesarKey(int(np.argmax(similarities)), lang)
+
     # Find best fit between message histogram and language histogram
+    instrumentation.count('keys_tried', alphabets.get_alphabet(lang).size)
     return CaesarKey(
         classiccrypto.utils.frequency.find_step_for_best_match(
             classiccrypto.utils.frequency.normalized_histogram(ciphertext, lang),
@@ -27,6 +41,62 @@ def crack(ciphertext: str, lang: Language, fast: bool) -> CaesarKey:
         lang)
 
 
+def crack_top_k(ciphertext: str, lang: Language, k: int, sampling: SamplingPolicy = None) -> list:
+    """
+    Rank the Caesar keys most likely to have been used for the encryption.
+
+    Every shift is scored by the similarity between the histogram of the ciphertext and the shifted
+    language histogram, as in the full (non-fast) mode of `crack`, whose result is the first key.
+
+    :param str ciphertext: The encrypted message.
+    :param Language lang: The language object to be used for decryption.
+    :param int k: The maximum number of keys returned.
+    :param SamplingPolicy, optional sampling: If provided, the shifts are scored on the first sample of
+                                              the ciphertext whose best shift is clear, as in `crack`.
+
+    :return: A list of at most k (key, similarity) pairs, sorted by decreasing similarity.
+    :rtype: list
+    """
+    similarities = _sampled_similarities(ciphertext, lang, sampling) if sampling is not None else None
+    if similarities is None:
+        similarities = classiccrypto.utils.frequency.shift_similarities(
+            classiccrypto.utils.frequency.normalized_histogram(ciphertext, lang),
+            classiccrypto.utils.frequency.language_histogram(lang))
+        instrumentation.count('keys_tried', len(similarities))
+
+    best = TopK(k)
+    for step, similarity in enumerate(similarities.tolist()):
+        best.push(similarity, step)
+
+    return [(CaesarKey(step, lang), similarity) for step, similarity in best.items()]
+
+
+def _sampled_similarities(ciphertext: str, lang: Language, sampling: SamplingPolicy) -> np.ndarray | None:
+    """
+    Score every shift on growing samples of a ciphertext, until the best one is clear.
+
+    :param str ciphertext: The encrypted message.
+    :param Language lang: The language object to be used for decryption.
+    :param SamplingPolicy sampling: The sampling policy.
+
+    :return: The similarity of every shift on the first conclusive sample, or None if no sample
+             smaller than the ciphertext is conclusive.
+    :rtype: np.ndarray | None
+    """
+    n = alphabets.get_alphabet(lang).size
+    for sample in sampling.samples(ciphertext, lang):
+        instrumentation.count('samples')
+        instrumentation.count('letters_sampled', len(sample))
+        instrumentation.count('keys_tried', n)
+        similarities = classiccrypto.utils.frequency.shift_similarities(
+            classiccrypto.utils.frequency.normalized_frequencies(np.bincount(sample.indices, minlength=n)),
+            classiccrypto.utils.frequency.language_histogram(lang))
+        if sampling.confident(similarities):
+            return similarities
+
+    return None
+
+
 def crack_congruence(ciphertext: str, lang: Language) -> CaesarKey:
     """
     Attempt to crack a Caesar cipher using congruence relations between the most frequent letters.
@@ -41,15 +111,14 @@ def crack_congruence(ciphertext: str, lang: Language) -> CaesarKey:
     :return: The most likely key to have been used for the encryption.
     :rtype: CaesarKey
     """
-    alphabet = alphabets.alphabet(lang, LetterCase.LOWER)
+    alphabet = alphabets.get_alphabet(lang)
     cipher_histogram = classiccrypto.utils.frequency.normalized_histogram(ciphertext, lang)
     language_histogram = classiccrypto.utils.frequency.language_histogram(lang)
-    most_common_cipher_letter = alphabet.index(max(cipher_histogram,
-                                                   key=lambda x: x[1])[0])
-    most_common_language_letter = alphabet.index(max(language_histogram,
-                                                     key=lambda x: x[1])[0])
+    instrumentation.count('keys_tried')
+    most_common_cipher_letter = int(np.argmax(cipher_histogram.values))
+    most_common_language_letter = int(np.argmax(language_histogram.values))
 
-    n = len(alphabet)
+    n = alphabet.size
 
     b = (most_common_cipher_letter - most_common_language_letter) % n
 
@@ -0,0 +1,153 @@
+import numpy as np
+
+import classiccrypto.utils.frequency
+from classiccrypto.cryptoschemes.cracking import affine
+from classiccrypto.cryptoschemes.cracking.sampling import SamplingPolicy
+from classiccrypto.cryptoschemes.cracking.vigenere import ColumnStatistics, DEFAULT_MAX_KEY_LENGTH, language_coincidence
+from classiccrypto.utils import alphabets, Cryptoscheme, Language
+
+# Fewest letters a ciphertext must have to be identified
+MIN_LETTERS = 40
+
+# Fewest letters per column for a period to be considered, since the index of coincidence of shorter
+# columns is too noisy
+MIN_COLUMN_LETTERS = 10
+
+# Number of letters of the sample the statistics are computed on, for longer ciphertexts
+SAMPLE_SIZE = 20000
+
+# Rescaled index of coincidence (0 for random text, 1 for the language) above which a text, or the
+# columns of a text, are considered to be encrypted with a single alphabet
+MONOALPHABETIC_COINCIDENCE = 0.6
+
+# Smallest ratio between the distance of the sorted histograms of the text and the language, and the
+# distance of the best affine fit, for the histogram to be considered an affine permutation of the
+# language profile rather than an arbitrary one
+AFFINE_FIT = 0.12
+
+
+class Identification:
+    """
+    Class representing the cryptoscheme a ciphertext is most likely encrypted with.
+
+    :ivar Cryptoscheme | None scheme: The cryptoscheme, or None if the text does not look like any of them.
+    :ivar float confidence: How sure the identification is, from 0 to 1.
+    :ivar float coincidence: The index of coincidence of the text, rescaled so 0 is random text and 1
+                             is the language.
+    :ivar int period: The shortest period whose columns look like the language, if the text is
+                      polyalphabetic, or 1.
+    """
+
+    def __init__(self, scheme: Cryptoscheme | None, confidence: float, coincidence: float, period: int):
+        """
+        Initialize a new Identification instance.
+
+        :param Cryptoscheme | None scheme: The cryptoscheme, or None if unknown.
+        :param float confidence: How sure the identification is, from 0 to 1.
+        :param float coincidence: The rescaled index of coincidence of the text.
+        :param int period: The most likely period of the text.
+        """
+        self.scheme = scheme
+        self.confidence = confidence
+        self.coincidence = coincidence
+        self.period = period
+
+    def __str__(self) -> str:
+        name = Cryptoscheme.to_string(self.scheme) if self.scheme is not None else 'unknown'
+        return f'{name} (confidence: {self.confidence:.2f})'
+
+
+def identify(ciphertext: str, lang: Language, max_period: int = DEFAULT_MAX_KEY_LENGTH) -> Identification:
+    """
+    Identify the classic cryptoscheme a ciphertext is most likely encrypted with.
+
+    The letters are converted once, and every statistic is computed from their counts:
+    - The index of coincidence of the text tells a single alphabet (Caesar, affine) from several ones.
+    - For a single alphabet, the histogram of the text is matched against every rotation of the
+      language profile (Caesar keys) and every affine permutation of it (affine keys). If neither fits
+      much worse than the best possible matching of the two histograms, the text was encrypted with
+      another substitution.
+    - For several alphabets, the average index of coincidence of the columns of every period up to
+      `max_period` must peak at the level of the language (Vigenere). Periods whose columns would
+      have fewer than MIN_COLUMN_LETTERS letters are not considered.
+
+    Ciphertexts longer than SAMPLE_SIZE letters are identified on a stratified sample of them.
+
+    :param str ciphertext: The encrypted message.
+    :param Language lang: The language of the plaintext.
+    :param int, optional max_period: The longest Vigenere key considered.
+
+    :return: The most likely cryptoscheme, with the confidence of the identification.
+    :rtype: Identification
+    """
+    sample = next(SamplingPolicy(SAMPLE_SIZE).samples(ciphertext, lang), None)
+    if sample is not None:
+        indices, positions = sample.indices, sample.positions
+    else:
+        indices = classiccrypto.utils.frequency.letter_indices(ciphertext, lang)
+        positions = None
+
+    if len(indices) < MIN_LETTERS:
+        return Identification(None, 0.0, 0.0, 1)
+
+    statistics = ColumnStatistics(indices, lang, min(max_period, len(indices) // MIN_COLUMN_LETTERS), positions)
+    coincidences = _rescaled_coincidence(statistics.coincidence(), lang)
+    coincidence = float(coincidences[0])
+
+    if coincidence >= MONOALPHABETIC_COINCIDENCE:
+        return _identify_monoalphabetic(statistics.counts(1)[0], lang, coincidence)
+
+    # The first period whose columns look like the language, rather than the best one, since all its
+    # multiples look alike
+    periodic = np.flatnonzero(coincidences[1:] >= MONOALPHABETIC_COINCIDENCE)
+    if len(periodic) == 0:
+        period = int(np.argmax(coincidences[1:])) + 2 if len(coincidences) > 1 else 1
+        return Identification(None, float(np.clip(1 - coincidences.max(), 0, 1)), coincidence, period)
+
+    period = int(periodic[0]) + 2
+    confidence = min(1.0, float(coincidences[1:].max())) * (1 - max(coincidence, 0) / MONOALPHABETIC_COINCIDENCE)
+    return Identification(Cryptoscheme.VIGENERE, confidence, coincidence, period)
+
+
+def _identify_monoalphabetic(counts: np.ndarray, lang: Language, coincidence: float) -> Identification:
+    """
+    Tell whether the histogram of a monoalphabetic text is a rotation or an affine permutation of the
+    language profile.
+
+    :param np.ndarray counts: The number of occurrences of each letter in the text.
+    :param Language lang: The language of the plaintext.
+    :param float coincidence: The rescaled index of coincidence of the text.
+
+    :return: The identification of the text.
+    :rtype: Identification
+    """
+    n = alphabets.get_alphabet(lang).size
+    frequencies = classiccrypto.utils.frequency.normalized_frequencies(counts)
+    language = classiccrypto.utils.frequency.language_histogram(lang).values
+
+    # Squared distances to the language profile of the best Caesar key, the best affine key which is
+    # not a Caesar one, and the best matching of the sorted histograms, which no substitution beats
+    distances = 1 - affine.key_similarities(frequencies, lang)
+    a_values, _ = affine.valid_keys(n)
+    rotation = float(distances[a_values == 1].min())
+    permutation = float(distances[a_values != 1].min())
+    best = min(rotation, permutation)
+    sorted_distance = float(((np.sort(frequencies) - np.sort(language)) ** 2).sum())
+
+    fit = sorted_distance / best if best > 0 else 1.0
+    if fit < AFFINE_FIT:
+        return Identification(None, 1 - fit / AFFINE_FIT, coincidence, 1)
+
+    # Caesar keys are affine keys too, so the scheme is the one of the best key, and the confidence
+    # depends on how much better it fits than the best key of the other scheme
+    scheme = Cryptoscheme.CAESAR if rotation <= permutation else Cryptoscheme.AFFINE
+    separation = 1 - best / max(rotation, permutation)
+    return Identification(scheme, min(1.0, fit / (2 * AFFINE_FIT)) * separation, coincidence, 1)
+
+
+def _rescaled_coincidence(coincidences: np.ndarray, lang: Language) -> np.ndarray:
+    """
+    Rescale indices of coincidence, so 0 is random text and 1 is the language.
+    """
+    uniform = 1 / alphabets.get_alphabet(lang).size
+    return (coincidences - uniform) / (language_coincidence(lang) - uniform)
@@ -0,0 +1,122 @@
+import numpy as np
+
+# Shortest repeated block taken into account by the Kasiski examination
+DEFAULT_MIN_LENGTH = 3
+
+# Largest key length tallied by the Kasiski examination
+DEFAULT_MAX_DIVISOR = 100
+
+
+def prefix_ranks(indices: np.ndarray, length: int) -> np.ndarray:
+    """
+    Rank the blocks of a given length starting at every position of a text, so two positions get the
+    same rank if and only if the blocks starting there are equal.
+
+    The ranks are built by prefix doubling, as when building a suffix array: the rank of the blocks of
+    length 2L is given by the pair of ranks of the blocks of length L at i and i + L, and any length
+    between L and 2L is covered by two overlapping blocks of length L. Sorting the positions by rank
+    gives the suffix array of the text truncated to `length` letters, so it takes
+    O(n log n log length) time and O(n) memory.
+
+    :param np.ndarray indices: Positions in the alphabet of the letters of the text.
+    :param int length: The length of the blocks.
+
+    :return: An array with the rank of the block starting at every position where a whole block fits,
+             i.e. of length len(indices) - length + 1.
+    :rtype: np.ndarray
+    """
+    n = len(indices)
+    if length > n:
+        return np.zeros(0, dtype=np.int64)
+
+    ranks = np.asarray(indices, dtype=np.int64)
+    span = 1
+    while span < length:
+        # Extend the blocks up to twice their length, but not beyond the requested one
+        offset = min(span, length - span)
+        span += offset
+
+        shifted = np.full(n, -1, dtype=np.int64)
+        shifted[:n - offset] = ranks[offset:]
+
+        # Blocks running past the end of the text get -1 in the second half of their pair, so they
+        # never match a whole block
+        base = int(ranks.max()) + 2
+        _, ranks = np.unique(ranks * base + shifted + 1, return_inverse=True)
+        ranks = ranks.astype(np.int64).reshape(-1)
+
+    return ranks[:n - length + 1]
+
+
+def repeat_distances(indices: np.ndarray,
+                     min_length: int = DEFAULT_MIN_LENGTH,
+                     positions: np.ndarray = None) -> np.ndarray:
+    """
+    Find the distances between consecutive occurrences of all the repeated blocks of a text which are
+    at least `min_length` letters long.
+
+    Every repeat is counted once, rather than once per block of `min_length` letters it contains: a
+    pair of occurrences is skipped when the letters before them are equal too, since the repeat
+    extends to the left and has already been counted there.
+
+    :param np.ndarray indices: Positions in the alphabet of the letters of the text.
+    :param int, optional min_length: The shortest repeated block considered. Defaults to DEFAULT_MIN_LENGTH.
+    :param np.ndarray, optional positions: Position in the text of every letter of `indices`, if they
+                                           are runs of consecutive letters sampled from it. Distances
+                                           are then measured in the text. By default, `indices` is the
+                                           whole text.
+
+    :return: An array with the distance between every pair of consecutive occurrences.
+    :rtype: np.ndarray
+    """
+    ranks = prefix_ranks(indices, min_length)
+    if len(ranks) < 2:
+        return np.zeros(0, dtype=np.int64)
+
+    # Group equal blocks together, in order of appearance within each group
+    order = np.argsort(ranks, kind='stable')
+    same_block = ranks[order[1:]] == ranks[order[:-1]]
+    first = order[:-1][same_block]
+    second = order[1:][same_block]
+
+    left_maximal = (first == 0) | (indices[first - 1] != indices[second - 1])
+    if positions is None:
+        return (second - first)[left_maximal]
+
+    # The letters before the first one of a run are not sampled, so a repeat starting a run may not
+    # extend to the left
+    run_start = (first == 0) | (positions[first] - positions[first - 1] != 1) | \
+                (positions[second] - positions[second - 1] != 1)
+
+    return (positions[second] - positions[first])[left_maximal | run_start]
+
+
+def divisor_frequency(distances: np.ndarray, max_divisor: int = DEFAULT_MAX_DIVISOR) -> np.ndarray:
+    """
+    Count how many distances every integer up to a maximum divides.
+
+    Distances are first tallied into a histogram, and the count of every divisor d is the sum of the
+    histogram over the multiples of d, so the cost is O(n log max_divisor) whatever the number of
+    distances. When there are few distances spanning a long text (e.g. from a sample of it), every
+    distance is tested against every divisor instead, so the cost does not depend on the length of
+    the text.
+
+    :param np.ndarray distances: The distances between repeated blocks.
+    :param int, optional max_divisor: The largest divisor counted. Defaults to DEFAULT_MAX_DIVISOR.
+
+    :return: An array whose element d is the number of distances divisible by d (element 0 is unused).
+    :rtype: np.ndarray
+    """
+    result = np.zeros(max_divisor + 1, dtype=np.int64)
+    if len(distances) == 0:
+        return result
+
+    if len(distances) * max_divisor < distances.max():
+        result[1:] = (distances[:, np.newaxis] % np.arange(1, max_divisor + 1) == 0).sum(axis=0)
+        return result
+
+    distance_counts = np.bincount(distances)
+    for divisor in range(1, min(max_divisor, len(distance_counts) - 1) + 1):
+        result[divisor] = distance_counts[divisor::divisor].sum()
+
+    return result
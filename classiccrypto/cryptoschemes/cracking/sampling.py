@@ -0,0 +1,173 @@
+import numpy as np
+
+import classiccrypto.utils.frequency
+from classiccrypto.utils import Language
+
+# Number of letters of the first sample
+DEFAULT_SAMPLE_SIZE = 5000
+
+# Factor by which the sample grows when its result is not conclusive
+DEFAULT_GROWTH = 4
+
+# Smallest difference between the scores of the best and the second-best candidates for a sample
+# to be conclusive
+DEFAULT_MIN_MARGIN = 0.02
+
+# Number of evenly spread runs of consecutive letters making up a sample
+DEFAULT_RUNS = 8
+
+
+class LetterSample:
+    """
+    Class representing a sample of the letters of a ciphertext.
+
+    :ivar np.ndarray indices: Positions in the alphabet of the sampled letters.
+    :ivar np.ndarray positions: Position in the ciphertext (counting letters only) of every sampled letter.
+    """
+
+    def __init__(self, indices: np.ndarray, positions: np.ndarray):
+        """
+        Initialize a new LetterSample instance.
+
+        :param np.ndarray indices: Positions in the alphabet of the sampled letters.
+        :param np.ndarray positions: Position in the ciphertext of every sampled letter.
+        """
+        self.indices = indices
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+
+class SamplingPolicy:
+    """
+    Class describing how a cracker scores its candidate keys on samples of a long ciphertext, rather
+    than on the whole of it.
+
+    A sample is made up of `runs` runs of consecutive letters, evenly spread over the ciphertext, so
+    it covers all its parts (stratified sampling) while keeping the position of every letter: the
+    columns of a Vigenere ciphertext stay aligned, and repeated blocks keep their true distances.
+
+    Crackers score their candidates on a first sample of `size` letters. If the margin between the
+    best and the second-best candidates is below `min_margin`, the sample is not conclusive and grows
+    by `growth`, until it would cover the whole ciphertext, which is then scored as usual.
+
+    :ivar int size: Number of letters of the first sample.
+    :ivar int growth: Factor by which the sample grows.
+    :ivar float min_margin: Smallest margin for a sample to be conclusive.
+    :ivar int runs: Number of runs of consecutive letters in a sample.
+    """
+
+    def __init__(self,
+                 size: int = DEFAULT_SAMPLE_SIZE,
+                 growth: int = DEFAULT_GROWTH,
+                 min_margin: float = DEFAULT_MIN_MARGIN,
+                 runs: int = DEFAULT_RUNS):
+        """
+        Initialize a new SamplingPolicy instance.
+
+        :param int, optional size: Number of letters of the first sample. Defaults to DEFAULT_SAMPLE_SIZE.
+        :param int, optional growth: Factor by which the sample grows. Defaults to DEFAULT_GROWTH.
+        :param float, optional min_margin: Smallest margin for a sample to be conclusive.
+                                           Defaults to DEFAULT_MIN_MARGIN.
+        :param int, optional runs: Number of runs of consecutive letters in a sample. Defaults to DEFAULT_RUNS.
+
+        :raises ValueError: If the size or the number of runs is not positive, or the growth is not
+                            greater than 1.
+        """
+        if size < 1 or runs < 1:
+            raise ValueError(f"The sample size and the number of runs must be positive, not {size} and {runs}")
+        if growth <= 1:
+            raise ValueError(f"The sample growth must be greater than 1, not {growth}")
+
+        self.size = size
+        self.growth = growth
+        self.min_margin = min_margin
+        self.runs = runs
+
+    def samples(self, ciphertext: str, lang: Language):
+        """
+        Draw growing samples of a ciphertext, as long as they are smaller than the ciphertext itself.
+
+        Runs are sliced straight out of the ciphertext, so the whole text is never converted. If a run
+        holds anything but letters, the position of its letters in the ciphertext is unknown without
+        counting the letters before it: the letters of the whole ciphertext are extracted once, and
+        the runs are taken from them instead.
+
+        :param str ciphertext: The encrypted message.
+        :param Language lang: The language of the plaintext.
+
+        :return: An iterator over samples of increasing size.
+        :rtype: Iterator[LetterSample]
+        """
+        letters = None
+        size = self.size
+
+        while size < len(ciphertext if letters is None else letters):
+            sample = None
+            if letters is None:
+                sample = self._sample_letters_only(ciphertext, lang, size)
+                if sample is None:
+                    letters = classiccrypto.utils.frequency.letter_indices(ciphertext, lang)
+                    continue
+            else:
+                starts = self._run_starts(len(letters), size)
+                positions = (starts[:, np.newaxis] + np.arange(size // len(starts))).reshape(-1)
+                sample = LetterSample(letters[positions], positions)
+
+            yield sample
+            size *= self.growth
+
+    def confident(self, scores: np.ndarray) -> bool:
+        """
+        Tell whether the scores of the candidates on a sample are conclusive.
+
+        :param np.ndarray scores: The score of every candidate. If the array has several rows, e.g. one
+                                  per column of a Vigenere key, every row must be conclusive.
+
+        :return: True if the best candidate beats the second-best one by at least `min_margin` in every
+                 row.
+        :rtype: bool
+        """
+        return bool(np.all(margins(scores) >= self.min_margin))
+
+    def _run_starts(self, length: int, size: int) -> np.ndarray:
+        runs = min(self.runs, size)
+        return np.linspace(0, length - size // runs, runs).astype(np.int64)
+
+    def _sample_letters_only(self, ciphertext: str, lang: Language, size: int) -> LetterSample | None:
+        """
+        Draw a sample from the runs of a ciphertext, if all of them hold only letters.
+
+        :return: The sample, or None if any run holds other characters.
+        :rtype: LetterSample | None
+        """
+        starts = self._run_starts(len(ciphertext), size)
+        run_length = size // len(starts)
+
+        indices = []
+        for start in starts.tolist():
+            run = classiccrypto.utils.frequency.letter_indices(ciphertext[start:start + run_length], lang)
+            if len(run) != run_length:
+                return None
+            indices.append(run)
+
+        positions = (starts[:, np.newaxis] + np.arange(run_length)).reshape(-1)
+        return LetterSample(np.concatenate(indices), positions)
+
+
+def margins(scores: np.ndarray) -> np.ndarray:
+    """
+    Compute the difference between the best and the second-best scores.
+
+    :param np.ndarray scores: The score of every candidate, along the last axis.
+
+    :return: The margin of every row (a scalar array for a single row). It is infinite when there is
+             a single candidate.
+    :rtype: np.ndarray
+    """
+    if scores.shape[-1] < 2:
+        return np.full(scores.shape[:-1], np.inf)
+
+    top_two = np.partition(scores, -2, axis=-1)[..., -2:]
+    return top_two[..., 1] - top_two[..., 0]
@@ -1,81 +1,415 @@
-import math
-from collections import defaultdict
+import heapq
+import os
+
+import numpy as np
 
 import classiccrypto.utils.frequency
+from classiccrypto.cryptoschemes.cracking import kasiski
+from classiccrypto.cryptoschemes.cracking.sampling import SamplingPolicy
 from classiccrypto.cryptoschemes.vigenere import VigenereKey
 from classiccrypto.utils import alphabets, Language, LetterCase
 from classiccrypto.utils import cli
-from classiccrypto.utils import gui
+from classiccrypto.utils import instrumentation
 from classiccrypto.utils.cli import histogram
-from classiccrypto.utils.gui import histogram
+from classiccrypto.utils.ngrams import NgramModel
+from classiccrypto.utils.ranking import TopK
+
+# Longest key considered when the key length is estimated automatically
+DEFAULT_MAX_KEY_LENGTH = 20
+
+# Strength of the penalty applied to the key lengths far from the Friedman estimate
+FRIEDMAN_WEIGHT = 0.1
+
+# Number of hill climbs run when refining a key with an n-gram model
+DEFAULT_RESTARTS = 4
 
 
-def _get_divisors(n):
+def kasiski_divisor_frequency(ciphertext: str,
+                              lang: Language,
+                              max_divisor: int = kasiski.DEFAULT_MAX_DIVISOR) -> tuple:
     """
-    Retrieve all divisors of a given integer.
+    Tally, for every possible key length, how many separations between repeated blocks of at least
+    3 letters it divides (Kasiski examination).
 
-    Utilizes memoization to store previously calculated divisors for efficiency.
+    :param str ciphertext: The encrypted message.
+    :param Language lang: The language of the plaintext.
+    :param int, optional max_divisor: The longest key length tallied.
 
-    :param int n: The integer to find divisors for.
+    :return: A tuple with a dictionary mapping every divisor to the number of separations it divides,
+             and the total number of separations.
+    :rtype: tuple
 
-    :return: A list containing all divisors of `n`.
-    :rtype: list[int]
+    :raises RuntimeError: If the message is too short to analyze.
     """
-    if not hasattr(_get_divisors, 'divisors'):
-        _get_divisors.divisors = dict()
+    indices = classiccrypto.utils.frequency.letter_indices(ciphertext, lang)
+    if len(indices) < 8:
+        raise RuntimeError("Cannot analyse message, too short")
 
-    if n not in _get_divisors.divisors:
-        divs = set()
+    distances = kasiski.repeat_distances(indices)
+    frequency = kasiski.divisor_frequency(distances, max_divisor)
 
-        for i in range(1, int(math.sqrt(n)) + 1):
-            if n % i == 0:
-                divs.add(i)
-                divs.add(n // i)
+    return {int(d): int(frequency[d]) for d in np.flatnonzero(frequency)}, len(distances)
 
-        _get_divisors.divisors[n] = list(divs)
 
-    return _get_divisors.divisors[n]
+class ColumnStatistics:
+    """
+    Class holding the letter counts of every column of a ciphertext, for every key length up to a
+    maximum.
+
+    Only the key lengths in (max_key_length / 2, max_key_length] are counted from the ciphertext,
+    with one `numpy.bincount` each. Every shorter length divides one of them, so its counts are
+    obtained by adding up columns (the column c of length L falls into the column c mod d of any
+    divisor d of L), without reading the ciphertext again. Counts are computed lazily and cached.
+
+    :ivar Language lang: The language of the plaintext.
+    :ivar int max_key_length: The longest key length covered.
+    :ivar np.ndarray indices: Positions in the alphabet of the letters counted.
+    :ivar np.ndarray positions: Position in the ciphertext of every letter counted.
+    """
+
+    def __init__(self, indices: np.ndarray, lang: Language, max_key_length: int, positions: np.ndarray = None):
+        """
+        Initialize a new ColumnStatistics instance.
+
+        :param np.ndarray indices: Positions in the alphabet of the letters of the ciphertext.
+        :param Language lang: The language of the plaintext.
+        :param int max_key_length: The longest key length covered.
+        :param np.ndarray, optional positions: Position in the ciphertext of every letter of `indices`,
+                                               if they are only a sample of it. By default, `indices`
+                                               is the whole ciphertext.
+        """
+        self.lang = lang
+        self.max_key_length = max(1, max_key_length)
+        self.indices = indices
+        self.positions = np.arange(len(indices)) if positions is None else positions
+        self._alphabet_size = alphabets.get_alphabet(lang).size
+        self._counts = dict()
+
+    def counts(self, key_length: int) -> np.ndarray:
+        """
+        Get the letter counts of every column of the ciphertext, for a given key length.
+
+        :param int key_length: The key length, between 1 and `max_key_length`.
+
+        :return: A key_length x alphabet size array, with the counts of column i in row i.
+        :rtype: np.ndarray
+
+        :raises ValueError: If the key length is not positive.
+        """
+        if key_length < 1:
+            raise ValueError(f"Key lengths must be positive, not {key_length}")
+
+        if key_length not in self._counts:
+            # The multiple of key_length in (max_key_length / 2, max_key_length]
+            base_length = key_length
+            while 2 * base_length <= self.max_key_length:
+                base_length *= 2
+
+            if base_length not in self._counts:
+                cells = (self.positions % base_length) * self._alphabet_size + self.indices
+                self._counts[base_length] = np.bincount(cells, minlength=base_length * self._alphabet_size) \
+                    .reshape(base_length, self._alphabet_size)
+
+            base_counts = self._counts[base_length]
+            self._counts[key_length] = base_counts.reshape(base_length // key_length, key_length, -1).sum(axis=0)
+
+        return self._counts[key_length]
+
+    def coincidence(self) -> np.ndarray:
+        """
+        Compute the average index of coincidence of the columns, for every key length.
+
+        :return: An array whose element L - 1 is the average index of coincidence of the columns for
+                 key length L (0 if no column has at least two letters).
+        :rtype: np.ndarray
+        """
+        # The columns of all the key lengths are stacked, so their coincidences are computed at once
+        lengths = range(1, self.max_key_length + 1)
+        counts = np.concatenate([self.counts(key_length) for key_length in lengths])
+        first_rows = np.cumsum([0, *lengths[:-1]])
+
+        totals = counts.sum(axis=1)
+        valid = totals > 1
+        coincidences = np.divide((counts * (counts - 1)).sum(axis=1),
+                                 totals * (totals - 1),
+                                 out=np.zeros(len(counts)),
+                                 where=valid)
+
+        valid_columns = np.add.reduceat(valid, first_rows)
+        return np.divide(np.add.reduceat(coincidences, first_rows),
+                         valid_columns,
+                         out=np.zeros(self.max_key_length),
+                         where=valid_columns > 0)
+
+    def shift_similarities(self, key_length: int) -> np.ndarray:
+        """
+        Compute, for every column, the similarity between its histogram and every shift of the
+        language histogram.
+
+        :param int key_length: The key length, between 1 and `max_key_length`.
+
+        :return: A key_length x alphabet size array, with the similarities of column i in row i.
+        :rtype: np.ndarray
+        """
+        return classiccrypto.utils.frequency.shift_similarities(
+            classiccrypto.utils.frequency.normalized_frequencies(self.counts(key_length)),
+            classiccrypto.utils.frequency.language_histogram(self.lang))
+
+    def best_shifts(self, key_length: int) -> np.ndarray:
+        """
+        Find, for every column, the shift which best matches its histogram with the language one.
+
+        :param int key_length: The key length, between 1 and `max_key_length`.
+
+        :return: An array with the most likely shift of every column.
+        :rtype: np.ndarray
+        """
+        return np.argmax(self.shift_similarities(key_length), axis=-1)
+
+
+def friedman_estimate(counts: np.ndarray, lang: Language) -> float:
+    """
+    Estimate the key length from the index of coincidence of the whole ciphertext (Friedman test).
 
+    :param np.ndarray counts: The number of occurrences of each letter in the ciphertext.
+    :param Language lang: The language of the plaintext.
 
-def get_separation_of_3_and_4_letter_blocks(msg: str) -> dict:
+    :return: The estimated key length, or 0 if the ciphertext is too short or too close to random
+             text for an estimate.
+    :rtype: float
     """
-    Determine the separations between all 3 and 4-letter blocks within a message.
+    n = alphabets.get_alphabet(lang).size
+    total = int(counts.sum())
+    if total < 2:
+        return 0
 
-    :param str msg: The message to analyze.
+    observed = float((counts * (counts - 1)).sum()) / (total * (total - 1))
+    language = language_coincidence(lang)
+    uniform = 1 / n
 
-    :return: A dictionary containing blocks as keys and lists of their respective separations as values.
-    :rtype: dict
+    denominator = (total - 1) * observed - total * uniform + language
+    if denominator <= 0:
+        return 0
 
-    :raises RuntimeError: If the message is too short to analyze.
+    return (language - uniform) * total / denominator
+
+
+def rank_key_lengths(ciphertext: str,
+                     lang: Language,
+                     max_key_length: int = DEFAULT_MAX_KEY_LENGTH,
+                     statistics: ColumnStatistics = None) -> list:
     """
-    if len(msg) < 8:
-        raise RuntimeError("Cannot analyse message, too short")
+    Rank the possible key lengths of a ciphertext, without any user interaction.
+
+    Three estimates are combined for every length L:
+    - The average index of coincidence of the L columns, rescaled so 0 is random text and 1 is the
+      language. It is high for the right length, but also for its multiples.
+    - The share of separations between repeated blocks which L divides (Kasiski examination). It is
+      high for the right length and its divisors, so it penalizes the multiples.
+    - The distance to the Friedman estimate, as a soft penalty (see FRIEDMAN_WEIGHT).
+
+    :param str ciphertext: The encrypted message.
+    :param Language lang: The language of the plaintext.
+    :param int, optional max_key_length: The longest key length considered. It is capped to half the
+                                         number of letters of the ciphertext.
+    :param ColumnStatistics, optional statistics: The column statistics of the ciphertext, if already
+                                                  computed. Their maximum key length overrides
+                                                  `max_key_length`.
+
+    :return: A list of (key length, score) pairs, sorted by decreasing score.
+    :rtype: list
+    """
+    if statistics is None:
+        indices = classiccrypto.utils.frequency.letter_indices(ciphertext, lang)
+        statistics = ColumnStatistics(indices, lang, min(max_key_length, len(indices) // 2))
+
+    n = alphabets.get_alphabet(lang).size
+    max_key_length = statistics.max_key_length
+    lengths = np.arange(1, max_key_length + 1)
+
+    uniform = 1 / n
+    with instrumentation.span('coincidence'):
+        coincidence = (statistics.coincidence() - uniform) / (language_coincidence(lang) - uniform)
+    scores = np.clip(coincidence, 0, 1)
+
+    # Repeated blocks are searched in the letters of the statistics, which may be only a sample
+    if len(statistics.indices) >= 8:
+        with instrumentation.span('kasiski'):
+            distances = kasiski.repeat_distances(statistics.indices, positions=statistics.positions)
+        if len(distances):
+            instrumentation.count('distances_tallied', len(distances))
+            with instrumentation.span('divisors'):
+                scores *= kasiski.divisor_frequency(distances, max_key_length)[1:] / len(distances)
+
+    # The Friedman test tends to underestimate long keys, so its weight is kept small
+    estimate = friedman_estimate(statistics.counts(1)[0], lang)
+    if estimate > 0:
+        scores /= 1 + FRIEDMAN_WEIGHT * np.log(lengths / estimate) ** 2
+
+    ranking = np.argsort(-scores, kind='stable')
+    return [(int(lengths[i]), float(scores[i])) for i in ranking]
+
+
+def guess_key_length(ciphertext: str, lang: Language, max_key_length: int = DEFAULT_MAX_KEY_LENGTH) -> int:
+    """
+    Estimate the most likely key length of a ciphertext, without any user interaction.
+
+    :param str ciphertext: The encrypted message.
+    :param Language lang: The language of the plaintext.
+    :param int, optional max_key_length: The longest key length considered.
+
+    :return: The most likely key length, according to `rank_key_lengths`.
+    :rtype: int
+    """
+    return rank_key_lengths(ciphertext, lang, max_key_length)[0][0]
+
 
-    latest_position = dict()
-    result = defaultdict(list)
+def refine_key(ciphertext: str,
+               key: VigenereKey,
+               model: NgramModel,
+               restarts: int = DEFAULT_RESTARTS,
+               workers: int = None) -> VigenereKey:
+    """
+    Refine a Vigenere key by hill climbing its letters against an n-gram language model.
 
-    for i in range(len(msg) - 3):
-        trigram = msg[i:i + 3]
-        quadrigram = msg[i:i + 4]
+    Cracking every column on its own ignores the letters around each one, so short texts often end
+    up with a few wrong key letters. Starting from `key`, every letter of the key is in turn replaced
+    by the one which makes the plaintext most likely according to `model`, until no change improves
+    it. Only the n-grams overlapping the column of the changed letter are scored again.
 
-        if trigram not in latest_position:
-            latest_position[trigram] = i
+    The first climb starts from `key`, and every other one from a copy of it with a third of its
+    letters replaced at random (with a fixed seed, so results are reproducible). The climbs run in a
+    pool of worker processes and the best result wins.
 
-        if quadrigram not in latest_position:
-            latest_position[quadrigram] = i
+    :param str ciphertext: The encrypted message.
+    :param VigenereKey key: The key to refine, e.g. the one found column by column.
+    :param NgramModel model: The language model scoring the candidate plaintexts.
+    :param int, optional restarts: Number of climbs. Defaults to DEFAULT_RESTARTS.
+    :param int, optional workers: Number of worker processes. Defaults to one per climb, up to the
+                                  number of CPUs. With a single climb or worker, no process is started.
 
-        trigram_distance = i - latest_position[trigram]
-        quadrigram_distance = i - latest_position[quadrigram]
+    :return: The refined key.
+    :rtype: VigenereKey
+    """
+    indices = classiccrypto.utils.frequency.letter_indices(ciphertext, key.lang)
+    alphabet = alphabets.get_alphabet(key.lang)
+    shifts = np.array([alphabet.index[letter] for letter in key.key], dtype=np.int64)
+
+    starting_points = [shifts]
+    for seed in range(1, restarts):
+        rng = np.random.default_rng(seed)
+        perturbed = shifts.copy()
+        columns = rng.choice(len(shifts), size=max(1, len(shifts) // 3), replace=False)
+        perturbed[columns] = rng.integers(alphabet.size, size=len(columns))
+        starting_points.append(perturbed)
+
+    instrumentation.count('climbs', len(starting_points))
+    workers = min(len(starting_points), workers or os.cpu_count())
+    if workers <= 1:
+        results = [_climb(indices, start, model) for start in starting_points]
+    else:
+        # Only refinements with several climbs and CPUs pay for loading the multiprocessing machinery
+        from concurrent.futures import ProcessPoolExecutor
 
-        if trigram_distance != 0:
-            result[trigram].append(trigram_distance)
-        if quadrigram_distance != 0:
-            result[quadrigram].append(quadrigram_distance)
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_climb_worker,
+                                 initargs=(indices, model)) as executor:
+            results = list(executor.map(_climb_in_worker, starting_points))
 
-    return result
+    # On ties, the earliest climb wins, so the column key is kept unless something beats it
+    best_score, best_shifts = max(results, key=lambda result: result[0])
+    return VigenereKey(''.join(alphabet.upper[shift] for shift in best_shifts), key.lang)
 
 
-def crack(ciphertext: str, lang: Language, no_gui=False, fast=False) -> VigenereKey:
+def _climb(indices: np.ndarray, shifts: np.ndarray, model: NgramModel) -> tuple:
+    """
+    Hill climb the shifts of a Vigenere key, one column at a time, until no change improves the score
+    of the plaintext.
+
+    :param np.ndarray indices: Positions in the alphabet of the letters of the ciphertext.
+    :param np.ndarray shifts: The shift of every column of the starting key.
+    :param NgramModel model: The language model scoring the candidate plaintexts.
+
+    :return: A tuple with the score of the final plaintext and the final shifts.
+    :rtype: tuple
+    """
+    size = alphabets.get_alphabet(model.lang).size
+    key_length = len(shifts)
+    shifts = shifts.copy()
+    plain = (indices - shifts[np.arange(len(indices)) % key_length]) % size
+    score = model.score(plain)
+
+    # For every column, the positions covered by the n-grams which contain any of its letters
+    last_start = len(indices) - model.n
+    windows = []
+    for column in range(key_length):
+        starts = np.arange(column, len(indices), key_length)[:, np.newaxis] - np.arange(model.n)
+        starts = np.unique(starts[(starts >= 0) & (starts <= last_start)])
+        positions = starts[:, np.newaxis] + np.arange(model.n)
+        windows.append((positions, positions % key_length == column))
+
+    improved = True
+    while improved:
+        improved = False
+        for column, (positions, in_column) in enumerate(windows):
+            if len(positions) == 0:
+                continue
+
+            window = plain[positions]
+            cipher_window = indices[positions]
+
+            totals = np.empty(size)
+            for shift in range(size):
+                candidate = np.where(in_column, (cipher_window - shift) % size, window)
+                totals[shift] = model.log_probabilities[model.codes(candidate)].sum()
+            instrumentation.count('keys_tried', size)
+
+            best = int(np.argmax(totals))
+            if totals[best] > totals[shifts[column]] + 1e-9:
+                score += totals[best] - totals[shifts[column]]
+                shifts[column] = best
+                plain[column::key_length] = (indices[column::key_length] - best) % size
+                improved = True
+
+    return score, shifts
+
+
+def _init_climb_worker(indices: np.ndarray, model: NgramModel):
+    """
+    Keep the ciphertext and the model of the climbs in a worker process, so they are only sent once.
+    """
+    _climb_in_worker.state = (indices, model)
+
+
+def _climb_in_worker(shifts: np.ndarray) -> tuple:
+    indices, model = _climb_in_worker.state
+    return _climb(indices, shifts, model)
+
+
+def language_coincidence(lang: Language) -> float:
+    """
+    Index of coincidence of a language: the probability that two random letters of a text are the same.
+
+    :param Language lang: The language.
+
+    :return: The sum of the squared letter frequencies of the language.
+    :rtype: float
+    """
+    values = classiccrypto.utils.frequency.language_histogram(lang).values
+    return float(np.dot(values, values))
+
+
+def crack(ciphertext: str,
+          lang: Language,
+          no_gui=False,
+          fast=False,
+          key_length: int = None,
+          auto=False,
+          max_key_length: int = DEFAULT_MAX_KEY_LENGTH,
+          ngram_model: NgramModel = None,
+          restarts: int = DEFAULT_RESTARTS,
+          sampling: SamplingPolicy = None,
+          workers: int = None) -> VigenereKey:
     """
     Attempt to crack a ciphertext encrypted with the Vigenere cipher using statistical analysis.
 
@@ -88,20 +422,277 @@ def crack(ciphertext: str, lang: Language, no_gui=False, fast=False) -> Vigenere
     :param Language lang: The language object to be used for decryption.
     :param bool, optional no_gui: If True, utilize CLI for displaying histograms instead of GUI. Defaults to False.
     :param bool, optional fast: If True, utilize fast cracking methods. Defaults to False.
+    :param int, optional key_length: Length of the key. If not provided, it is estimated automatically
+                                     or asked to the user, depending on `auto`.
+    :param bool, optional auto: If True, and `key_length` is not provided, select the most likely key
+                                length without user interaction. Otherwise, the candidate key lengths
+                                are displayed and the user is asked to select one. Defaults to False.
+    :param int, optional max_key_length: The longest key length considered by the automatic estimation.
+    :param NgramModel, optional ngram_model: If provided, the key found column by column is refined by
+                                             hill climbing against this model (see `refine_key`).
+    :param int, optional restarts: Number of hill climbs run when refining the key.
+    :param SamplingPolicy, optional sampling: If provided, the key length and the key are found on
+                                              growing samples of the ciphertext, until the best key
+                                              length and the best shift of every column are clear
+                                              (see `_crack_sampled`).
+    :param int, optional workers: Number of worker processes running the hill climbs, as in `refine_key`.
+                                  Callers which already run in a pool of workers should pass 1.
 
     :return: The most likely key to have been used for the encryption.
     :rtype: VigenereKey
+
+    :raises ValueError: If the key length is not positive.
+    """
+    _check_key_length(key_length)
+
+    similarities = None
+    if sampling is not None:
+        if key_length is None and not auto:
+            key_length = _ask_key_length(ciphertext, lang, no_gui)
+        with instrumentation.span('sampling'):
+            similarities, sample_size = _crack_sampled(ciphertext, lang, key_length, max_key_length, sampling)
+
+    if similarities is None:
+        statistics, key_length = _column_statistics(ciphertext, lang, no_gui, key_length, auto, max_key_length)
+
+        # Every column of the key is a Caesar cipher: crack all of them at once, matching the histogram
+        # of each column against every shift of the language histogram
+        with instrumentation.span('columns'):
+            steps = statistics.best_shifts(key_length)
+        instrumentation.count('keys_tried', key_length * alphabets.get_alphabet(lang).size)
+    else:
+        steps = np.argmax(similarities, axis=-1)
+        # The refinement only needs enough text to tell the key letters apart, and a prefix of the
+        # ciphertext keeps the columns aligned
+        ciphertext = ciphertext[:sample_size]
+
+    alphabet = alphabets.alphabet(lang, LetterCase.UPPER)
+    key = VigenereKey(''.join(alphabet[step] for step in steps), lang)
+
+    if ngram_model is not None:
+        with instrumentation.span('refine'):
+            key = refine_key(ciphertext, key, ngram_model, restarts, workers)
+
+    return key
+
+
+def _crack_sampled(ciphertext: str,
+                   lang: Language,
+                   key_length: int,
+                   max_key_length: int,
+                   sampling: SamplingPolicy) -> tuple:
+    """
+    Score the shifts of every column of the key on growing samples of a ciphertext.
+
+    Samples keep the position of their letters, so their columns are those of the whole ciphertext.
+    A sample is conclusive when, if the key length is not given, the best key length beats the
+    second-best one by the margin of the policy, and the best shift of every column beats the
+    second-best one by that margin too.
+
+    :param str ciphertext: The encrypted message.
+    :param Language lang: The language of the plaintext.
+    :param int key_length: Length of the key, or None to estimate it on every sample.
+    :param int max_key_length: The longest key length considered by the automatic estimation.
+    :param SamplingPolicy sampling: The sampling policy.
+
+    :return: A tuple with the key length x alphabet size array of the similarities of every shift of
+             every column on the conclusive sample, and the size of the sample, or (None, None) if no
+             sample smaller than the ciphertext is conclusive.
+    :rtype: tuple
+    """
+    for sample in sampling.samples(ciphertext, lang):
+        instrumentation.count('samples')
+        instrumentation.count('letters_sampled', len(sample))
+        statistics = ColumnStatistics(sample.indices,
+                                      lang,
+                                      key_length or min(max_key_length, len(sample) // 2),
+                                      sample.positions)
+
+        sample_key_length = key_length
+        if sample_key_length is None:
+            ranking = rank_key_lengths(ciphertext, lang, statistics=statistics)
+            if not sampling.confident(np.array([score for _, score in ranking])):
+                continue
+            sample_key_length = ranking[0][0]
+
+        similarities = statistics.shift_similarities(sample_key_length)
+        instrumentation.count('keys_tried', similarities.size)
+        if sampling.confident(similarities):
+            return similarities, len(sample)
+
+    return None, None
+
+
+def crack_top_k(ciphertext: str,
+                lang: Language,
+                k: int,
+                no_gui=False,
+                key_length: int = None,
+                auto=False,
+                max_key_length: int = DEFAULT_MAX_KEY_LENGTH,
+                ngram_model: NgramModel = None,
+                restarts: int = DEFAULT_RESTARTS,
+                sampling: SamplingPolicy = None,
+                workers: int = None) -> list:
+    """
+    Rank the Vigenere keys most likely to have been used for the encryption, for a single key length.
+
+    The key length is selected as in `crack`. Every key is scored by the average similarity of its
+    columns to the language histogram, and the k best combinations of column shifts are enumerated
+    best-first, so the first key is the one `crack` finds column by column.
+
+    If an n-gram model is provided, the refined key (see `refine_key`) joins the candidates, and all
+    of them are scored instead by the average log-probability of the n-grams of their plaintext.
+
+    :param str ciphertext: The encrypted message.
+    :param Language lang: The language object to be used for decryption.
+    :param int k: The maximum number of keys returned.
+    :param bool, optional no_gui: If True, utilize CLI for displaying histograms instead of GUI. Defaults to False.
+    :param int, optional key_length: Length of the key, as in `crack`.
+    :param bool, optional auto: Whether the key length is estimated automatically, as in `crack`.
+    :param int, optional max_key_length: The longest key length considered by the automatic estimation.
+    :param NgramModel, optional ngram_model: The language model used to refine and score the keys.
+    :param int, optional restarts: Number of hill climbs run when refining the key.
+    :param SamplingPolicy, optional sampling: If provided, the key length and the keys are scored on
+                                              the first conclusive sample of the ciphertext, as in
+                                              `crack`.
+    :param int, optional workers: Number of worker processes running the hill climbs, as in `crack`.
+
+    :return: A list of at most k (key, score) pairs, sorted by decreasing score.
+    :rtype: list
+
+    :raises ValueError: If the key length is not positive.
+    """
+    _check_key_length(key_length)
+
+    similarities = None
+    if sampling is not None:
+        if key_length is None and not auto:
+            key_length = _ask_key_length(ciphertext, lang, no_gui)
+        with instrumentation.span('sampling'):
+            similarities, sample_size = _crack_sampled(ciphertext, lang, key_length, max_key_length, sampling)
+
+    if similarities is None:
+        statistics, key_length = _column_statistics(ciphertext, lang, no_gui, key_length, auto, max_key_length)
+        with instrumentation.span('columns'):
+            similarities = statistics.shift_similarities(key_length)
+        instrumentation.count('keys_tried', key_length * alphabets.get_alphabet(lang).size)
+    else:
+        # As in `crack`, the keys are refined and scored on the prefix of the conclusive sample's size
+        key_length = len(similarities)
+        ciphertext = ciphertext[:sample_size]
+
+    alphabet = alphabets.alphabet(lang, LetterCase.UPPER)
+    candidates = [(''.join(alphabet[step] for step in steps), total / key_length)
+                  for total, steps in _best_combinations(similarities, k)]
+
+    if ngram_model is None:
+        return [(VigenereKey(letters, lang), score) for letters, score in candidates]
+
+    with instrumentation.span('refine'):
+        refined = refine_key(ciphertext, VigenereKey(candidates[0][0], lang), ngram_model, restarts, workers)
+
+    indices = classiccrypto.utils.frequency.letter_indices(ciphertext, lang)
+    ngram_count = max(1, len(indices) - ngram_model.n + 1)
+    size = alphabets.get_alphabet(lang).size
+    alphabet_index = alphabets.get_alphabet(lang).index
+
+    best = TopK(k)
+    for letters in dict.fromkeys([refined.key] + [letters for letters, _ in candidates]):
+        shifts = np.array([alphabet_index[letter] for letter in letters])
+        plain = (indices - shifts[np.arange(len(indices)) % len(shifts)]) % size
+        best.push(ngram_model.score(plain) / ngram_count, letters)
+
+    return [(VigenereKey(letters, lang), score) for letters, score in best.items()]
+
+
+def _check_key_length(key_length: int | None):
+    if key_length is not None and key_length < 1:
+        raise ValueError(f"Key lengths must be positive, not {key_length}")
+
+
+def _column_statistics(ciphertext: str,
+                       lang: Language,
+                       no_gui: bool,
+                       key_length: int,
+                       auto: bool,
+                       max_key_length: int) -> tuple:
+    """
+    Select the key length, if not given, and get the column statistics of the ciphertext for it.
+
+    :return: A tuple with the ColumnStatistics and the key length.
+    :rtype: tuple
+    """
+    indices = classiccrypto.utils.frequency.letter_indices(ciphertext, lang)
+    statistics = None
+
+    if key_length is None:
+        if auto:
+            with instrumentation.span('key_length'):
+                statistics = ColumnStatistics(indices, lang, min(max_key_length, len(indices) // 2))
+                key_length = rank_key_lengths(ciphertext, lang, statistics=statistics)[0][0]
+        else:
+            key_length = _ask_key_length(ciphertext, lang, no_gui)
+
+    if statistics is None or key_length > statistics.max_key_length:
+        statistics = ColumnStatistics(indices, lang, key_length)
+
+    return statistics, key_length
+
+
+def _best_combinations(scores: np.ndarray, k: int):
+    """
+    Enumerate the combinations of one choice per row of a score matrix, by decreasing total score.
+
+    The search is best-first: starting from the best choice of every row, each combination taken out
+    of the heap pushes the ones which take the next best choice in a single row, so only O(k * rows)
+    combinations are ever built.
+
+    :param np.ndarray scores: A matrix with the score of every choice (column) of every row.
+    :param int k: The maximum number of combinations.
+
+    :return: An iterator over (total score, choices) pairs, where choices is an array with the
+             column chosen in every row.
+    :rtype: Iterator[tuple]
     """
-    # Find separation for all 3 and 4 letter sequences
-    distance_between_occurrences = get_separation_of_3_and_4_letter_blocks(ciphertext)
-    divisor_frequency = defaultdict(int)
-    processed_distances = 0
+    rows, choices = scores.shape
+    order = np.argsort(-scores, axis=1, kind='stable')
+    sorted_scores = np.take_along_axis(scores, order, axis=1).tolist()
 
-    for _, distance_list in distance_between_occurrences.items():
-        for distance in distance_list:
-            processed_distances += 1
-            for divisor in _get_divisors(distance):
-                divisor_frequency[divisor] += 1
+    start = (0,) * rows
+    heap = [(-sum(row[0] for row in sorted_scores), start)]
+    seen = {start}
+
+    for _ in range(k):
+        if not heap:
+            return
+
+        negative_total, ranks = heapq.heappop(heap)
+        yield -negative_total, order[np.arange(rows), ranks]
+
+        for row in range(rows):
+            rank = ranks[row]
+            if rank + 1 < choices:
+                successor = ranks[:row] + (rank + 1,) + ranks[row + 1:]
+                if successor not in seen:
+                    seen.add(successor)
+                    total = negative_total + sorted_scores[row][rank] - sorted_scores[row][rank + 1]
+                    heapq.heappush(heap, (total, successor))
+
+
+def _ask_key_length(ciphertext: str, lang: Language, no_gui: bool) -> int:
+    """
+    Display the most likely key lengths, according to the Kasiski examination, and ask the user to
+    select one.
+
+    :param str ciphertext: The encrypted message.
+    :param Language lang: The language of the plaintext.
+    :param bool no_gui: If True, utilize CLI for displaying histograms instead of GUI.
+
+    :return: The key length selected by the user.
+    :rtype: int
+    """
+    divisor_frequency, _ = kasiski_divisor_frequency(ciphertext, lang)
 
     print('Here are the top 20 candidates for key length')
 
@@ -114,20 +705,18 @@ def crack(ciphertext: str, lang: Language, no_gui=False, fast=False) -> Vigenere
         histogram_orientation = cli.histogram.AsciiHistogramDisplayMode.VERTICAL
         cli.histogram.display_ascii_histogram(top_items(divisor_frequency), histogram_orientation)
     else:
-        gui.histogram.display_histogram_figure_in_popup(top_items(divisor_frequency))
+        # matplotlib and tkinter take longer to import than the whole cracking, so they are only
+        # loaded when a histogram is actually displayed
+        from classiccrypto.utils.gui import histogram
+        histogram.display_histogram_figure_in_popup(top_items(divisor_frequency))
 
     while True:
         try:
             key_length = int(input("Selected key length: "))
-            break
+            if key_length >= 1:
+                break
+            print("Key lengths must be positive.")
         except ValueError:
             print("Invalid key.")
 
-    guessed_key = []
-
-    for i in range(key_length):
-        every_nth_letter = ciphertext[i::key_length]
-        caesar_key = classiccrypto.cryptoschemes.cracking.caesar.crack(every_nth_letter, lang, fast)
-        guessed_key.append(alphabets.alphabet(lang, LetterCase.UPPER)[caesar_key.key])
-
-    return VigenereKey(''.join(guessed_key), lang)
+    return key_length
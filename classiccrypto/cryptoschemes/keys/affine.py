@@ -1,3 +1,6 @@
+import math
+import re
+
 from classiccrypto.cryptoschemes.keys.cipherkey import Cipherkey
 from classiccrypto.utils import Language
 
@@ -14,6 +17,8 @@ class AffineKey(Cipherkey):
     :ivar Language lang: Language to be used when using this key
     """
 
+    __slots__ = ('a', 'b')
+
     def __init__(self, a: int, b: int, lang: Language):
         """
         Initialize a new AffineKey instance.
@@ -26,6 +31,36 @@ class AffineKey(Cipherkey):
         self.a = a
         self.b = b
 
+    @staticmethod
+    def from_string(s: str, lang: Language) -> "AffineKey":
+        """
+        Create an AffineKey from its string representation.
+
+        Both the output of `to_string` ("a: 5; b: 8") and a plain pair of integers ("5,8") are accepted.
+
+        :param str s: String representation of the key.
+        :param Language lang: Language to be used when using the key.
+
+        :return: The corresponding key.
+        :rtype: AffineKey
+
+        :raises ValueError: If the string does not contain exactly two integers, or if 'a' is not
+                            coprime with the size of the alphabet, so the key could not be decrypted.
+        """
+        values = re.findall(r'-?\d+', s)
+        if len(values) != 2:
+            raise ValueError(f"Invalid affine key: {s}")
+
+        # The alphabets module refers to AffineKey, so it can only be imported once this one is loaded
+        from classiccrypto.utils import alphabets
+
+        a, b = int(values[0]), int(values[1])
+        size = alphabets.get_alphabet(lang).size
+        if math.gcd(a, size) != 1:
+            # This key does not result in a bijective transformation
+            raise ValueError(f"Invalid affine key: a = {a} has no inverse modulo {size}")
+        return AffineKey(a, b, lang)
+
     def to_string(self) -> str:
         """
         Generate a string representation of the Affine cipher key.
@@ -13,6 +13,8 @@ class CaesarKey(Cipherkey):
     :ivar Language lang: Language to be used when using this key
     """
 
+    __slots__ = ('key',)
+
     def __init__(self, key: int, lang: Language):
         """
         Initialize a new CaesarKey instance.
@@ -23,6 +25,21 @@ class CaesarKey(Cipherkey):
         super().__init__(lang)
         self.key = key
 
+    @staticmethod
+    def from_string(s: str, lang: Language) -> "CaesarKey":
+        """
+        Create a CaesarKey from its string representation.
+
+        :param str s: String representation of the shift value (e.g. "3").
+        :param Language lang: Language to be used when using the key.
+
+        :return: The corresponding key.
+        :rtype: CaesarKey
+
+        :raises ValueError: If the string is not an integer.
+        """
+        return CaesarKey(int(s), lang)
+
     def to_string(self) -> str:
         """
         Generate a string representation of the Caesar cipher key.
@@ -12,6 +12,8 @@ class Cipherkey(ABC):
     :ivar Language lang: Language to be used when using this key
     """
 
+    __slots__ = ('lang',)
+
     def __init__(self, lang: Language):
         """
         Initializes a new instance of the Cipherkey class.
@@ -1,5 +1,5 @@
 from classiccrypto.cryptoschemes.keys.cipherkey import Cipherkey
-from classiccrypto.utils import alphabets, LetterCase, Language
+from classiccrypto.utils import alphabets, Language
 
 
 class VigenereKey(Cipherkey):
@@ -14,6 +14,8 @@ class VigenereKey(Cipherkey):
     :ivar Language lang: Language to be used when using this key
     """
 
+    __slots__ = ('key', 'key_as_offset')
+
     def __init__(self, key: str, lang: Language):
         """
         Initialize a new VigenereKey instance.
@@ -25,13 +27,31 @@ class VigenereKey(Cipherkey):
         """
         super().__init__(lang)
         self.key = key
-        self.key_as_offset = list()
 
         if not self.key:
             self.key_as_offset = [0]
+            return
+
+        index = alphabets.get_alphabet(lang).index
+        try:
+            self.key_as_offset = [index[c] for c in key]
+        except KeyError as e:
+            raise ValueError(f"Invalid character in key: {e.args[0]}")
+
+    @staticmethod
+    def from_string(s: str, lang: Language) -> "VigenereKey":
+        """
+        Create a VigenereKey from its string representation.
 
-        alphabet = alphabets.alphabet(lang, LetterCase.UPPER)
-        self.key_as_offset = [alphabet.index(c.upper()) for c in key]
+        :param str s: The letters of the key.
+        :param Language lang: Language to be used when using the key.
+
+        :return: The corresponding key.
+        :rtype: VigenereKey
+
+        :raises ValueError: If `s` contains invalid characters.
+        """
+        return VigenereKey(s, lang)
 
     def to_string(self) -> str:
         """
@@ -0,0 +1,28 @@
+from classiccrypto.cryptoschemes.keys.affine import AffineKey
+from classiccrypto.cryptoschemes.keys.caesar import CaesarKey
+from classiccrypto.cryptoschemes.keys.cipherkey import Cipherkey
+from classiccrypto.cryptoschemes.keys.vigenere import VigenereKey
+from classiccrypto.utils import Cryptoscheme, Language
+
+
+def key_from_string(scheme: Cryptoscheme, s: str, lang: Language) -> Cipherkey:
+    """
+    Create a key for a given cryptoscheme from its string representation.
+
+    :param Cryptoscheme scheme: The cryptoscheme the key belongs to.
+    :param str s: String representation of the key, as accepted by the `from_string` method of the key class.
+    :param Language lang: Language to be used when using the key.
+
+    :return: The corresponding key.
+    :rtype: Cipherkey
+
+    :raises ValueError: If the string is not a valid key for the cryptoscheme.
+    """
+    if scheme == Cryptoscheme.CAESAR:
+        return CaesarKey.from_string(s, lang)
+    elif scheme == Cryptoscheme.AFFINE:
+        return AffineKey.from_string(s, lang)
+    elif scheme == Cryptoscheme.VIGENERE:
+        return VigenereKey.from_string(s, lang)
+    else:
+        raise ValueError('Invalid scheme: ' + str(scheme))
@@ -0,0 +1,139 @@
+from typing import IO, Iterable, Iterator
+
+from classiccrypto.cryptoschemes import affine, caesar, vigenere
+from classiccrypto.cryptoschemes.keys.affine import AffineKey
+from classiccrypto.cryptoschemes.keys.caesar import CaesarKey
+from classiccrypto.cryptoschemes.keys.cipherkey import Cipherkey
+from classiccrypto.cryptoschemes.keys.vigenere import VigenereKey
+from classiccrypto.utils import Mode, Engine
+from classiccrypto.utils import buffers
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class StreamTranslator:
+    """
+    Class translating (encrypting/decrypting) a message which is fed in consecutive chunks.
+
+    The translator keeps whatever state the cipher needs between chunks (e.g. the number of letters
+    already processed by the Vigenere cipher), so the concatenation of the translated chunks is
+    always equal to the translation of the whole message. Every chunk is translated as soon as it is
+    fed, so the translator never holds back any text and the message needs no explicit end.
+
+    Chunks can be strings or Latin-1 byte buffers, and are translated into the same type.
+
+    :ivar Cipherkey key: The key to be used for translation.
+    :ivar Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
+    :ivar Engine engine: The implementation used by the ciphers which support several of them.
+    :ivar int processed_letters: Number of letters translated so far (only tracked for Vigenere).
+    """
+
+    def __init__(self, key: Cipherkey, mode: Mode, engine: Engine = Engine.NUMPY):
+        """
+        Initialize a new StreamTranslator instance.
+
+        :param Cipherkey key: The key to be used for translation.
+        :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
+        :param Engine, optional engine: The implementation used by the ciphers which support several
+                                        of them. Defaults to NUMPY.
+
+        :raises ValueError: If the type of `key` does not belong to a known cipher.
+        """
+        if not isinstance(key, (CaesarKey, AffineKey, VigenereKey)):
+            raise ValueError(f"Unsupported key: {type(key).__name__}")
+
+        self.key = key
+        self.mode = mode
+        self.engine = engine
+        self.processed_letters = 0
+
+    def feed(self, chunk: str | bytes) -> str | bytearray:
+        """
+        Translate the next chunk of the message.
+
+        :param str | bytes chunk: The next chunk of the message.
+
+        :return: The translated chunk.
+        :rtype: str | bytearray
+        """
+        if isinstance(self.key, VigenereKey):
+            result, self.processed_letters = vigenere.translate_chunk(chunk,
+                                                                      self.key,
+                                                                      self.mode,
+                                                                      self.processed_letters,
+                                                                      self.engine)
+            return result
+        elif isinstance(self.key, AffineKey):
+            return affine.translate(chunk, self.key, self.mode)
+        else:
+            return caesar.translate(chunk, self.key, self.mode)
+
+
+def read_chunks(src: IO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator:
+    """
+    Read a text or binary file in chunks of bounded size.
+
+    :param IO src: The file to be read.
+    :param int, optional chunk_size: Maximum number of characters (or bytes) of each chunk.
+
+    :return: An iterator over the chunks of the file.
+    :rtype: Iterator[str | bytes]
+    """
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def translate_stream(chunks: Iterable, key: Cipherkey, mode: Mode, engine: Engine = Engine.NUMPY) -> Iterator:
+    """
+    Translate (encrypt/decrypt) a message given as an iterable of chunks, one chunk at a time.
+
+    :param Iterable[str | bytes] chunks: The consecutive chunks of the message.
+    :param Cipherkey key: The key to be used for translation.
+    :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
+    :param Engine, optional engine: The implementation used by the ciphers which support several of them.
+
+    :return: An iterator over the translated chunks.
+    :rtype: Iterator[str | bytearray]
+    """
+    translator = StreamTranslator(key, mode, engine)
+    for chunk in chunks:
+        yield translator.feed(chunk)
+
+
+def translate_file(src_path: str,
+                   dst_path: str,
+                   key: Cipherkey,
+                   mode: Mode,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   encoding: str = 'utf-8') -> int:
+    """
+    Translate (encrypt/decrypt) a text file into another one, using a bounded amount of memory.
+
+    Line endings are kept as they are in the source file. If the letters of the file are single bytes
+    in the given encoding (see `buffers.is_byte_compatible`), the file is processed as a byte buffer
+    and never decoded.
+
+    :param str src_path: The path to the file to be translated.
+    :param str dst_path: The path to the file where the translation is written.
+    :param Cipherkey key: The key to be used for translation.
+    :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
+    :param int, optional chunk_size: Maximum number of characters held in memory at once.
+    :param str, optional encoding: The encoding of both files. Defaults to UTF-8.
+
+    :return: The number of characters translated (or bytes, if the file was processed as a byte buffer).
+    :rtype: int
+    """
+    binary = buffers.is_byte_compatible(encoding, key.lang)
+    text_options = dict() if binary else {'encoding': encoding, 'newline': ''}
+
+    translated_characters = 0
+    with (open(src_path, 'rb' if binary else 'r', **text_options) as src,
+          open(dst_path, 'wb' if binary else 'w', **text_options) as dst):
+        for translated in translate_stream(read_chunks(src, chunk_size), key, mode):
+            dst.write(translated)
+            translated_characters += len(translated)
+
+    return translated_characters
@@ -1,51 +1,141 @@
+import functools
+
+import numpy as np
+
 from classiccrypto.cryptoschemes.keys.vigenere import VigenereKey
-from classiccrypto.utils import Mode
+from classiccrypto.utils import Mode, Engine
 from classiccrypto.utils import alphabets
+from classiccrypto.utils import buffers
+from classiccrypto.utils import LetterCase, Language
 
 
-def encrypt(message: str, key: VigenereKey) -> str:
+def encrypt(message: str | bytes, key: VigenereKey) -> str | bytearray:
     """
     Encrypt a message using the Vigenere cipher with the provided key.
 
-    :param str message: The plaintext message to be encrypted.
+    :param str | bytes message: The plaintext message to be encrypted.
     :param VigenereKey key: The key (containing the shift value and language) to be used for encryption.
 
     :return: The encrypted message.
-    :rtype: str
+    :rtype: str | bytearray
     """
     return translate(message, key, Mode.ENCRYPTION)
 
 
-def decrypt(message: str, key: VigenereKey) -> str:
+def decrypt(message: str | bytes, key: VigenereKey) -> str | bytearray:
     """
     Decrypt a message using the Vigenere cipher with the provided key.
 
-    :param str message: The ciphertext message to be decrypted.
+    :param str | bytes message: The ciphertext message to be decrypted.
     :param VigenereKey key: The key (containing the shift value and language) to be used for decryption.
 
     :return: The decrypted message.
-    :rtype: str
+    :rtype: str | bytearray
     """
     return translate(message, key, Mode.DECRYPTION)
 
 
-def translate(message: str, key: VigenereKey, mode: Mode) -> str:
+def translate(message: str | bytes,
+              key: VigenereKey,
+              mode: Mode,
+              engine: Engine = Engine.PYTHON) -> str | bytearray:
     """
     Translate (encrypt/decrypt) a message using the Vigenere cipher based on the provided key and mode.
 
     This function performs the encryption or decryption (based on `mode`) by shifting each letter
     in `message` by the shift value defined in `key`.
 
-    :param str message: The message to be translated.
+    Both engines produce exactly the same output. The NUMPY engine is meant for large messages, where
+    it is orders of magnitude faster than the character by character PYTHON engine.
+
+    :param str | bytes message: The message to be translated. Byte buffers (bytes, bytearray, memoryview or
+                                 mmap) are interpreted as Latin-1 text, see `translate_buffer`.
+    :param VigenereKey key: The key (containing the shift value and language) to be used for translation.
+    :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
+    :param Engine, optional engine: The implementation used for string messages. Defaults to PYTHON.
+
+    :return: The translated message, as a string or as a bytearray if `message` is a byte buffer.
+    :rtype: str | bytearray
+    """
+    return translate_chunk(message, key, mode, engine=engine)[0]
+
+
+def translate_chunk(message: str | bytes,
+                    key: VigenereKey,
+                    mode: Mode,
+                    processed_letters: int = 0,
+                    engine: Engine = Engine.PYTHON) -> tuple:
+    """
+    Translate (encrypt/decrypt) a chunk of a longer message using the Vigenere cipher.
+
+    Unlike Caesar or Affine, the Vigenere cipher is not applied independently to each character: the
+    key letter used for each letter depends on how many letters preceded it. This function receives
+    that number and returns it updated, so a message split in consecutive chunks is translated
+    exactly as if it had been translated at once.
+
+    :param str | bytes message: The chunk to be translated, either a string or a Latin-1 byte buffer.
     :param VigenereKey key: The key (containing the shift value and language) to be used for translation.
     :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
+    :param int, optional processed_letters: Number of letters in the previous chunks. Defaults to 0.
+    :param Engine, optional engine: The implementation used for string messages. Defaults to PYTHON.
+
+    :return: A tuple with the translated chunk and the number of letters processed so far.
+    :rtype: tuple
+    """
+    if buffers.is_buffer(message):
+        return _translate_buffer(message, key.lang, key_offsets(key, mode), processed_letters)
+    if engine == Engine.NUMPY:
+        return _translate_numpy(message, key.lang, key_offsets(key, mode), processed_letters)
+    return _translate_python(message, key, mode, processed_letters)
+
+
+def translate_buffer(buffer, key: VigenereKey, mode: Mode, out=None) -> bytearray:
+    """
+    Translate (encrypt/decrypt) a Latin-1 encoded byte buffer using the Vigenere cipher.
+
+    The buffer is never decoded: NumPy views over its bytes are translated in blocks of bounded size,
+    which makes this the fastest way to process large ASCII or Latin-1 files (e.g. through an mmap
+    object).
+
+    :param buffer: The message to be translated, as a bytes, bytearray, memoryview or mmap object.
+    :param VigenereKey key: The key to be used for translation.
+    :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
+    :param out: Optional writable buffer, of the same length as `buffer`, where the result is written.
+
+    :return: The buffer holding the translated message.
+    :rtype: bytearray
+    """
+    return _translate_buffer(buffer, key.lang, key_offsets(key, mode), 0, out)[0]
+
+
+def key_offsets(key: VigenereKey, mode: Mode) -> np.ndarray:
+    """
+    Get the shift applied to each letter of the key, signed according to the mode of translation.
+
+    :param VigenereKey key: The key to be used for translation.
+    :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
+
+    :return: An array with the shift for every letter of the key.
+    :rtype: np.ndarray
+    """
+    offsets = np.array(key.key_as_offset, dtype=np.int64)
+    return -offsets if mode == Mode.DECRYPTION else offsets
+
+
+def _translate_python(message: str, key: VigenereKey, mode: Mode, processed_letters: int) -> tuple:
+    """
+    Translate a message with the Vigenere cipher, one character at a time.
+
+    :param str message: The message to be translated.
+    :param VigenereKey key: The key to be used for translation.
+    :param Mode mode: The mode of translation - can be either ENCRYPTION or DECRYPTION.
+    :param int processed_letters: Number of letters translated before this message.
 
-    :return: The translated message.
-    :rtype: str
+    :return: A tuple with the translated message and the number of letters processed so far.
+    :rtype: tuple
     """
     result = []
 
-    processed_letters = 0
     for index in range(len(message)):
         to_translate = message[index]
 
@@ -62,4 +152,120 @@ def translate(message: str, key: VigenereKey, mode: Mode) -> str:
                                            offset)
         processed_letters += 1
 
-    return ''.join(result)
+    return ''.join(result), processed_letters
+
+
+def _translate_numpy(message: str, lang: Language, offsets: np.ndarray, processed_letters: int) -> tuple:
+    """
+    Translate a message with the Vigenere cipher using vectorized NumPy operations.
+
+    The message is mapped to an array of alphabet indices once, and the periodic key offsets are
+    added to (or subtracted from) all of its letters at the same time. Letter case and characters
+    outside of the alphabet are preserved.
+
+    :param str message: The message to be translated.
+    :param Language lang: The language of the key.
+    :param np.ndarray offsets: The signed shift for every letter of the key (see `key_offsets`).
+    :param int processed_letters: Number of letters translated before this message.
+
+    :return: A tuple with the translated message and the number of letters processed so far.
+    :rtype: tuple
+    """
+    letter_indices, uppercase, upper_letters, lower_letters = _lookup_tables(lang)
+
+    code_points = np.frombuffer(message.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    latin1 = code_points < len(letter_indices)
+
+    indices = letter_indices[np.where(latin1, code_points, 0)]
+    is_letter = indices >= 0
+
+    # A few characters outside of Latin-1 (e.g. the Kelvin sign) are considered part of the alphabet
+    # because of their lower case, so they consume a key letter even though they are not shifted
+    is_counted = is_letter
+    others = np.unique(code_points[~latin1])
+    counted_others = [c for c in others.tolist() if alphabets.is_in_alphabet(lang, chr(c))]
+    if counted_others:
+        is_counted = is_letter | np.isin(code_points, counted_others)
+
+    counted_letters = np.cumsum(is_counted)
+    letter_number = processed_letters + counted_letters[is_letter] - 1
+    shifted = (indices[is_letter] + offsets[letter_number % len(offsets)]) % len(upper_letters)
+
+    result = code_points.copy()
+    result[is_letter] = np.where(uppercase[code_points[is_letter]],
+                                 upper_letters[shifted],
+                                 lower_letters[shifted])
+
+    total_letters = processed_letters + (int(counted_letters[-1]) if len(counted_letters) else 0)
+    return result.tobytes().decode('utf-32-le', 'surrogatepass'), total_letters
+
+
+def _translate_buffer(buffer, lang: Language, offsets: np.ndarray, processed_letters: int, out=None) -> tuple:
+    """
+    Translate a Latin-1 encoded byte buffer with the Vigenere cipher using vectorized NumPy operations.
+
+    :param buffer: The message to be translated, as a bytes, bytearray, memoryview or mmap object.
+    :param Language lang: The language of the key.
+    :param np.ndarray offsets: The signed shift for every letter of the key (see `key_offsets`).
+    :param int processed_letters: Number of letters translated before this message.
+    :param out: Optional writable buffer, of the same length as `buffer`, where the result is written.
+
+    :return: A tuple with the buffer holding the translated message and the number of letters
+             processed so far.
+    :rtype: tuple
+    """
+    letter_indices, uppercase, upper_letters, lower_letters = _lookup_tables(lang)
+
+    src = buffers.as_array(buffer)
+    if out is None:
+        out = bytearray(len(src))
+    dst = buffers.as_array(out)
+
+    for start in range(0, len(src), buffers.BLOCK_SIZE):
+        src_block = src[start:start + buffers.BLOCK_SIZE]
+        dst_block = dst[start:start + buffers.BLOCK_SIZE]
+
+        indices = letter_indices[src_block]
+        is_letter = indices >= 0
+        letters = np.count_nonzero(is_letter)
+
+        letter_number = np.arange(processed_letters, processed_letters + letters)
+        shifted = (indices[is_letter] + offsets[letter_number % len(offsets)]) % len(upper_letters)
+
+        dst_block[:] = src_block
+        dst_block[is_letter] = np.where(uppercase[src_block[is_letter]],
+                                        upper_letters[shifted],
+                                        lower_letters[shifted])
+        processed_letters += letters
+
+    return out, processed_letters
+
+
+@functools.lru_cache(maxsize=None)
+def _lookup_tables(lang: Language) -> tuple:
+    """
+    Retrieve the arrays used by the NumPy engine to map characters to alphabet indices and back.
+
+    Tables are built once and cached per language.
+
+    :param Language lang: The language whose alphabet is used.
+
+    :return: A tuple with the alphabet index of every Latin-1 code point (-1 if it is not a letter),
+             whether every Latin-1 code point is an uppercase letter, and the code points of the
+             uppercase and lowercase alphabets.
+    :rtype: tuple
+    """
+    upper_alphabet = alphabets.alphabet(lang, LetterCase.UPPER)
+    lower_alphabet = alphabets.alphabet(lang, LetterCase.LOWER)
+
+    letter_indices = np.full(256, -1, dtype=np.int64)
+    uppercase = np.zeros(256, dtype=bool)
+    for index, (upper, lower) in enumerate(zip(upper_alphabet, lower_alphabet)):
+        letter_indices[ord(upper)] = index
+        letter_indices[ord(lower)] = index
+        uppercase[ord(upper)] = True
+
+    return (letter_indices,
+            uppercase,
+            np.array([ord(c) for c in upper_alphabet], dtype=np.uint32),
+            np.array([ord(c) for c in lower_alphabet], dtype=np.uint32))
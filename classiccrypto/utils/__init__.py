@@ -9,6 +9,17 @@ class Mode(Enum):
     DECRYPTION = 2
 
 
+class Engine(Enum):
+    """
+    Enumeration representing the available implementations for translating messages.
+
+    PYTHON processes the message character by character, whereas NUMPY processes the whole message
+    at once with vectorized array operations, which is much faster for large messages.
+    """
+    PYTHON = 1
+    NUMPY = 2
+
+
 class Language(Enum):
     """
     Enumeration representing supported languages for cryptographic operations.
@@ -54,6 +65,50 @@ class Language(Enum):
         return mapping.get(lang)
 
 
+class Cryptoscheme(Enum):
+    """
+    Enumeration representing the supported cryptoschemes.
+    """
+
+    CAESAR = 1
+    AFFINE = 2
+    VIGENERE = 3
+
+    @staticmethod
+    def from_string(s: str) -> "Cryptoscheme":
+        """
+        Map a string to its corresponding `Cryptoscheme` enumeration member.
+
+        :param str s: String representation of a cryptoscheme ("caesar", "affine", "vigenere").
+
+        :return: Corresponding Cryptoscheme enum member, or None if the string is unknown.
+        :rtype: Cryptoscheme
+        """
+        mapping = {
+            "caesar": Cryptoscheme.CAESAR,
+            "affine": Cryptoscheme.AFFINE,
+            "vigenere": Cryptoscheme.VIGENERE,
+        }
+        return mapping.get(s.lower())
+
+    @staticmethod
+    def to_string(scheme: "Cryptoscheme") -> str:
+        """
+        Retrieve the string identifier of a `Cryptoscheme` enumeration member.
+
+        :param Cryptoscheme scheme: A Cryptoscheme enum member.
+
+        :return: String representation of the provided Cryptoscheme enum member.
+        :rtype: str
+        """
+        mapping = {
+            Cryptoscheme.CAESAR: "caesar",
+            Cryptoscheme.AFFINE: "affine",
+            Cryptoscheme.VIGENERE: "vigenere",
+        }
+        return mapping.get(scheme)
+
+
 class LetterCase(Enum):
     """
     Enumeration representing the case of letters (upper or lower).
@@ -1,71 +1,176 @@
-from classiccrypto.cryptoschemes.affine import AffineKey
+from classiccrypto.cryptoschemes.keys.affine import AffineKey
 from classiccrypto.utils import LetterCase, Language
 
 
-def alphabet(lang: Language, case: LetterCase) -> list:
+class Alphabet:
+    """
+    Class representing the alphabet of a language, with precomputed structures so that every lookup
+    takes constant time.
+
+    Instances are shared, and should be retrieved with `get_alphabet` rather than created directly.
+
+    :ivar Language lang: The language of the alphabet.
+    :ivar list lower: The lowercase letters of the alphabet, in order.
+    :ivar list upper: The uppercase letters of the alphabet, in order.
+    :ivar int size: The number of letters of the alphabet.
+    :ivar dict index: Map from every letter, in either case, to its position in the alphabet.
+    :ivar frozenset letters: All the letters of the alphabet, in both cases.
+    :ivar dict deletion_table: `str.translate` table deleting every character which is not a letter.
     """
-    Get the alphabet for a given language and letter case.
 
-    :param Language lang: The language for which to retrieve the alphabet.
-    :param LetterCase case: The case (upper/lower) of the alphabet.
+    def __init__(self, lang: Language, letters: str):
+        """
+        Initialize a new Alphabet instance.
 
-    :return: A list of characters representing the alphabet.
-    :rtype: list
+        :param Language lang: The language of the alphabet.
+        :param str letters: The lowercase letters of the alphabet, in order.
+        """
+        self.lang = lang
+        self.lower = [c for c in letters]
+        self.upper = [c.upper() for c in letters]
+        self.size = len(letters)
 
-    :raises ValueError: If an unsupported language is provided.
+        self.index = {c: i for i, c in enumerate(self.lower)}
+        self.index.update({c: i for i, c in enumerate(self.upper)})
+
+        self.letters = frozenset(self.index)
+        self._lowercase_letters = frozenset(self.lower)
+        self.deletion_table = _LettersOnlyTable(self.letters)
+
+        self._shifted = dict()
+        self._affine = dict()
+
+    def case(self, case: LetterCase) -> list:
+        """
+        Get the letters of the alphabet in a given case.
+
+        :param LetterCase case: The case (upper/lower) of the alphabet.
+
+        :return: A list of characters representing the alphabet.
+        :rtype: list
+        """
+        return self.lower if case == LetterCase.LOWER else self.upper
+
+    def contains(self, char: str) -> bool:
+        """
+        Check whether a character is in the alphabet, regardless of its case.
+
+        :param str char: The character to check.
+
+        :return: True if the character is in the alphabet, False otherwise.
+        :rtype: bool
+        """
+        return char in self.letters or char.lower() in self._lowercase_letters
+
+    def letters_only(self, text: str) -> str:
+        """
+        Remove every character which is not a letter of the alphabet from a text.
+
+        :param str text: The text to filter.
+
+        :return: The letters of `text`, in the same order and case.
+        :rtype: str
+        """
+        return text.translate(self.deletion_table)
+
+    def shifted(self, step: int, case: LetterCase) -> tuple:
+        """
+        Get the alphabet shifted to the right by a specified step.
+
+        Permutations are computed once per step and cached.
+
+        :param int step: The number of positions to shift the alphabet.
+        :param LetterCase case: The case (upper/lower) of the alphabet.
+
+        :return: A tuple of characters representing the shifted alphabet.
+        :rtype: tuple
+        """
+        cache_key = (step % self.size, case)
+        if cache_key not in self._shifted:
+            src = self.case(case)
+            self._shifted[cache_key] = tuple(src[(index + step) % self.size] for index in range(self.size))
+        return self._shifted[cache_key]
+
+    def affine(self, a: int, b: int, case: LetterCase) -> tuple:
+        """
+        Get the alphabet transformed by the affine function index -> a * index + b.
+
+        Permutations are computed once per (a, b) and cached.
+
+        :param int a: The 'a' coefficient of the affine function.
+        :param int b: The 'b' coefficient of the affine function.
+        :param LetterCase case: The case (upper/lower) of the alphabet.
+
+        :return: A tuple of characters representing the transformed alphabet.
+        :rtype: tuple
+        """
+        cache_key = (a % self.size, b % self.size, case)
+        if cache_key not in self._affine:
+            src = self.case(case)
+            self._affine[cache_key] = tuple(src[(a * index + b) % self.size] for index in range(self.size))
+        return self._affine[cache_key]
+
+
+class _LettersOnlyTable(dict):
+    """
+    `str.translate` table which keeps the letters of an alphabet and deletes any other character.
+
+    Characters which are not letters are added to the table the first time they are looked up, so
+    translating long texts only falls back to Python code once per distinct character.
     """
-    if case == LetterCase.LOWER:
-        return _lowercase_alphabet(lang)
-    else:
-        return _uppercase_alphabet(lang)
 
+    def __init__(self, letters: frozenset):
+        super().__init__((ord(c), ord(c)) for c in letters)
+
+    def __missing__(self, code_point: int):
+        self[code_point] = None
+        return None
+
+
+_LETTERS = {
+    Language.ENG: 'abcdefghijklmnopqrstuvwxyz',
+    Language.ESP: 'abcdefghijklmnñopqrstuvwxyz',
+}
 
-def _lowercase_alphabet(lang: Language) -> list:
+_REGISTRY = dict()
+
+
+def get_alphabet(lang: Language) -> Alphabet:
     """
-    Internal function to get the lowercase alphabet for a given language.
+    Get the alphabet of a given language.
 
     :param Language lang: The language for which to retrieve the alphabet.
 
-    :return: A list of lowercase characters representing the alphabet.
-    :rtype: list
+    :return: The (shared) alphabet of the language.
+    :rtype: Alphabet
 
     :raises ValueError: If an unsupported language is provided.
     """
-    if not hasattr(_lowercase_alphabet, "eng_alphabet"):
-        _lowercase_alphabet.eng_alphabet = [c for c in 'abcdefghijklmnopqrstuvwxyz']
-    if not hasattr(_lowercase_alphabet, "esp_alphabet"):
-        _lowercase_alphabet.esp_alphabet = [c for c in 'abcdefghijklmnñopqrstuvwxyz']
+    try:
+        return _REGISTRY[lang]
+    except KeyError:
+        pass
 
-    if lang == Language.ENG:
-        return _lowercase_alphabet.eng_alphabet
-    elif lang == Language.ESP:
-        return _lowercase_alphabet.esp_alphabet
-    else:
+    if lang not in _LETTERS:
         raise ValueError(f"Unsupported language: {lang}")
 
+    _REGISTRY[lang] = Alphabet(lang, _LETTERS[lang])
+    return _REGISTRY[lang]
+
 
-def _uppercase_alphabet(lang: Language) -> list:
+def alphabet(lang: Language, case: LetterCase) -> list:
     """
-    Internal function to get the uppercase alphabet for a given language.
+    Get the alphabet for a given language and letter case.
 
     :param Language lang: The language for which to retrieve the alphabet.
+    :param LetterCase case: The case (upper/lower) of the alphabet.
 
-    :return: A list of uppercase characters representing the alphabet.
+    :return: A list of characters representing the alphabet.
     :rtype: list
 
     :raises ValueError: If an unsupported language is provided.
     """
-    if not hasattr(_uppercase_alphabet, "eng_alphabet"):
-        _uppercase_alphabet.eng_alphabet = [c.upper() for c in _lowercase_alphabet(Language.ENG)]
-    if not hasattr(_uppercase_alphabet, "esp_alphabet"):
-        _uppercase_alphabet.esp_alphabet = [c.upper() for c in _lowercase_alphabet(Language.ESP)]
-
-    if lang == Language.ENG:
-        return _uppercase_alphabet.eng_alphabet
-    elif lang == Language.ESP:
-        return _uppercase_alphabet.esp_alphabet
-    else:
-        raise ValueError(f"Unsupported language: {lang}")
+    return get_alphabet(lang).case(case)
 
 
 def shifted_alphabet(lang: Language, step: int, case: LetterCase) -> list:
@@ -79,12 +184,7 @@ def shifted_alphabet(lang: Language, step: int, case: LetterCase) -> list:
     :return: A list of characters representing the shifted alphabet.
     :rtype: list
     """
-
-    src = alphabet(lang, case)
-    dst = list(src)
-    for index, elem in enumerate(src):
-        dst[index] = src[(index + step) % len(src)]
-    return dst
+    return list(get_alphabet(lang).shifted(step, case))
 
 
 def shifted_letter(c: str, lang: Language, step: int) -> str:
@@ -98,15 +198,13 @@ def shifted_letter(c: str, lang: Language, step: int) -> str:
     :return: The shifted letter.
     :rtype: str
     """
-    letter_case = LetterCase.LOWER if c.islower() else LetterCase.UPPER
-    src_alphabet = alphabet(lang, letter_case)
-    target_alphabet = shifted_alphabet(lang,
-                                       step,
-                                       letter_case)
-
-    if c not in src_alphabet:
+    letters = get_alphabet(lang)
+    index = letters.index.get(c)
+    if index is None:
         return c
-    return target_alphabet[src_alphabet.index(c)]
+
+    target_alphabet = letters.lower if c.islower() else letters.upper
+    return target_alphabet[(index + step) % letters.size]
 
 
 def is_in_alphabet(lang: Language, char: str) -> bool:
@@ -119,7 +217,7 @@ def is_in_alphabet(lang: Language, char: str) -> bool:
     :return: True if the character is in the alphabet, False otherwise.
     :rtype: bool
     """
-    return char.lower() in _lowercase_alphabet(lang)
+    return get_alphabet(lang).contains(char)
 
 
 def alphabet_affine(key: AffineKey, case: LetterCase) -> list:
@@ -132,8 +230,25 @@ def alphabet_affine(key: AffineKey, case: LetterCase) -> list:
     :return: A list of characters representing the affine-shifted alphabet.
     :rtype: list
     """
-    src = alphabet(key.lang, case)
-    dst = list(src)
-    for index, elem in enumerate(src):
-        dst[index] = src[(key.a * index + key.b) % len(src)]
-    return dst
+    return list(get_alphabet(key.lang).affine(key.a, key.b, case))
+
+
+def translation_table(src: list, dst: list) -> dict:
+    """
+    Build a `str.translate` table mapping every letter in `src` to the letter at the same position in `dst`.
+
+    Both alphabets are expected to be given in the same case; the table maps the upper and lower case
+    variants of every letter, so the letter case of the translated text is preserved. If a letter
+    appears more than once in `src`, its first occurrence wins.
+
+    :param list src: The alphabet of the letters to be translated.
+    :param list dst: The alphabet of the translated letters.
+
+    :return: A translation table usable with `str.translate`.
+    :rtype: dict
+    """
+    table = dict()
+    for src_letter, dst_letter in zip(src, dst):
+        table.setdefault(ord(src_letter.upper()), dst_letter.upper())
+        table.setdefault(ord(src_letter.lower()), dst_letter.lower())
+    return table
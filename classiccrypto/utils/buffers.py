@@ -0,0 +1,147 @@
+import codecs
+import functools
+import mmap
+
+import numpy as np
+
+from classiccrypto.utils import Language, LetterCase
+from classiccrypto.utils import alphabets
+
+# Byte buffers are interpreted as Latin-1, which covers the English alphabet (ASCII) and the Spanish
+# one (Ñ and ñ are single bytes in Latin-1)
+ENCODING = 'latin-1'
+
+# Number of bytes processed at once by the functions which need temporary arrays, so their memory
+# usage does not grow with the size of the buffer
+BLOCK_SIZE = 1 << 22
+
+
+def is_buffer(message) -> bool:
+    """
+    Check whether a message is a byte buffer rather than a string.
+
+    :param message: The message to check.
+
+    :return: True if the message is a bytes, bytearray, memoryview or mmap object, False otherwise.
+    :rtype: bool
+    """
+    return isinstance(message, (bytes, bytearray, memoryview, mmap.mmap))
+
+
+def is_byte_compatible(encoding: str, lang: Language, accents: bool = False) -> bool:
+    """
+    Check whether text in a given encoding can be processed as a Latin-1 byte buffer.
+
+    This is the case for Latin-1 itself, and for ASCII-compatible encodings of English text, since
+    all the letters of the English alphabet are single ASCII bytes, unless accented letters matter too.
+
+    :param str encoding: The name of the encoding of the text.
+    :param Language lang: The language of the text.
+    :param bool, optional accents: Whether accented letters must be single bytes too, e.g. to fold
+                                   them into their base letter. Defaults to False.
+
+    :return: True if the letters of the text are single Latin-1 bytes, False otherwise.
+    :rtype: bool
+    """
+    name = codecs.lookup(encoding).name
+    if name in ('iso8859-1', 'latin-1'):
+        return True
+    return lang == Language.ENG and not accents and name in ('ascii', 'utf-8', 'cp1252')
+
+
+def as_array(buffer) -> np.ndarray:
+    """
+    Get a NumPy view of the bytes of a buffer, without copying them.
+
+    :param buffer: A bytes, bytearray, memoryview or mmap object.
+
+    :return: A one-dimensional array of unsigned bytes sharing memory with `buffer`.
+    :rtype: np.ndarray
+    """
+    return np.frombuffer(buffer, dtype=np.uint8)
+
+
+def byte_table(table: dict) -> np.ndarray:
+    """
+    Convert a `str.translate` table into a 256-entry table translating Latin-1 bytes.
+
+    Entries mapping characters outside of Latin-1 are ignored.
+
+    :param dict table: The translation table, mapping code points to strings.
+
+    :return: An array with the translated value of every byte.
+    :rtype: np.ndarray
+    """
+    result = np.arange(256, dtype=np.uint8)
+    for src, dst in table.items():
+        if src < 256 and len(dst) == 1 and ord(dst) < 256:
+            result[src] = ord(dst)
+    return result
+
+
+def translate_buffer(buffer, table: np.ndarray, out=None) -> bytearray:
+    """
+    Translate every byte of a buffer through a 256-entry table.
+
+    :param buffer: A bytes, bytearray, memoryview or mmap object.
+    :param np.ndarray table: The translated value of every byte.
+    :param out: Optional writable buffer, of the same length as `buffer`, where the result is written.
+                If not provided, a new bytearray is allocated.
+
+    :return: The buffer holding the result.
+    :rtype: bytearray
+    """
+    src = as_array(buffer)
+    if out is None:
+        out = bytearray(len(src))
+
+    np.take(table, src, out=as_array(out))
+    return out
+
+
+def clean_buffer(buffer, lang: Language, table: np.ndarray = None) -> bytes:
+    """
+    Keep only the letters of a Latin-1 buffer, converted to uppercase.
+
+    The buffer is processed in blocks of bounded size, so the only memory which grows with the
+    buffer is the one holding the result.
+
+    :param buffer: A bytes, bytearray, memoryview or mmap object.
+    :param Language lang: The language whose alphabet is kept.
+    :param np.ndarray, optional table: The table mapping every byte kept to its cleaned value, and
+                                       every other byte to 0. Defaults to the uppercase letters of
+                                       the alphabet.
+
+    :return: The uppercase letters of `buffer`, in the same order.
+    :rtype: bytes
+    """
+    upper_table = _uppercase_letters_table(lang) if table is None else table
+    src = as_array(buffer)
+
+    blocks = []
+    for start in range(0, len(src), BLOCK_SIZE):
+        block = upper_table[src[start:start + BLOCK_SIZE]]
+        blocks.append(block[block != 0].tobytes())
+
+    return b''.join(blocks)
+
+
+@functools.lru_cache(maxsize=None)
+def _uppercase_letters_table(lang: Language) -> np.ndarray:
+    """
+    Retrieve the table mapping every Latin-1 letter of an alphabet to its uppercase version, and every
+    other byte to 0.
+
+    Tables are built once and cached per language.
+
+    :param Language lang: The language whose alphabet is used.
+
+    :return: An array with the uppercase letter (or 0) of every byte.
+    :rtype: np.ndarray
+    """
+    table = np.zeros(256, dtype=np.uint8)
+    for upper, lower in zip(alphabets.alphabet(lang, LetterCase.UPPER),
+                            alphabets.alphabet(lang, LetterCase.LOWER)):
+        table[ord(upper)] = ord(upper)
+        table[ord(lower)] = ord(upper)
+    return table
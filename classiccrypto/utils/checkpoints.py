@@ -0,0 +1,224 @@
+import json
+import sqlite3
+import time
+
+# Number of writes after which the pending ones are committed
+DEFAULT_COMMIT_EVERY = 256
+
+# Seconds after which pending writes are committed, however few they are
+DEFAULT_COMMIT_INTERVAL = 2.0
+
+# Status of a file being cracked, queued again after an interruption, cracked, or which failed
+RUNNING = 'running'
+QUEUED = 'queued'
+DONE = 'done'
+FAILED = 'failed'
+
+# Statements creating the tables and indexes of a store, if missing
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS options (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    sha256 TEXT,
+    status TEXT NOT NULL,
+    cryptoscheme TEXT,
+    lang TEXT,
+    key TEXT,
+    score REAL,
+    candidates TEXT,
+    confidence REAL,
+    error TEXT,
+    elapsed REAL,
+    duplicate_of TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256);
+CREATE INDEX IF NOT EXISTS files_status ON files (status);
+'''
+
+
+class JobStore:
+    """
+    Class recording the progress of a cracking job in an SQLite database, so an interrupted job can
+    be resumed where it stopped.
+
+    Every file has a status, and once cracked, its best key and score (or the error raised). Files
+    are looked up by path to skip the finished ones, and by the hash of their contents so identical
+    files are only cracked once, even across runs. Files which failed are cracked again on resume.
+
+    The database runs in WAL mode, so it can be read (e.g. to follow the progress) while the job
+    writes to it, and writes are committed in batches of `commit_every`, or every `commit_interval`
+    seconds. An interruption loses at most the uncommitted results, whose files are cracked again.
+
+    :ivar str path: The path to the database.
+    :ivar int commit_every: Number of writes after which they are committed.
+    :ivar float commit_interval: Seconds after which pending writes are committed.
+    """
+
+    def __init__(self,
+                 path: str,
+                 options: dict,
+                 commit_every: int = DEFAULT_COMMIT_EVERY,
+                 commit_interval: float = DEFAULT_COMMIT_INTERVAL):
+        """
+        Open a store, creating it if it does not exist.
+
+        :param str path: The path to the database.
+        :param dict options: The options of the job which change its results. A new store records
+                             them, and an existing one must have been created with the same ones.
+        :param int, optional commit_every: Number of writes after which they are committed.
+                                           Defaults to DEFAULT_COMMIT_EVERY.
+        :param float, optional commit_interval: Seconds after which pending writes are committed.
+                                                Defaults to DEFAULT_COMMIT_INTERVAL.
+
+        :raises ValueError: If the store was created with other options.
+        """
+        self.path = path
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+
+        self._connection = sqlite3.connect(path)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        # With WAL, a crash can only lose the last commits, never corrupt the database
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(SCHEMA)
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+        encoded = {name: json.dumps(value) for name, value in options.items()}
+        stored = dict(self._connection.execute('SELECT name, value FROM options'))
+        if not stored:
+            self._connection.executemany('INSERT INTO options (name, value) VALUES (?, ?)', encoded.items())
+            self._connection.commit()
+        elif stored != encoded:
+            self._connection.close()
+            different = sorted(name for name in stored.keys() | encoded.keys() if stored.get(name) != encoded.get(name))
+            raise ValueError(f"{path} was created with other options ({', '.join(different)})")
+
+    def requeue(self) -> list:
+        """
+        Queue again the files whose cracking was interrupted or failed (e.g. because its worker died),
+        and the ones still queued by a resumed run which was interrupted in turn.
+
+        :return: The paths of the files, to be cracked first.
+        :rtype: list
+        """
+        statuses = (RUNNING, QUEUED, FAILED)
+        paths = [path for path, in self._connection.execute('SELECT path FROM files WHERE status IN (?, ?, ?)',
+                                                            statuses)]
+        self._connection.execute('UPDATE files SET status = ?, updated = ? WHERE status IN (?, ?, ?)',
+                                 (QUEUED, time.time(), *statuses))
+        self._connection.commit()
+        return paths
+
+    def status(self, path: str) -> str | None:
+        """
+        Get the status of a file.
+
+        :param str path: The path to the file.
+
+        :return: The status of the file, or None if it is not in the store.
+        :rtype: str | None
+        """
+        row = self._connection.execute('SELECT status FROM files WHERE path = ?', (path,)).fetchone()
+        return row[0] if row is not None else None
+
+    def find(self, digest: str) -> dict | None:
+        """
+        Find the result of a file with given contents which was cracked. Failures are not reused, as they
+        may not happen again (e.g. a worker killed for running out of memory).
+
+        :param str digest: The SHA-256 digest of the contents.
+
+        :return: The result of the file, as given to `finish`, with the "file" it belongs to, or None
+                 if no file with these contents was cracked.
+        :rtype: dict | None
+        """
+        row = self._connection.execute('SELECT path, cryptoscheme, lang, key, score, candidates, confidence, elapsed '
+                                       'FROM files WHERE sha256 = ? AND status = ? AND duplicate_of IS NULL LIMIT 1',
+                                       (digest, DONE)).fetchone()
+        if row is None:
+            return None
+
+        path, cryptoscheme, lang, key, score, candidates, confidence, elapsed = row
+        result = {'file': path,
+                  'cryptoscheme': cryptoscheme,
+                  'lang': lang,
+                  'key': key,
+                  'score': score,
+                  'elapsed': elapsed}
+        if candidates is not None:
+            result['candidates'] = json.loads(candidates)
+        if confidence is not None:
+            result['identification_confidence'] = confidence
+        return result
+
+    def start(self, path: str, digest: str):
+        """
+        Record that a file is being cracked.
+
+        :param str path: The path to the file.
+        :param str digest: The SHA-256 digest of its contents.
+        """
+        self._write('INSERT INTO files (path, sha256, status, updated) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (path) DO UPDATE SET sha256 = excluded.sha256, status = excluded.status, '
+                    'updated = excluded.updated',
+                    (path, digest, RUNNING, time.time()))
+
+    def finish(self, path: str, digest: str | None, result: dict, duplicate_of: str = None):
+        """
+        Record the result of a file.
+
+        :param str path: The path to the file.
+        :param str | None digest: The SHA-256 digest of its contents, or None if it could not be read.
+        :param dict result: The result: the "cryptoscheme", "lang", "key", "score", "elapsed" seconds
+                            and, if any, the "candidates" and "identification_confidence", or the
+                            "error".
+        :param str, optional duplicate_of: The path to the file with the same contents whose result it is.
+        """
+        candidates = json.dumps(result['candidates']) if 'candidates' in result else None
+        self._write('INSERT OR REPLACE INTO files (path, sha256, status, cryptoscheme, lang, key, score, candidates, '
+                    'confidence, error, elapsed, duplicate_of, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (path,
+                     digest,
+                     FAILED if 'error' in result else DONE,
+                     result.get('cryptoscheme'),
+                     result.get('lang'),
+                     result.get('key'),
+                     result.get('score'),
+                     candidates,
+                     result.get('identification_confidence'),
+                     result.get('error'),
+                     result.get('elapsed'),
+                     duplicate_of,
+                     time.time()))
+
+    def counts(self) -> dict:
+        """
+        Count the files of every status.
+
+        :return: A dictionary mapping every status to its number of files.
+        :rtype: dict
+        """
+        return dict(self._connection.execute('SELECT status, COUNT(*) FROM files GROUP BY status'))
+
+    def commit(self):
+        self._connection.commit()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def close(self):
+        """
+        Commit the pending writes and close the database.
+        """
+        self.commit()
+        self._connection.close()
+
+    def _write(self, statement: str, parameters: tuple):
+        self._connection.execute(statement, parameters)
+        self._pending += 1
+        if self._pending >= self.commit_every or time.monotonic() - self._last_commit >= self.commit_interval:
+            self.commit()
@@ -0,0 +1,193 @@
+import functools
+import unicodedata
+
+import numpy as np
+
+from classiccrypto.utils import Language
+from classiccrypto.utils import alphabets
+from classiccrypto.utils import buffers
+from classiccrypto.utils import instrumentation
+
+# Accented letters are looked for up to the end of the Latin Extended-B block
+_FOLDED_RANGE = 0x250
+
+
+class Cleaner:
+    """
+    Class keeping only the letters of an alphabet from a text, converted to uppercase.
+
+    Every character is handled by a single `str.translate` pass over a precompiled table, which keeps
+    the letters (mapped to uppercase) and deletes anything else. If `fold_accents` is set, accented
+    letters whose base letter is in the alphabet (e.g. á, è, ü, or ñ in English) are mapped to that
+    uppercase base letter instead of being deleted. Latin-1 byte buffers are cleaned with the
+    equivalent 256-entry table.
+
+    Texts can be cleaned at once, or fed in consecutive chunks: the cleaner counts the characters fed
+    so far, so the positions of the letters kept always refer to the whole text.
+
+    :ivar Language lang: The language whose alphabet is kept.
+    :ivar bool fold_accents: Whether accented letters are folded into their base letter.
+    :ivar int consumed: Number of characters (or bytes) fed so far.
+    """
+
+    def __init__(self, lang: Language, fold_accents: bool = False):
+        """
+        Initialize a new Cleaner instance.
+
+        :param Language lang: The language whose alphabet is kept.
+        :param bool, optional fold_accents: If True, fold accented letters into their base letter
+                                            instead of deleting them. Defaults to False.
+        """
+        self.lang = lang
+        self.fold_accents = fold_accents
+        self.consumed = 0
+        self._table = cleaning_table(lang, fold_accents)
+        self._byte_table = _byte_cleaning_table(lang, fold_accents)
+
+    def clean(self, text: str | bytes) -> str | bytes:
+        """
+        Clean a whole text, without changing the count of characters fed.
+
+        :param str | bytes text: The text, or a Latin-1 byte buffer.
+
+        :return: The uppercase letters of `text`, in the same order, of the same type as `text`.
+        :rtype: str | bytes
+        """
+        instrumentation.count('characters_scanned', len(text))
+        if buffers.is_buffer(text):
+            return buffers.clean_buffer(text, self.lang, self._byte_table)
+        return text.translate(self._table)
+
+    def positions(self, text: str | bytes) -> np.ndarray:
+        """
+        Map the letters kept from a text back to their positions in it.
+
+        :param str | bytes text: The text, or a Latin-1 byte buffer.
+
+        :return: An array whose element i is the position in `text` (in characters, or bytes for
+                 buffers) of the letter i of `clean(text)`.
+        :rtype: np.ndarray
+        """
+        if buffers.is_buffer(text):
+            return np.flatnonzero(self._byte_table[buffers.as_array(text)])
+
+        codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        kept = _kept_code_points(self.lang, self.fold_accents)
+        return np.flatnonzero(kept[np.minimum(codes, len(kept) - 1)])
+
+    def feed(self, chunk: str | bytes) -> str | bytes:
+        """
+        Clean the next chunk of a text.
+
+        :param str | bytes chunk: The next chunk, either a string or a Latin-1 byte buffer.
+
+        :return: The uppercase letters of `chunk`.
+        :rtype: str | bytes
+        """
+        self.consumed += len(chunk)
+        return self.clean(chunk)
+
+    def feed_with_positions(self, chunk: str | bytes) -> tuple:
+        """
+        Clean the next chunk of a text, and map its letters back to their positions in the whole text.
+
+        :param str | bytes chunk: The next chunk, either a string or a Latin-1 byte buffer.
+
+        :return: A tuple with the uppercase letters of `chunk`, and an array with the position in the
+                 whole text of each of them.
+        :rtype: tuple
+        """
+        positions = self.positions(chunk) + self.consumed
+        return self.feed(chunk), positions
+
+
+@functools.lru_cache(maxsize=None)
+def cleaning_table(lang: Language, fold_accents: bool = False) -> dict:
+    """
+    Retrieve the `str.translate` table which keeps the letters of an alphabet, converted to
+    uppercase, and deletes any other character.
+
+    Tables are built once and cached per language and folding mode. Characters which are not letters
+    are added to a table the first time they are looked up, so translating long texts only falls
+    back to Python code once per distinct character.
+
+    :param Language lang: The language whose alphabet is kept.
+    :param bool, optional fold_accents: If True, accented letters are mapped to their uppercase base
+                                        letter. Defaults to False.
+
+    :return: The translation table.
+    :rtype: dict
+    """
+    alphabet = alphabets.get_alphabet(lang)
+    table = _DeletingTable((ord(letter), ord(letter.upper())) for letter in alphabet.letters)
+    if fold_accents:
+        table.update(_accent_folds(lang))
+    return table
+
+
+class _DeletingTable(dict):
+    """
+    `str.translate` table which deletes any character it does not map.
+    """
+
+    def __missing__(self, code_point: int):
+        self[code_point] = None
+        return None
+
+
+def _accent_folds(lang: Language) -> dict:
+    """
+    Map every accented Latin letter whose base letter is in an alphabet, but which is not a letter of
+    the alphabet itself, to that uppercase base letter.
+
+    :param Language lang: The language whose alphabet is considered.
+
+    :return: A dictionary mapping code points to the code point of their uppercase base letter.
+    :rtype: dict
+    """
+    letters = alphabets.get_alphabet(lang).letters
+    folds = dict()
+    for code_point in range(0xC0, _FOLDED_RANGE):
+        char = chr(code_point)
+        base = unicodedata.normalize('NFD', char)[0]
+        if char not in letters and base != char and base in letters:
+            folds[code_point] = ord(base.upper())
+    return folds
+
+
+@functools.lru_cache(maxsize=None)
+def _byte_cleaning_table(lang: Language, fold_accents: bool) -> np.ndarray:
+    """
+    Retrieve the table mapping every Latin-1 byte kept by a `Cleaner` to its uppercase letter, and
+    every other byte to 0.
+
+    :param Language lang: The language whose alphabet is kept.
+    :param bool fold_accents: Whether accented letters are folded into their base letter.
+
+    :return: An array with the cleaned value (or 0) of every byte.
+    :rtype: np.ndarray
+    """
+    table = np.zeros(256, dtype=np.uint8)
+    for code_point, cleaned in cleaning_table(lang, fold_accents).items():
+        if code_point < 256 and cleaned is not None:
+            table[code_point] = cleaned
+    return table
+
+
+@functools.lru_cache(maxsize=None)
+def _kept_code_points(lang: Language, fold_accents: bool) -> np.ndarray:
+    """
+    Retrieve the boolean table telling which code points a `Cleaner` keeps, up to the last accented
+    letter folded. The last entry is False, and stands for every code point beyond the table.
+
+    :param Language lang: The language whose alphabet is kept.
+    :param bool fold_accents: Whether accented letters are folded into their base letter.
+
+    :return: A boolean array indexed by code point.
+    :rtype: np.ndarray
+    """
+    kept = np.zeros(_FOLDED_RANGE + 1, dtype=bool)
+    for code_point, cleaned in cleaning_table(lang, fold_accents).items():
+        if code_point < _FOLDED_RANGE and cleaned is not None:
+            kept[code_point] = True
+    return kept
@@ -8,11 +8,11 @@ class AsciiHistogramDisplayMode(Enum):
     VERTICAL = 2
 
 
-def display_ascii_histogram(histogram: list, display_mode: AsciiHistogramDisplayMode):
+def display_ascii_histogram(histogram: frequency.Histogram | list, display_mode: AsciiHistogramDisplayMode):
     """
     Displays an ASCII histogram in either horizontal or vertical orientation based on the specified display mode.
 
-    :param list histogram: A list key, value of () pairs representing the histogram data.
+    :param Histogram | list histogram: A letter histogram, or a list of (key, value) pairs representing the histogram data.
     :param AsciiHistogramDisplayMode display_mode: An enum indicating the desired display mode.
     """
 
@@ -22,26 +22,27 @@ def display_ascii_histogram(histogram: list, display_mode: AsciiHistogramDisplay
         _display_vertical(histogram)
 
 
-def _display_horizontal(histogram: list):
+def _display_horizontal(histogram: frequency.Histogram | list):
     """
     Displays an ASCII histogram horizontally given a list of (key, value) pairs.
 
     This is a private function that prints the histogram to stdout with the keys
     displayed vertically on the left and bars extending to the right.
 
-    :param list histogram: A list of (key, value) pairs representing the histogram data.
+    :param Histogram | list histogram: A letter histogram, or a list of (key, value) pairs representing the histogram data.
     """
+    keys, values = frequency.keys_and_values(frequency.sort_histogram_by_key(histogram))
 
     # Find the longest key for alignment purposes
-    max_key_len = max(len(str(key)) for key, value in histogram)
+    max_key_len = max(len(str(key)) for key in keys)
 
     # Find the maximum value to scale the histogram
-    max_value = max(value for key, value in histogram)
+    max_value = max(values)
 
     # Maximum width of the histogram bar
     max_bar_width = 80
 
-    for key, value in frequency.sort_histogram_by_key(histogram):
+    for key, value in zip(keys, values):
         # Scale the value to max_bar_width
         scaled_value = int((value / max_value) * max_bar_width)
 
@@ -49,21 +50,21 @@ def _display_horizontal(histogram: list):
         print(f"{str(key).rjust(max_key_len)} | {'#' * scaled_value} ({value})")
 
 
-def _display_vertical(histogram: list):
+def _display_vertical(histogram: frequency.Histogram | list):
     """
     Displays an ASCII histogram vertically given a list of (key, value) pairs.
 
     This is a private function that prints the histogram to stdout with the keys
     displayed horizontally at the bottom and bars extending upwards.
 
-    :param list histogram: A list of (key, value) pairs representing the histogram data.
+    :param Histogram | list histogram: A letter histogram, or a list of (key, value) pairs representing the histogram data.
     """
-    histogram = frequency.sort_histogram_by_key(histogram)
+    keys, values = frequency.keys_and_values(frequency.sort_histogram_by_key(histogram))
     # Find the longest key for alignment purposes
-    max_key_len = max(len(str(key)) for key, value in histogram)
+    max_key_len = max(len(str(key)) for key in keys)
 
     # Find the maximum value to scale the histogram
-    max_value = max(value for key, value in histogram)
+    max_value = max(values)
 
     # Maximum height of the histogram bar
     max_bar_height = 30
@@ -71,7 +72,7 @@ def _display_vertical(histogram: list):
     # Scaling the values
     scaled_values = [
         (key, int((value / max_value) * max_bar_height))
-        for key, value in histogram
+        for key, value in zip(keys, values)
     ]
 
     # Printing the histogram
@@ -1,97 +1,274 @@
+import functools
+
+import numpy as np
+
 from classiccrypto.utils import Language, LetterCase
 from classiccrypto.utils import alphabets
+from classiccrypto.utils import buffers
+
+
+def letter_counts(s: str | bytes, lang: Language) -> np.ndarray:
+    """
+    Counts the occurrences of every letter of an alphabet in a string, regardless of their case.
+
+    Strings are counted with one `str.count` per letter, and Latin-1 byte buffers with a single
+    `numpy.bincount`, so no Python code runs per character.
+
+    :param str | bytes s: The input string (or Latin-1 byte buffer).
+    :param Language lang: The language enum indicating the considered alphabet.
+
+    :return: A vector with the number of occurrences of each letter, in alphabetical order.
+    :rtype: np.ndarray
+    """
+    alphabet = alphabets.get_alphabet(lang)
+
+    if buffers.is_buffer(s):
+        byte_counts = np.bincount(buffers.as_array(s), minlength=256)
+        return byte_counts[_letter_codes(lang, LetterCase.LOWER)] + byte_counts[_letter_codes(lang, LetterCase.UPPER)]
+
+    lowered = s.lower()
+    return np.fromiter((lowered.count(letter) for letter in alphabet.lower), dtype=np.int64, count=alphabet.size)
+
+
+def letter_indices(s: str | bytes, lang: Language) -> np.ndarray:
+    """
+    Converts the letters of a string into their positions in the alphabet, regardless of their case.
+
+    Characters which are not letters of the alphabet are dropped.
+
+    :param str | bytes s: The input string (or Latin-1 byte buffer).
+    :param Language lang: The language enum indicating the considered alphabet.
+
+    :return: An array with the position in the alphabet of every letter of the string, in order.
+    :rtype: np.ndarray
+    """
+    if buffers.is_buffer(s):
+        codes = buffers.as_array(s)
+    else:
+        codes = np.frombuffer(s.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        # All the letters are Latin-1 characters
+        codes = codes[codes < 256]
 
+    indices = _index_table(lang)[codes]
+    return indices[indices >= 0]
 
-def normalized_histogram(s: str, lang: Language) -> list:
+
+def normalized_frequencies(counts: np.ndarray) -> np.ndarray:
+    """
+    Normalizes a vector of letter counts so its elements add up to 1.
+
+    :param np.ndarray counts: The number of occurrences of each letter. A two-dimensional array is
+                              normalized row by row.
+
+    :return: The relative frequency of each letter, or all zeros if there are no letters at all.
+    :rtype: np.ndarray
+    """
+    totals = counts.sum(axis=-1, keepdims=True)
+    return np.divide(counts, totals, out=np.zeros(counts.shape, dtype=np.float64), where=totals != 0)
+
+
+class Histogram:
+    """
+    Class representing a histogram of letter frequencies, stored as a dense vector in alphabetical
+    order.
+
+    The values of a histogram are read-only, and sliding it does not copy them: every histogram keeps
+    its values twice in a row, so any rotation of them is a contiguous view of that array.
+
+    For compatibility with the code handling generic histograms, iterating over a histogram (or
+    indexing it) yields (letter, value) tuples.
+
+    :ivar Language lang: The language whose alphabet is considered.
+    """
+
+    __slots__ = ('lang', '_doubled', '_letters', '_offset')
+
+    def __init__(self, values, lang: Language):
+        """
+        Initialize a new Histogram instance.
+
+        :param values: The value of each letter, in alphabetical order.
+        :param Language lang: The language whose alphabet is considered.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        doubled = np.concatenate((values, values))
+        doubled.flags.writeable = False
+
+        self.lang = lang
+        self._doubled = doubled
+        self._letters = tuple(alphabets.get_alphabet(lang).lower) * 2
+        self._offset = 0
+
+    @classmethod
+    def from_counts(cls, counts: np.ndarray, lang: Language) -> 'Histogram':
+        """
+        Build the normalized histogram of a vector of letter counts.
+
+        :param np.ndarray counts: The number of occurrences of each letter.
+        :param Language lang: The language whose alphabet is considered.
+
+        :return: The normalized histogram.
+        :rtype: Histogram
+        """
+        return cls(normalized_frequencies(counts), lang)
+
+    @property
+    def values(self) -> np.ndarray:
+        """
+        The (read-only) value of each letter, in the order of the histogram.
+        """
+        return self._doubled[self._offset:self._offset + len(self)]
+
+    @property
+    def letters(self) -> tuple:
+        """
+        The letters of the histogram, in its order.
+        """
+        return self._letters[self._offset:self._offset + len(self)]
+
+    def __len__(self) -> int:
+        return len(self._doubled) // 2
+
+    def __iter__(self):
+        return zip(self.letters, self.values.tolist())
+
+    def __getitem__(self, index: int) -> tuple:
+        return self.letters[index], float(self.values[index])
+
+    def __repr__(self) -> str:
+        return f"Histogram({list(self)!r}, {self.lang})"
+
+    def slid(self, step: int) -> 'Histogram':
+        """
+        Shift the histogram by a specified step to the right, wrapping around at the alphabet's end.
+
+        :param int step: The number of positions to shift the histogram.
+
+        :return: A histogram sharing its values with this one.
+        :rtype: Histogram
+        """
+        result = object.__new__(Histogram)
+        result.lang = self.lang
+        result._doubled = self._doubled
+        result._letters = self._letters
+        result._offset = (self._offset - step) % len(self)
+        return result
+
+    def sorted(self) -> 'Histogram':
+        """
+        Get the histogram in alphabetical order, undoing any slide.
+
+        :return: A histogram sharing its values with this one.
+        :rtype: Histogram
+        """
+        return self.slid(self._offset)
+
+
+def normalized_histogram(s: str | bytes, lang: Language) -> Histogram:
     """
     Computes a normalized histogram of letter frequencies in a string.
 
-    :param str s: The input string from which to compute the histogram.
+    :param str | bytes s: The input string (or Latin-1 byte buffer) from which to compute the histogram.
     :param Language lang: The language enum indicating the considered alphabet.
 
-    :return: A list of tuples, each containing a letter and its normalized frequency.
-    :rtype: list
+    :return: The histogram of the string. All frequencies are 0 if the string has no letters.
+    :rtype: Histogram
+    """
+    return Histogram.from_counts(letter_counts(s, lang), lang)
+
+
+@functools.lru_cache(maxsize=None)
+def _index_table(lang: Language) -> np.ndarray:
     """
+    Retrieves the table mapping every Latin-1 code to the position of its letter in the alphabet,
+    or to -1 if it is not a letter.
 
-    # Define the alphabet for each language
-    alphabet = alphabets.alphabet(lang, LetterCase.LOWER)
+    Tables are built once and cached per language.
 
-    # Initialize the dictionary with all letters set to 0
-    freq = {letter: 0 for letter in alphabet}
+    :param Language lang: The language enum indicating the considered alphabet.
 
-    total_char_count = 0
+    :return: An array with the position (or -1) of every Latin-1 code.
+    :rtype: np.ndarray
+    """
+    table = np.full(256, -1, dtype=np.int16)
+    for case in LetterCase:
+        table[_letter_codes(lang, case)] = np.arange(alphabets.get_alphabet(lang).size)
+    return table
 
-    # Count the frequency of each letter in the string
-    for char in s.lower():
-        # This avoids non-alphabetic symbols
-        if char in freq:
-            freq[char] += 1
-            total_char_count += 1
 
-    for char in freq.keys():
-        freq[char] /= total_char_count
+@functools.lru_cache(maxsize=None)
+def _letter_codes(lang: Language, case: LetterCase) -> np.ndarray:
+    """
+    Retrieves the Latin-1 codes of the letters of an alphabet, in alphabetical order.
 
-    return [(k, v) for k, v in freq.items()]
+    Arrays are built once and cached per language and case.
 
+    :param Language lang: The language enum indicating the considered alphabet.
+    :param LetterCase case: The case of the letters.
 
-def language_histogram(lang: Language) -> list:
+    :return: An array with the code of each letter.
+    :rtype: np.ndarray
+    """
+    return np.array([ord(c) for c in alphabets.alphabet(lang, case)], dtype=np.intp)
+
+
+def language_histogram(lang: Language) -> Histogram:
     """
     Retrieves a pre-defined normalized histogram for a given language.
 
     :param Language lang: The language enum indicating which language's histogram to retrieve.
 
-    :return: A list of tuples, each containing a letter and its frequency in the language.
-    :rtype: list
+    :return: The frequency of each letter in the language.
+    :rtype: Histogram
     """
 
-    if not hasattr(language_histogram, "esp_histogram"):
-        language_histogram.esp_histogram = {
+    if not hasattr(language_histogram, "histograms"):
+        esp_histogram = {
             'a': 12.53, 'b': 1.42, 'c': 4.68, 'd': 5.86, 'e': 13.68, 'f': 0.69, 'g': 1.01, 'h': 0.70, 'i': 6.25,
             'j': 0.44, 'k': 0.02, 'l': 4.97, 'm': 3.15, 'n': 6.71, 'ñ': 0.31, 'o': 8.68, 'p': 2.51, 'q': 0.88,
             'r': 6.87, 's': 7.98, 't': 4.63, 'u': 3.93, 'v': 0.90, 'w': 0.01, 'x': 0.22, 'y': 0.90, 'z': 0.52}
 
-        for key in language_histogram.esp_histogram:
-            language_histogram.esp_histogram[key] /= 100
-
-    if not hasattr(language_histogram, "eng_histogram"):
-        language_histogram.eng_histogram = {
+        eng_histogram = {
             'a': 8.2, 'b': 1.5, 'c': 2.8, 'd': 4.3, 'e': 12.7, 'f': 2.2, 'g': 2.0, 'h': 6.1, 'i': 7.0, 'j': 0.15,
             'k': 0.77, 'l': 4.0, 'm': 2.4, 'n': 6.7, 'o': 7.5, 'p': 1.9, 'q': 0.095, 'r': 6.0, 's': 6.3, 't': 9.1,
             'u': 2.8, 'v': 0.98, 'w': 2.4, 'x': 0.15, 'y': 2.0, 'z': 0.074}
 
-        for key in language_histogram.eng_histogram:
-            language_histogram.eng_histogram[key] /= 100
+        language_histogram.histograms = {
+            lang: Histogram([histogram[letter] / 100 for letter in alphabets.get_alphabet(lang).lower], lang)
+            for lang, histogram in ((Language.ESP, esp_histogram), (Language.ENG, eng_histogram))
+        }
 
-    if lang == Language.ESP:
-        return [(k, v) for k, v in language_histogram.esp_histogram.items()]
-    elif lang == Language.ENG:
-        return [(k, v) for k, v in language_histogram.eng_histogram.items()]
+    return language_histogram.histograms[lang]
 
 
-def empty_histogram(lang: Language) -> list:
+def empty_histogram(lang: Language) -> Histogram:
     """
     Generates an empty histogram for a given language.
 
     :param Language lang: The language enum indicating the considered alphabet.
 
-    :return: A list of tuples, each containing a letter and a frequency of 0.
-    :rtype: list
+    :return: A histogram with a frequency of 0 for every letter.
+    :rtype: Histogram
     """
 
-    return [(k, 0) for k in alphabets.alphabet(lang, LetterCase.LOWER)]
+    return Histogram(np.zeros(alphabets.get_alphabet(lang).size), lang)
 
 
-def similarity(histo1: list, histo2: list) -> float:
+def similarity(histo1: Histogram | list, histo2: Histogram | list) -> float:
     """
     Calculates the similarity between two normalized histograms using squared differences.
 
-    :param list histo1: The first histogram as a list of tuples.
-    :param list histo2: The second histogram as a list of tuples.
+    :param Histogram | list histo1: The first histogram.
+    :param Histogram | list histo2: The second histogram.
 
     :return: A measure of similarity between the histograms (1 - sum of squared differences).
     :rtype: float
     """
 
+    if isinstance(histo1, Histogram) and isinstance(histo2, Histogram) and len(histo1) == len(histo2):
+        difference = histo1.values - histo2.values
+        return 1 - float(np.dot(difference, difference))
+
     shortest = histo1 if len(histo1) < len(histo2) else histo2
     longest = histo2 if len(histo1) < len(histo2) else histo1
 
@@ -116,51 +293,61 @@ def _shift_list(l: list, step: int) -> list:
     return l[step:] + l[:step]
 
 
-def slide_histogram(histogram: list, step: int) -> list:
+def slide_histogram(histogram: Histogram | list, step: int) -> Histogram | list:
     """
     Shifts a histogram by a specified step to the right, wrapping around at the alphabet's end.
 
-    :param list histogram: The input histogram as a list of tuples.
+    :param Histogram | list histogram: The input histogram.
     :param int step: The number of positions to shift the histogram.
 
-    :return: The shifted histogram as a list of tuples.
-    :rtype: list
+    :return: The shifted histogram, of the same type as the input one.
+    :rtype: Histogram | list
     """
 
+    if isinstance(histogram, Histogram):
+        return histogram.slid(step)
+
     return _shift_list(histogram, step)
 
 
-def histogram_from_file(filepath: str, lang: Language) -> list:
+def histogram_from_file(filepath: str, lang: Language) -> Histogram:
     """
     Computes a normalized histogram from a text file's contents.
 
     :param str filepath: The path to the text file.
     :param Language lang: The language enum indicating the considered alphabet.
 
-    :return: A histogram as a list of tuples, or an empty histogram if file reading fails.
-    :rtype: list
+    :return: The histogram of the file, or an empty histogram if file reading fails.
+    :rtype: Histogram
     """
 
     try:
         if filepath:
+            counts = np.zeros(alphabets.get_alphabet(lang).size, dtype=np.int64)
             with open(filepath, 'r') as file:
-                return normalized_histogram(file.read(), lang)
+                while chunk := file.read(buffers.BLOCK_SIZE):
+                    counts += letter_counts(chunk, lang)
+
+            return Histogram.from_counts(counts, lang)
     except:
         pass
 
     return empty_histogram(lang)
 
 
-def find_step_for_best_match(target_histogram: list, sliding_histogram: list) -> int:
+def find_step_for_best_match(target_histogram: Histogram | list, sliding_histogram: Histogram | list) -> int:
     """
     Returns how many times should sliding_histogram shift to the right (closed)
     so it is as similar as possible to target_histogram.
-    :param list target_histogram: Histogram used as reference
-    :param list sliding_histogram: Histogram which slides
+    :param Histogram | list target_histogram: Histogram used as reference
+    :param Histogram | list sliding_histogram: Histogram which slides
     :return: The number of closed right shifts sliding histogram which maximises their similarity.
     :rtype: int
     It is a number in [0, len(target_histogram) - 1]
     """
+    if isinstance(target_histogram, Histogram) and isinstance(sliding_histogram, Histogram):
+        return int(np.argmax(shift_similarities(target_histogram, sliding_histogram)))
+
     best_similarity = similarity(target_histogram, sliding_histogram)
     step_for_best_fit = 0
 
@@ -175,26 +362,102 @@ def find_step_for_best_match(target_histogram: list, sliding_histogram: list) ->
     return step_for_best_fit
 
 
-def sort_histogram_by_key(histogram: list) -> list:
+def shift_similarities(targets: Histogram | np.ndarray, sliding_histogram: Histogram) -> np.ndarray:
+    """
+    Computes the similarity between one or several target histograms and every shift of a sliding
+    histogram, all at once.
+
+    With t the target and v the sliding values, the similarity for a shift s is
+    1 - (|t|² + |v|² - 2 * sum_i(t[i] * v[i - s])), so the scores of all the shifts of all the
+    targets come out of a single product with the circulant matrix of v.
+
+    :param Histogram | np.ndarray targets: The target histogram, or a two-dimensional array with the
+                                          values of a target histogram in every row.
+    :param Histogram sliding_histogram: Histogram which slides.
+
+    :return: The similarity for every shift in [0, n - 1] (a row of them per target, if several).
+    :rtype: np.ndarray
+    """
+    target_values = targets.values if isinstance(targets, Histogram) else np.asarray(targets, dtype=np.float64)
+    sliding_values = sliding_histogram.values
+    n = len(sliding_values)
+
+    # circulant[i, s] is the value which lands on letter i when sliding s positions to the right
+    circulant = sliding_values[_circulant_indices(n)]
+
+    target_norms = np.einsum('...i,...i->...', target_values, target_values)[..., np.newaxis]
+    cross_terms = target_values @ circulant
+
+    return 1 - (target_norms + np.dot(sliding_values, sliding_values) - 2 * cross_terms)
+
+
+def find_steps_for_best_match(targets: np.ndarray, sliding_histogram: Histogram) -> np.ndarray:
+    """
+    Batch version of `find_step_for_best_match`, for many target histograms and a single sliding one.
+
+    :param np.ndarray targets: A two-dimensional array with the values of a target histogram in every row.
+    :param Histogram sliding_histogram: Histogram which slides.
+
+    :return: For every target, the number of closed right shifts of the sliding histogram which
+             maximises their similarity.
+    :rtype: np.ndarray
+    """
+    return np.argmax(shift_similarities(targets, sliding_histogram), axis=-1)
+
+
+@functools.lru_cache(maxsize=None)
+def _circulant_indices(n: int) -> np.ndarray:
+    """
+    Retrieves the matrix of indices (i - s) mod n, for every letter i and shift s.
+
+    Matrices are built once and cached per size.
+
+    :param int n: The size of the alphabet.
+
+    :return: An n x n array of indices.
+    :rtype: np.ndarray
+    """
+    return (np.arange(n)[:, np.newaxis] - np.arange(n)[np.newaxis, :]) % n
+
+
+def sort_histogram_by_key(histogram: Histogram | list) -> Histogram | list:
     """
     Sorts a histogram by its keys, taking care of specific language characters.
 
-    :param list histogram: The input histogram as a list of tuples.
+    :param Histogram | list histogram: The input histogram.
 
     :return: The histogram sorted by its keys.
-    :rtype: list
+    :rtype: Histogram | list
     """
+    if isinstance(histogram, Histogram):
+        return histogram.sorted()
+
     if not histogram:
         return []
 
     if isinstance(histogram[0][0], str) and all(len(c) == 1 for (c, _) in histogram):
         # It's a letter histogram, so we need to take care of letter ñ in Spanish
         alphabet = None
-        if len(histogram) == len(alphabets.alphabet(Language.ESP, LetterCase.LOWER)):
-            alphabet = alphabets.alphabet(Language.ESP, LetterCase.LOWER)
+        if len(histogram) == alphabets.get_alphabet(Language.ESP).size:
+            alphabet = alphabets.get_alphabet(Language.ESP)
         else:
-            alphabet = alphabets.alphabet(Language.ENG, LetterCase.LOWER)
+            alphabet = alphabets.get_alphabet(Language.ENG)
 
-        return sorted(histogram, key=lambda x: alphabet.index(x[0]), reverse=False)
+        return sorted(histogram, key=lambda x: alphabet.index[x[0]], reverse=False)
 
     return sorted(histogram, key=lambda e: e[0], reverse=False)
+
+
+def keys_and_values(histogram: Histogram | list) -> tuple:
+    """
+    Splits a histogram into its keys and its values, in the order of the histogram.
+
+    :param Histogram | list histogram: The histogram, or a list of (key, value) pairs.
+
+    :return: A tuple with the list of keys and the list of values.
+    :rtype: tuple
+    """
+    if isinstance(histogram, Histogram):
+        return list(histogram.letters), histogram.values.tolist()
+
+    return [k for (k, _) in histogram], [v for (_, v) in histogram]
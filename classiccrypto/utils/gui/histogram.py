@@ -4,36 +4,39 @@ from matplotlib.figure import Figure
 from classiccrypto.utils import frequency
 
 
-def create_histogram_figure(histogram: list, title: str, y_label: str) -> Figure:
+def create_histogram_figure(histogram: frequency.Histogram | list, title: str, y_label: str) -> Figure:
     """
     Create a matplotlib Figure object representing a bar chart of the given histogram data.
 
-    :param list histogram: A list of (key, value) pairs representing the histogram data.
+    :param Histogram | list histogram: A letter histogram, or a list of (key, value) pairs representing the histogram data.
     :param str title: The title to be displayed above the histogram.
     :param str y_label: The label for the y-axis.
 
     :return: A matplotlib Figure object displaying the histogram.
     :rtype: Figure
     """
-    letters = [k for (k, v) in histogram]
-    letter_freqs = [v for (k, v) in histogram]
+    letters, letter_freqs = frequency.keys_and_values(histogram)
 
     figure = Figure(figsize=(4, 4), dpi=100)
     axes = figure.add_subplot()
-    axes.bar(list(letters), list(letter_freqs))
+    axes.bar(letters, letter_freqs)
     axes.set_title(title)
     axes.set_ylabel(y_label)
 
     return figure
 
 
-def update_histogram_figure(figure: Figure, histogram: list, title: str = None, ylabel: str = None):
+def update_histogram_figure(figure: Figure,
+                            histogram: frequency.Histogram | list,
+                            title: str = None,
+                            ylabel: str = None):
     """
     Update a matplotlib Figure object with new histogram data while maintaining the previous titles and labels
     if new ones are not provided.
 
     :param Figure figure: A matplotlib Figure object to be updated.
-    :param list histogram: A list of (key, value) pairs representing the new histogram data.
+    :param Histogram | list histogram: A letter histogram, or a list of (key, value) pairs representing the new
+                                       histogram data.
     :param str title: A new title for the histogram. If None, the previous title is kept.
     :param str ylabel: A new y-axis label for the histogram. If None, the previous label is kept.
     """
@@ -43,7 +46,7 @@ def update_histogram_figure(figure: Figure, histogram: list, title: str = None,
     current_ylabel = axes.yaxis.get_label().get_text()
 
     axes.clear()
-    axes.bar([k for (k, v) in histogram], [v for (k, v) in histogram])
+    axes.bar(*frequency.keys_and_values(histogram))
 
     axes.set_title(title if title else current_title)
     axes.set_ylabel(ylabel if ylabel else current_ylabel)
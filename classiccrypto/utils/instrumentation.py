@@ -0,0 +1,151 @@
+import time
+from contextlib import nullcontext
+
+# Separator between the names of nested spans
+SEPARATOR = '/'
+
+# Whether spans and counters are recorded. They are not by default, and then cost a single check
+_enabled = False
+
+# Number of calls and total seconds of every span, by path, in the order they were first entered
+_spans = dict()
+
+# Value of every counter, by name
+_counters = dict()
+
+# Names of the spans currently open, from the outermost one
+_stack = []
+
+# Context manager returned by `span` while recording is disabled, which does nothing
+_NULL_SPAN = nullcontext()
+
+
+class _Span:
+    """
+    Context manager timing a span, and adding its time to the span of the same path.
+    """
+
+    __slots__ = ('name', 'path', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.path = None
+        self.start = 0.0
+
+    def __enter__(self):
+        _stack.append(self.name)
+        self.path = SEPARATOR.join(_stack)
+        # Spans are registered when entered, so parents are listed before their children
+        _spans.setdefault(self.path, [0, 0.0])
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = time.perf_counter() - self.start
+        _stack.pop()
+        entry = _spans[self.path]
+        entry[0] += 1
+        entry[1] += elapsed
+        return False
+
+
+def enable():
+    """
+    Start recording spans and counters.
+    """
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """
+    Stop recording spans and counters. What was recorded is kept until `reset`.
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """
+    Forget every span and counter recorded.
+    """
+    _spans.clear()
+    _counters.clear()
+    _stack.clear()
+
+
+def span(name: str):
+    """
+    Time a phase of the work, as a context manager.
+
+    Spans opened inside another one are recorded under the path of their parents (e.g.
+    "crack/key_length/kasiski"), so the same phase is told apart by where it runs from. Every
+    span adds its time and one call to the totals of its path.
+
+    Recording happens in the current process only: spans and counters of worker processes are lost.
+
+    :param str name: The name of the phase.
+
+    :return: A context manager timing the phase, or one doing nothing if recording is disabled.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def count(name: str, amount: int = 1):
+    """
+    Add to a counter, such as the number of keys tried or characters scanned.
+
+    :param str name: The name of the counter.
+    :param int, optional amount: The amount added. Defaults to 1.
+    """
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def snapshot() -> dict:
+    """
+    Get everything recorded so far.
+
+    :return: A dictionary with the "spans", mapping every path to its "calls" and "seconds", and the
+             "counters", mapping every name to its value.
+    :rtype: dict
+    """
+    return {
+        'spans': {path: {'calls': calls, 'seconds': seconds} for path, (calls, seconds) in _spans.items()},
+        'counters': dict(_counters),
+    }
+
+
+def report() -> str:
+    """
+    Format everything recorded so far as a table.
+
+    Spans are indented under their parents, with their share of the total time of the outermost spans.
+
+    :return: The breakdown of the time and the counters.
+    :rtype: str
+    """
+    total = sum(seconds for path, (_, seconds) in _spans.items() if SEPARATOR not in path)
+    width = max([len(path.split(SEPARATOR)[-1]) + 2 * path.count(SEPARATOR) for path in _spans] + [len('Span')])
+
+    lines = [f"{'Span':<{width}}  {'Calls':>7}  {'Time':>12}  {'Share':>6}"]
+    for path, (calls, seconds) in _spans.items():
+        depth = path.count(SEPARATOR)
+        name = '  ' * depth + path.split(SEPARATOR)[-1]
+        share = seconds / total if total > 0 else 0.0
+        lines.append(f"{name:<{width}}  {calls:>7}  {seconds * 1000:>9.2f} ms  {share:>6.1%}")
+
+    if _counters:
+        width = max(len(name) for name in _counters)
+        lines.append('')
+        lines.append('Counters')
+        for name, value in _counters.items():
+            lines.append(f"  {name:<{width}}  {value:>14,}")
+
+    return '\n'.join(lines)
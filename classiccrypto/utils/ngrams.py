@@ -0,0 +1,167 @@
+import numpy as np
+
+from classiccrypto.utils import Language
+from classiccrypto.utils import alphabets
+from classiccrypto.utils import cleaning
+from classiccrypto.utils import frequency
+
+# Length of the n-grams of the models built by default
+DEFAULT_N = 4
+
+# Shortest and longest n-grams of the models built. Models hold the log-probability of every
+# possible n-gram, which takes about 115 MB for the 5-grams of the Spanish alphabet, and 3 GB for its
+# 6-grams
+MIN_N = 2
+MAX_N = 5
+
+# Number of occurrences assumed for the n-grams which never appear in the corpus
+UNSEEN_COUNT = 0.01
+
+
+class NgramModel:
+    """
+    Class representing a language model which scores texts by the log-probabilities of their n-grams.
+
+    The model is a flat array with an entry for every possible n-gram of the alphabet: the n-gram
+    whose letters are at positions (i_1, ..., i_n) of the alphabet is stored at index
+    i_1 * size^(n-1) + ... + i_n. Scoring a text is then a single gather over the codes of its n-grams.
+
+    :ivar Language lang: The language of the model.
+    :ivar int n: The length of the n-grams.
+    :ivar np.ndarray log_probabilities: The base 10 log-probability of every n-gram.
+    """
+
+    def __init__(self, log_probabilities: np.ndarray, lang: Language):
+        """
+        Initialize a new NgramModel instance.
+
+        :param np.ndarray log_probabilities: The log-probability of every n-gram, as a flat array whose
+                                             length is a power of the size of the alphabet.
+        :param Language lang: The language of the model.
+
+        :raises ValueError: If the length of the array is not a power of the size of the alphabet.
+        """
+        size = alphabets.get_alphabet(lang).size
+        n = round(np.log(len(log_probabilities)) / np.log(size))
+        if n < 1 or size ** n != len(log_probabilities):
+            raise ValueError(f"A model of {len(log_probabilities)} n-grams does not fit the {lang} alphabet")
+
+        self.lang = lang
+        self.n = n
+        self.log_probabilities = np.asarray(log_probabilities, dtype=np.float64)
+        self._powers = size ** np.arange(n - 1, -1, -1)
+
+    @classmethod
+    def from_indices(cls, indices: np.ndarray, lang: Language, n: int = DEFAULT_N) -> 'NgramModel':
+        """
+        Build a model from the letters of a corpus.
+
+        :param np.ndarray indices: Positions in the alphabet of the letters of the corpus.
+        :param Language lang: The language of the corpus.
+        :param int, optional n: The length of the n-grams. Defaults to DEFAULT_N.
+
+        :return: The model of the corpus.
+        :rtype: NgramModel
+
+        :raises ValueError: If n is not between MIN_N and MAX_N.
+        """
+        if not MIN_N <= n <= MAX_N:
+            raise ValueError(f"The length of the n-grams must be between {MIN_N} and {MAX_N}, not {n}")
+
+        size = alphabets.get_alphabet(lang).size
+        powers = size ** np.arange(n - 1, -1, -1)
+
+        codes = np.zeros(max(0, len(indices) - n + 1), dtype=np.int64)
+        for offset, power in enumerate(powers):
+            codes += indices[offset:offset + len(codes)].astype(np.int64) * power
+
+        counts = np.bincount(codes, minlength=size ** n).astype(np.float64)
+        total = max(len(codes), 1)
+        return cls(np.log10(np.maximum(counts, UNSEEN_COUNT) / total), lang)
+
+    @classmethod
+    def from_files(cls,
+                   paths: list,
+                   lang: Language,
+                   n: int = DEFAULT_N,
+                   encoding: str = 'utf-8',
+                   fold_accents: bool = False) -> 'NgramModel':
+        """
+        Build a model from the letters of several text files.
+
+        Only the letters of the files are considered, so n-grams span over spaces and punctuation,
+        just as in a cleaned ciphertext.
+
+        :param list paths: The paths to the files of the corpus.
+        :param Language lang: The language of the corpus.
+        :param int, optional n: The length of the n-grams. Defaults to DEFAULT_N.
+        :param str, optional encoding: The encoding of the files. Defaults to UTF-8.
+        :param bool, optional fold_accents: If True, accented letters count as their base letter
+                                            instead of being dropped. Defaults to False.
+
+        :return: The model of the corpus.
+        :rtype: NgramModel
+
+        :raises ValueError: If n is not between MIN_N and MAX_N.
+        """
+        cleaner = cleaning.Cleaner(lang, fold_accents)
+        indices = []
+        for path in paths:
+            with open(path, 'r', encoding=encoding) as src:
+                indices.append(frequency.letter_indices(cleaner.clean(src.read()), lang))
+
+        return cls.from_indices(np.concatenate(indices) if indices else np.zeros(0, dtype=np.int16), lang, n)
+
+    @classmethod
+    def load(cls, path: str, lang: Language) -> 'NgramModel':
+        """
+        Load a model saved with `save`.
+
+        :param str path: The path to the .npy file.
+        :param Language lang: The language of the model.
+
+        :return: The model.
+        :rtype: NgramModel
+
+        :raises ValueError: If the model does not fit the alphabet of the language.
+        """
+        return cls(np.load(path, allow_pickle=False), lang)
+
+    def save(self, path: str):
+        """
+        Save the model as a flat .npy array.
+
+        :param str path: The path to the file.
+        """
+        np.save(path, self.log_probabilities, allow_pickle=False)
+
+    def codes(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Compute the code of every n-gram of a text.
+
+        :param np.ndarray indices: Positions in the alphabet of the letters of the text, either as a
+                                   single text or as an array of texts (the last axis being the letters).
+
+        :return: The code of every n-gram, i.e. its index in `log_probabilities`. It is empty if the
+                 text is shorter than n.
+        :rtype: np.ndarray
+        """
+        length = indices.shape[-1] - self.n + 1
+        codes = np.zeros(indices.shape[:-1] + (max(0, length),), dtype=np.int64)
+        if length <= 0:
+            return codes
+
+        for offset, power in enumerate(self._powers):
+            codes += indices[..., offset:offset + length].astype(np.int64) * power
+        return codes
+
+    def score(self, indices: np.ndarray) -> float:
+        """
+        Compute the log-probability of a text, as the sum of the log-probabilities of its n-grams.
+
+        :param np.ndarray indices: Positions in the alphabet of the letters of the text.
+
+        :return: The score of the text. The higher, the more it looks like the language of the model.
+        :rtype: float
+        """
+        return float(self.log_probabilities[self.codes(indices)].sum())
@@ -0,0 +1,73 @@
+import heapq
+import itertools
+
+
+class TopK:
+    """
+    Class keeping the k items with the highest scores out of a stream of candidates.
+
+    Candidates are kept in a min-heap of at most k entries, so pushing one is O(log k) and memory
+    does not grow with the number of candidates. Among items with the same score, the ones pushed
+    first rank higher.
+
+    :ivar int k: The maximum number of items kept.
+    """
+
+    def __init__(self, k: int):
+        """
+        Initialize a new TopK instance.
+
+        :param int k: The maximum number of items kept.
+
+        :raises ValueError: If `k` is not positive.
+        """
+        if k < 1:
+            raise ValueError(f"k must be positive, not {k}")
+
+        self.k = k
+        self._heap = []
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, score: float, item) -> bool:
+        """
+        Offer a candidate.
+
+        :param float score: The score of the candidate. The higher, the better.
+        :param item: The candidate.
+
+        :return: True if the candidate is among the k best so far, False if it was discarded.
+        :rtype: bool
+        """
+        # Later candidates get lower tie-breakers, so they are the first to go on equal scores
+        entry = (score, -next(self._counter), item)
+
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return True
+
+        if entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+
+        return False
+
+    def threshold(self) -> float:
+        """
+        Get the score a candidate has to beat to be kept, once k candidates have been pushed.
+
+        :return: The lowest score kept, or minus infinity while fewer than k candidates are kept.
+        :rtype: float
+        """
+        return self._heap[0][0] if len(self._heap) == self.k else float('-inf')
+
+    def items(self) -> list:
+        """
+        Get the items kept, from the best to the worst one.
+
+        :return: A list of (item, score) pairs, sorted by decreasing score.
+        :rtype: list
+        """
+        return [(item, score) for score, _, item in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
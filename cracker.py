@@ -1,28 +1,47 @@
 import argparse
-from enum import Enum
+import glob
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import socket
+import sqlite3
+import sys
+import tempfile
+import time
 
 import classiccrypto
 import classiccrypto.cryptoschemes.cracking.affine
 import classiccrypto.cryptoschemes.cracking.caesar
+import classiccrypto.cryptoschemes.cracking.identify
+import classiccrypto.cryptoschemes.cracking.sampling
 import classiccrypto.cryptoschemes.cracking.vigenere
+from classiccrypto.cryptoschemes import streaming
+from classiccrypto.cryptoschemes.cracking.sampling import SamplingPolicy
 from classiccrypto.cryptoschemes.keys.cipherkey import Cipherkey
-from classiccrypto.utils import Language
-from classiccrypto.utils import alphabets
+from classiccrypto.utils import Cryptoscheme, Language, Mode
+from classiccrypto.utils import buffers
+from classiccrypto.utils import checkpoints
+from classiccrypto.utils import cleaning
+from classiccrypto.utils import instrumentation
+from classiccrypto.utils.ngrams import NgramModel
 
+# Files at least this large are memory-mapped and processed as bytes, when their encoding allows it
+MMAP_THRESHOLD = 1 << 24
 
-class Cryptoscheme(Enum):
-    CAESAR = 1
-    AFFINE = 2
-    VIGENERE = 3
+# Unix socket where cracker_daemon.py listens by default
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), 'classiccrypto-cracker.sock')
 
-    @staticmethod
-    def from_string(s: str) -> "Cryptoscheme":
-        mapping = {
-            "caesar": Cryptoscheme.CAESAR,
-            "affine": Cryptoscheme.AFFINE,
-            "vigenere": Cryptoscheme.VIGENERE,
-        }
-        return mapping.get(s.lower())
+# File where --profile saves the profile by default
+DEFAULT_PROFILE_PATH = 'cracker.prof'
+
+# Number of functions listed by --profile
+PROFILE_LINES = 25
+
+# Number of files cracked or queued per worker process at any time in --batch mode, so workers never
+# wait for work while memory does not grow with the number of files
+BATCH_IN_FLIGHT_PER_WORKER = 4
 
 
 def parse_arguments() -> object:
@@ -34,8 +53,9 @@ def parse_arguments() -> object:
     parser.add_argument('--cryptoscheme',
                         metavar='cryptoscheme',
                         type=str,
-                        choices=['vigenere', 'caesar', 'affine'],
-                        help='The cryptoscheme to crack: vigenere, caesar, or affine',
+                        choices=['vigenere', 'caesar', 'affine', 'auto'],
+                        help='The cryptoscheme to crack: vigenere, caesar, or affine. With auto, it is '
+                             'identified from the statistics of the ciphertext',
                         required=True)
 
     parser.add_argument('--no-gui',
@@ -57,21 +77,225 @@ def parse_arguments() -> object:
                         action='store_true',
                         help='Whether the text should be decrypted')
 
+    parser.add_argument('--encoding',
+                        metavar='encoding',
+                        type=str,
+                        default='utf-8',
+                        help='Encoding of the file (defaults to utf-8). Large latin-1 files, or large English '
+                             'files in an ASCII-compatible encoding, are processed as bytes without decoding them')
+
+    parser.add_argument('--fold-accents',
+                        action='store_true',
+                        help='Count accented letters (á, é, ü...) as their base letter instead of ignoring them. '
+                             'The cryptoschemes of this package leave accented letters unencrypted, so this is '
+                             'only meant for ciphertexts whose accented letters were encrypted as their base letter')
+
+    parser.add_argument('--key-length',
+                        metavar='key_length',
+                        type=int,
+                        help='Length of the key (vigenere only). If not provided, it is asked interactively, '
+                             'unless --auto is given')
+
+    parser.add_argument('--auto',
+                        action='store_true',
+                        help='Estimate the key length automatically instead of asking for it (vigenere only)')
+
+    parser.add_argument('--max-key-length',
+                        metavar='max_key_length',
+                        type=int,
+                        default=classiccrypto.cryptoschemes.cracking.vigenere.DEFAULT_MAX_KEY_LENGTH,
+                        help='Longest key length considered by --auto (defaults to '
+                             f'{classiccrypto.cryptoschemes.cracking.vigenere.DEFAULT_MAX_KEY_LENGTH})')
+
+    parser.add_argument('--ngram-model',
+                        metavar='ngram_model',
+                        type=str,
+                        help='Language model built with build_ngram_model.py. If provided, the key found for '
+                             'vigenere is refined by hill climbing against it')
+
+    parser.add_argument('--restarts',
+                        metavar='restarts',
+                        type=int,
+                        default=classiccrypto.cryptoschemes.cracking.vigenere.DEFAULT_RESTARTS,
+                        help='Number of hill climbs run in parallel by --ngram-model (defaults to '
+                             f'{classiccrypto.cryptoschemes.cracking.vigenere.DEFAULT_RESTARTS})')
+
+    parser.add_argument('--sample',
+                        metavar='size',
+                        type=int,
+                        nargs='?',
+                        const=classiccrypto.cryptoschemes.cracking.sampling.DEFAULT_SAMPLE_SIZE,
+                        help='Score the keys on a sample of this many letters (defaults to '
+                             f'{classiccrypto.cryptoschemes.cracking.sampling.DEFAULT_SAMPLE_SIZE}), spread over '
+                             'the whole ciphertext, and grow it only while the best key is not clear. '
+                             'Keeps cracking time flat on very large files. With --top-k and --json, the keys are '
+                             'ranked by their scores on the conclusive sample')
+
+    parser.add_argument('--sample-growth',
+                        metavar='growth',
+                        type=int,
+                        default=classiccrypto.cryptoschemes.cracking.sampling.DEFAULT_GROWTH,
+                        help='Factor by which --sample grows the sample when it is not conclusive (defaults to '
+                             f'{classiccrypto.cryptoschemes.cracking.sampling.DEFAULT_GROWTH})')
+
+    parser.add_argument('--sample-margin',
+                        metavar='margin',
+                        type=float,
+                        default=classiccrypto.cryptoschemes.cracking.sampling.DEFAULT_MIN_MARGIN,
+                        help='Smallest score difference between the best and the second-best candidates for '
+                             'a sample to be conclusive (defaults to '
+                             f'{classiccrypto.cryptoschemes.cracking.sampling.DEFAULT_MIN_MARGIN})')
+
+    parser.add_argument('--top-k',
+                        metavar='k',
+                        type=int,
+                        help='Also list the k most likely keys with their scores. Keys are always ranked by '
+                             'their full score, so --fast does not apply')
+
+    parser.add_argument('--json',
+                        action='store_true',
+                        help='Print the result as a JSON object, with the ranked candidate keys '
+                             '(only the best one unless --top-k is given)')
+
+    parser.add_argument('--connect',
+                        metavar='socket',
+                        nargs='?',
+                        const=DEFAULT_SOCKET_PATH,
+                        help='Forward the request to a running cracker_daemon.py listening on this Unix socket '
+                             f'(defaults to {DEFAULT_SOCKET_PATH}). Falls back to cracking in-process if the '
+                             'daemon is not available')
+
+    parser.add_argument('--stats',
+                        action='store_true',
+                        help='Print to stderr how long every phase took (reading, cleaning, key length estimation, '
+                             'Kasiski examination, column cracking...) and counters such as the keys tried')
+
+    parser.add_argument('--stats-json',
+                        metavar='path',
+                        nargs='?',
+                        const='-',
+                        help='Write the phase timings and counters as JSON to this file (defaults to stderr)')
+
+    parser.add_argument('--profile',
+                        metavar='path',
+                        nargs='?',
+                        const=DEFAULT_PROFILE_PATH,
+                        help='Run under cProfile, print the most expensive functions to stderr and save the '
+                             f'profile to this file for pstats or snakeviz (defaults to {DEFAULT_PROFILE_PATH})')
+
+    parser.add_argument('--batch',
+                        action='store_true',
+                        help='Crack many files in parallel, printing one JSON line per file as they are cracked. '
+                             'Files with the same contents are only cracked once')
+
+    parser.add_argument('--workers',
+                        metavar='workers',
+                        type=int,
+                        default=os.cpu_count(),
+                        help='Number of worker processes of --batch (defaults to the number of CPUs)')
+
+    parser.add_argument('--max-in-flight',
+                        metavar='files',
+                        type=int,
+                        help='Largest number of files being cracked or queued at once by --batch (defaults to '
+                             f'{BATCH_IN_FLIGHT_PER_WORKER} per worker)')
+
+    parser.add_argument('--checkpoint',
+                        metavar='database',
+                        type=str,
+                        help='SQLite database recording the progress of --batch. Running the same command again '
+                             'resumes the job: finished files are skipped and interrupted ones cracked again')
+
     parser.add_argument('filepath',
                         metavar='filepath',
                         type=str,
-                        help='The path to the file to decrypt')
+                        nargs='+',
+                        help='The path to the file to decrypt. With --batch, any number of files, directories '
+                             '(cracked recursively) or glob patterns')
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.key_length is not None and args.key_length < 1:
+        parser.error('--key-length must be positive')
+    if args.top_k is not None and args.top_k < 1:
+        parser.error('--top-k must be positive')
+    if args.fast and (args.top_k or args.json or args.batch):
+        # Candidates are always ranked by their full score
+        parser.error('--fast cannot be used with --top-k, --json or --batch')
+    if args.batch:
+        if args.decrypt or args.connect:
+            parser.error('--decrypt and --connect cannot be used with --batch')
+        if args.workers < 1 or (args.max_in_flight is not None and args.max_in_flight < 1):
+            parser.error('--workers and --max-in-flight must be positive')
+    elif args.checkpoint:
+        parser.error('--checkpoint can only be used with --batch')
+    elif len(args.filepath) > 1:
+        parser.error('only one file can be cracked at a time without --batch')
+    else:
+        args.filepath = args.filepath[0]
+
+    return args
+
+
+def crack(cryptoscheme: Cryptoscheme,
+          message: str,
+          lang: Language,
+          no_gui: bool,
+          fast: bool,
+          key_length: int = None,
+          auto: bool = False,
+          max_key_length: int = classiccrypto.cryptoschemes.cracking.vigenere.DEFAULT_MAX_KEY_LENGTH,
+          ngram_model: NgramModel = None,
+          restarts: int = classiccrypto.cryptoschemes.cracking.vigenere.DEFAULT_RESTARTS,
+          sampling: SamplingPolicy = None,
+          workers: int = None) -> Cipherkey:
+    if cryptoscheme == Cryptoscheme.CAESAR:
+        return classiccrypto.cryptoschemes.cracking.caesar.crack(message, lang, fast, sampling)
+    elif cryptoscheme == Cryptoscheme.AFFINE:
+        return classiccrypto.cryptoschemes.cracking.affine.crack(message, lang, fast, sampling)
+    elif cryptoscheme == Cryptoscheme.VIGENERE:
+        return classiccrypto.cryptoschemes.cracking.vigenere.crack(message,
+                                                                   lang,
+                                                                   no_gui,
+                                                                   fast,
+                                                                   key_length,
+                                                                   auto,
+                                                                   max_key_length,
+                                                                   ngram_model,
+                                                                   restarts,
+                                                                   sampling,
+                                                                   workers)
+    else:
+        raise ValueError('Invalid scheme: ' + str(cryptoscheme))
 
 
-def crack(cryptoscheme: Cryptoscheme, message: str, lang: Language, no_gui: bool, fast: bool) -> Cipherkey:
+def crack_top_k(cryptoscheme: Cryptoscheme,
+                message: str,
+                lang: Language,
+                no_gui: bool,
+                k: int,
+                key_length: int = None,
+                auto: bool = False,
+                max_key_length: int = classiccrypto.cryptoschemes.cracking.vigenere.DEFAULT_MAX_KEY_LENGTH,
+                ngram_model: NgramModel = None,
+                restarts: int = classiccrypto.cryptoschemes.cracking.vigenere.DEFAULT_RESTARTS,
+                sampling: SamplingPolicy = None,
+                workers: int = None) -> list:
     if cryptoscheme == Cryptoscheme.CAESAR:
-        return classiccrypto.cryptoschemes.cracking.caesar.crack(message, lang, fast)
+        return classiccrypto.cryptoschemes.cracking.caesar.crack_top_k(message, lang, k, sampling)
     elif cryptoscheme == Cryptoscheme.AFFINE:
-        return classiccrypto.cryptoschemes.cracking.affine.crack(message, lang, fast)
+        return classiccrypto.cryptoschemes.cracking.affine.crack_top_k(message, lang, k, sampling)
     elif cryptoscheme == Cryptoscheme.VIGENERE:
-        return classiccrypto.cryptoschemes.cracking.vigenere.crack(message, lang, no_gui, fast)
+        return classiccrypto.cryptoschemes.cracking.vigenere.crack_top_k(message,
+                                                                         lang,
+                                                                         k,
+                                                                         no_gui,
+                                                                         key_length,
+                                                                         auto,
+                                                                         max_key_length,
+                                                                         ngram_model,
+                                                                         restarts,
+                                                                         sampling,
+                                                                         workers)
     else:
         raise ValueError('Invalid scheme: ' + str(cryptoscheme))
 
@@ -85,32 +309,562 @@ def decrypt(cryptoscheme: Cryptoscheme, message: str, key: Cipherkey) -> str:
         return classiccrypto.cryptoschemes.vigenere.decrypt(message, key)
 
 
-def main():
-    args = parse_arguments()
+def use_mmap(filepath: str, lang: Language, encoding: str, accents: bool = False) -> bool:
+    return buffers.is_byte_compatible(encoding, lang, accents) and os.path.getsize(filepath) >= MMAP_THRESHOLD
+
+
+def read_clean_ciphertext(filepath: str, lang: Language, encoding: str, fold_accents: bool = False) -> str:
+    cleaner = cleaning.Cleaner(lang, fold_accents)
+    if use_mmap(filepath, lang, encoding, fold_accents):
+        # Clean the ciphertext straight from the mapped file, only the letters are ever copied
+        with open(filepath, "rb") as src, mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with instrumentation.span('clean'):
+                return cleaner.clean(mapped).decode(buffers.ENCODING)
+
+    # Clean the ciphertext chunk by chunk, so the raw file is never held in memory at once
+    letters = []
+    with open(filepath, "r", encoding=encoding) as src:
+        for chunk in streaming.read_chunks(src):
+            with instrumentation.span('clean'):
+                letters.append(cleaner.feed(chunk))
+    return ''.join(letters)
+
+
+def write_decrypted(filepath: str, key: Cipherkey, encoding: str):
+    if use_mmap(filepath, key.lang, encoding):
+        sys.stdout.flush()
+        translator = streaming.StreamTranslator(key, Mode.DECRYPTION)
+        with open(filepath, "rb") as src, mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for start in range(0, len(mapped), streaming.DEFAULT_CHUNK_SIZE):
+                sys.stdout.buffer.write(translator.feed(mapped[start:start + streaming.DEFAULT_CHUNK_SIZE]))
+        sys.stdout.buffer.flush()
+        return
+
+    with open(filepath, "r", encoding=encoding) as src:
+        for decrypted in streaming.translate_stream(streaming.read_chunks(src), key, Mode.DECRYPTION):
+            sys.stdout.write(decrypted)
+
+
+def decrypted_text(filepath: str, key: Cipherkey, encoding: str) -> str:
+    if use_mmap(filepath, key.lang, encoding):
+        with open(filepath, "rb") as src, mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return streaming.StreamTranslator(key, Mode.DECRYPTION).feed(mapped).decode(buffers.ENCODING)
+
+    with open(filepath, "r", encoding=encoding) as src:
+        return ''.join(streaming.translate_stream(streaming.read_chunks(src), key, Mode.DECRYPTION))
+
+
+def print_candidates(candidates: list):
+    print(f'\nTop {len(candidates)} candidate keys:')
+    for rank, (key, score) in enumerate(candidates, start=1):
+        print(f'{rank:>3}. {key} (score: {score:.6f})')
+
+
+def print_json(args, candidates: list, plaintext: str = None, confidence: float = None):
+    result = {
+        'cryptoscheme': args.cryptoscheme,
+        'lang': args.lang,
+        'key': candidates[0][0],
+        'candidates': [{'key': key, 'score': score} for key, score in candidates],
+    }
+    if confidence is not None:
+        result['identification_confidence'] = confidence
+    if plaintext is not None:
+        result['plaintext'] = plaintext
+
+    print(json.dumps(result, ensure_ascii=False))
+
+
+def request_daemon(socket_path: str, request: dict) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps(request).encode('utf-8') + b'\n')
+
+        with connection.makefile('rb') as responses:
+            response = responses.readline()
+
+    if not response:
+        raise ConnectionError("The daemon closed the connection")
+    return json.loads(response)
+
+
+def sampling_policy(args) -> SamplingPolicy | None:
+    if args.sample is None:
+        return None
+    return SamplingPolicy(args.sample, args.sample_growth, args.sample_margin)
+
+
+def crack_in_daemon(args) -> bool:
+    request = {
+        'op': 'crack',
+        'scheme': args.cryptoscheme,
+        'lang': args.lang,
+        'path': os.path.abspath(args.filepath),
+        'encoding': args.encoding,
+        'fold_accents': args.fold_accents,
+        'fast': args.fast,
+        'key_length': args.key_length,
+        'auto': args.auto,
+        'max_key_length': args.max_key_length,
+        'ngram_model': os.path.abspath(args.ngram_model) if args.ngram_model else None,
+        'restarts': args.restarts,
+        'decrypt': args.decrypt,
+        'top_k': args.top_k or (1 if args.json else None),
+        'sample': args.sample,
+        'sample_growth': args.sample_growth,
+        'sample_margin': args.sample_margin,
+    }
+
     try:
-        with open(args.filepath, "r") as src:
-            ciphertext = src.read()
-    except IOError:
-        print(f"Error opening {args.filepath}")
+        response = request_daemon(args.connect, request)
+    except (OSError, ValueError) as e:
+        print(f"Cracking daemon not available ({e}), cracking in-process", file=sys.stderr)
+        return False
+
+    if not response.get('ok'):
+        print(f"Cracking daemon error ({response.get('error')}), cracking in-process", file=sys.stderr)
+        return False
+
+    if 'confidence' in response:
+        args.cryptoscheme = response['scheme']
+        if not args.json:
+            print(f'Identified cryptoscheme: {response["scheme"]} (confidence: {response["confidence"]:.2f})')
+
+    candidates = [(candidate['key'], candidate['score']) for candidate in response.get('candidates', [])]
+
+    if args.json:
+        print_json(args, candidates, response.get('plaintext'), response.get('confidence'))
+        return True
+
+    print(f'Encryption key: {response["key"]}')
+
+    if args.top_k:
+        print_candidates(candidates)
+
+    if args.decrypt:
+        print('\nDecrypted message:')
+        print(response['plaintext'])
+
+    return True
+
+
+def batch_files(inputs: list):
+    """
+    Expand the inputs of --batch into the files to crack, lazily, so huge directories are never
+    listed at once.
+
+    :param list inputs: Paths to files or directories, or glob patterns.
+
+    :return: An iterator over the paths of the files.
+    :rtype: Iterator[str]
+    """
+    for entry in inputs:
+        if os.path.isdir(entry):
+            for root, directories, filenames in os.walk(entry):
+                directories.sort()
+                for filename in sorted(filenames):
+                    yield os.path.join(root, filename)
+        elif os.path.isfile(entry):
+            yield entry
+        else:
+            for path in glob.iglob(entry, recursive=True):
+                if os.path.isfile(path):
+                    yield path
+
+
+def file_digest(filepath: str) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as src:
+        for chunk in streaming.read_chunks(src):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _init_batch_worker(args):
+    """
+    Keep the options of --batch, and the n-gram model they name, in a worker process, so they are
+    only sent and loaded once.
+    """
+    language = Language.from_string(args.lang)
+    ngram_model = NgramModel.load(args.ngram_model, language) if args.ngram_model else None
+    crack_batch_file.state = (args, ngram_model, sampling_policy(args))
+
+
+def crack_batch_file(filepath: str) -> dict:
+    """
+    Crack a file of --batch, in a worker process.
+
+    There is nobody to ask for the key length of Vigenere ciphertexts, so it is always estimated if
+    not given. Keys are ranked as with --json.
+
+    :param str filepath: The path to the file.
+
+    :return: The result: the "cryptoscheme", "lang", "key", "score" and "elapsed" seconds, with the
+             "candidates" if --top-k is given and the "identification_confidence" if the cryptoscheme
+             was identified, or the "error" raised.
+    :rtype: dict
+    """
+    args, ngram_model, sampling = crack_batch_file.state
+    language = Language.from_string(args.lang)
+    start = time.perf_counter()
+
+    try:
+        clean_ciphertext = read_clean_ciphertext(filepath, language, args.encoding, args.fold_accents)
+        if not clean_ciphertext:
+            raise ValueError("No letters to crack")
+
+        identification = None
+        cryptoscheme = Cryptoscheme.from_string(args.cryptoscheme)
+        if args.cryptoscheme == 'auto':
+            identification = classiccrypto.cryptoschemes.cracking.identify.identify(clean_ciphertext,
+                                                                                     language,
+                                                                                     args.max_key_length)
+            if identification.scheme is None:
+                raise ValueError(f"Could not identify the cryptoscheme: {identification}")
+            cryptoscheme = identification.scheme
+
+        # The batch already keeps every CPU busy, so keys are refined in this worker rather than in a
+        # pool of its own
+        candidates = crack_top_k(cryptoscheme,
+                                 clean_ciphertext,
+                                 language,
+                                 True,
+                                 args.top_k or 1,
+                                 args.key_length,
+                                 True,
+                                 args.max_key_length,
+                                 ngram_model,
+                                 args.restarts,
+                                 sampling,
+                                 workers=1)
+    except Exception as e:
+        # Whatever goes wrong with a file is its result, so one bad file does not stop the batch
+        return {'error': f"{type(e).__name__}: {e}", 'elapsed': time.perf_counter() - start}
+
+    result = {
+        'cryptoscheme': Cryptoscheme.to_string(cryptoscheme),
+        'lang': args.lang,
+        'key': candidates[0][0].to_string(),
+        'score': candidates[0][1],
+        'elapsed': time.perf_counter() - start,
+    }
+    if args.top_k:
+        result['candidates'] = [{'key': key.to_string(), 'score': score} for key, score in candidates]
+    if identification is not None:
+        result['identification_confidence'] = identification.confidence
+
+    return result
+
+
+def print_batch_result(filepath: str, digest: str, result: dict, duplicate_of: str = None):
+    line = {'file': filepath, 'sha256': digest, **result}
+    if duplicate_of is not None:
+        line['elapsed'] = 0.0
+        line['duplicate_of'] = duplicate_of
+
+    print(json.dumps(line, ensure_ascii=False), flush=True)
+
+
+def batch_options(args) -> dict:
+    """
+    Get the options of --batch which change the results, which a resumed job must share.
+    """
+    return {
+        'cryptoscheme': args.cryptoscheme,
+        'lang': args.lang,
+        'encoding': args.encoding,
+        'fold_accents': args.fold_accents,
+        'key_length': args.key_length,
+        'max_key_length': args.max_key_length,
+        'ngram_model': os.path.abspath(args.ngram_model) if args.ngram_model else None,
+        'restarts': args.restarts,
+        'top_k': args.top_k,
+        'sample': args.sample,
+        'sample_growth': args.sample_growth,
+        'sample_margin': args.sample_margin,
+    }
+
+
+def run_batch(args):
+    """
+    Crack the files of --batch in a pool of worker processes, printing the result of every file as
+    soon as it is cracked.
+
+    Files are hashed as they are listed, and only the first file with given contents is cracked: the
+    others get its result, right away if it is known, or as soon as it is. At most --max-in-flight
+    files are submitted to the pool at once, so memory does not grow with the number of files, but
+    for the results kept per distinct contents.
+
+    With --checkpoint, every file and its result are recorded in a `JobStore`. Files already finished
+    in a previous run are skipped, the ones which failed or were being cracked when it stopped are
+    cracked first, and results are looked up in the store rather than kept in memory.
+    """
+    # Only batches pay for loading the multiprocessing machinery
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from concurrent.futures.process import BrokenProcessPool
+
+    try:
+        sampling_policy(args)
+    except ValueError as e:
+        print(f"Invalid sampling policy: {e}")
+        return
+
+    if args.ngram_model:
+        # Fail once here, rather than in every worker
+        try:
+            NgramModel.load(args.ngram_model, Language.from_string(args.lang))
+        except (IOError, ValueError) as e:
+            print(f"Error loading {args.ngram_model}: {e}")
+            return
+
+    store = None
+    requeued = set()
+    filepaths = batch_files(args.filepath)
+    if args.checkpoint:
+        try:
+            store = checkpoints.JobStore(args.checkpoint, batch_options(args))
+            requeued = set(store.requeue())
+            filepaths = itertools.chain(requeued, filepaths)
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Error opening {args.checkpoint}: {e}")
+            return
+
+    max_in_flight = args.max_in_flight or BATCH_IN_FLIGHT_PER_WORKER * args.workers
+
+    # Result of the first file with given contents, by digest (None while it is being cracked), and
+    # the files with the same contents waiting for it. With a store, only the files being cracked
+    # are kept here
+    results = dict()
+    waiting = dict()
+    pending = dict()
+    totals = {'files': 0, 'skipped': 0, 'duplicates': 0, 'failures': 0}
+
+    def report(filepath: str, digest: str | None, result: dict, duplicate_of: str = None):
+        totals['failures'] += 'error' in result
+        print_batch_result(filepath, digest, result, duplicate_of)
+        if store is not None:
+            store.finish(filepath, digest, result, duplicate_of)
+
+    def complete(futures):
+        for future in futures:
+            filepath, digest = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker cracking the file died (e.g. killed for running out of memory)
+                result = {'error': f"{type(e).__name__}: {e}"}
+            report(filepath, digest, result)
+            if store is None:
+                results[digest] = {'file': filepath, **result}
+            else:
+                del results[digest]
+
+            for duplicate in waiting.pop(digest, []):
+                report(duplicate, digest, result, filepath)
+
+    def start_pool():
+        return ProcessPoolExecutor(max_workers=args.workers, initializer=_init_batch_worker, initargs=(args,))
+
+    start = time.perf_counter()
+    executor = start_pool()
+    try:
+        for filepath in filepaths:
+            if store is not None and store.status(filepath) in (checkpoints.DONE,
+                                                                checkpoints.FAILED,
+                                                                checkpoints.RUNNING):
+                # Requeued files are listed again with the inputs, once this run has taken them
+                if filepath in requeued:
+                    requeued.discard(filepath)
+                else:
+                    totals['skipped'] += 1
+                continue
+
+            totals['files'] += 1
+            try:
+                with instrumentation.span('hash'):
+                    digest = file_digest(filepath)
+            except OSError as e:
+                report(filepath, None, {'error': f"{type(e).__name__}: {e}"})
+                continue
+
+            if digest in results and results[digest] is None:
+                totals['duplicates'] += 1
+                waiting.setdefault(digest, []).append(filepath)
+                if store is not None:
+                    # Cracked again on resume if the job stops before the file with the same contents is done
+                    store.start(filepath, digest)
+                continue
+
+            original = store.find(digest) if store is not None else results.get(digest)
+            if original is not None:
+                totals['duplicates'] += 1
+                result = {key: value for key, value in original.items() if key != 'file'}
+                report(filepath, digest, result, original['file'])
+                continue
+
+            results[digest] = None
+            try:
+                future = executor.submit(crack_batch_file, filepath)
+            except BrokenProcessPool:
+                # A worker died, failing the files in flight: the others go to a new pool
+                executor.shutdown(wait=False)
+                executor = start_pool()
+                future = executor.submit(crack_batch_file, filepath)
+            pending[future] = (filepath, digest)
+            if store is not None:
+                store.start(filepath, digest)
+            if len(pending) >= max_in_flight:
+                complete(wait(pending, return_when=FIRST_COMPLETED).done)
+
+        while pending:
+            complete(wait(pending, return_when=FIRST_COMPLETED).done)
+    finally:
+        executor.shutdown()
+        if store is not None:
+            store.close()
+
+    instrumentation.count('files', totals['files'])
+    instrumentation.count('duplicates', totals['duplicates'])
+    skipped = f", {totals['skipped']} already cracked" if store is not None else ''
+    print(f"Cracked {totals['files']} files ({totals['duplicates']} duplicates, {totals['failures']} failures"
+          f"{skipped}) in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+
+
+def run(args):
+    if args.batch:
+        run_batch(args)
         return
 
     language = Language.from_string(args.lang)
     cryptoscheme = Cryptoscheme.from_string(args.cryptoscheme)
 
-    # Clean the ciphertext
-    clean_ciphertext = ''.join([c.upper() for c in ciphertext if alphabets.is_in_alphabet(language, c)])
+    try:
+        with instrumentation.span('read'):
+            clean_ciphertext = read_clean_ciphertext(args.filepath, language, args.encoding, args.fold_accents)
+    except IOError:
+        print(f"Error opening {args.filepath}")
+        return
+    instrumentation.count('letters', len(clean_ciphertext))
+
+    ngram_model = None
+    if args.ngram_model:
+        try:
+            with instrumentation.span('load_model'):
+                ngram_model = NgramModel.load(args.ngram_model, language)
+        except (IOError, ValueError) as e:
+            print(f"Error loading {args.ngram_model}: {e}")
+            return
+
+    identification = None
+    if args.cryptoscheme == 'auto':
+        with instrumentation.span('identify'):
+            identification = classiccrypto.cryptoschemes.cracking.identify.identify(clean_ciphertext,
+                                                                                     language,
+                                                                                     args.max_key_length)
+        if identification.scheme is None:
+            print(f"Could not identify the cryptoscheme: {identification}")
+            return
 
-    cipher_key = crack(cryptoscheme,
-                       clean_ciphertext,
-                       language,
-                       args.no_gui,
-                       args.fast)
+        cryptoscheme = identification.scheme
+        args.cryptoscheme = Cryptoscheme.to_string(cryptoscheme)
+        if not args.json:
+            print(f'Identified cryptoscheme: {identification}')
+
+    try:
+        sampling = sampling_policy(args)
+    except ValueError as e:
+        print(f"Invalid sampling policy: {e}")
+        return
+
+    if args.top_k or args.json:
+        with instrumentation.span('crack'):
+            candidates = crack_top_k(cryptoscheme,
+                                     clean_ciphertext,
+                                     language,
+                                     args.no_gui,
+                                     args.top_k or 1,
+                                     args.key_length,
+                                     args.auto,
+                                     args.max_key_length,
+                                     ngram_model,
+                                     args.restarts,
+                                     sampling)
+        cipher_key = candidates[0][0]
+        candidates = [(key.to_string(), score) for key, score in candidates]
+    else:
+        with instrumentation.span('crack'):
+            cipher_key = crack(cryptoscheme,
+                               clean_ciphertext,
+                               language,
+                               args.no_gui,
+                               args.fast,
+                               args.key_length,
+                               args.auto,
+                               args.max_key_length,
+                               ngram_model,
+                               args.restarts,
+                               sampling)
+        candidates = None
+
+    if args.json:
+        plaintext = None
+        if args.decrypt:
+            with instrumentation.span('decrypt'):
+                plaintext = decrypted_text(args.filepath, cipher_key, args.encoding)
+        print_json(args, candidates, plaintext, identification.confidence if identification else None)
+        return
 
     print(f'Encryption key: {cipher_key.to_string()}')
 
+    if candidates:
+        print_candidates(candidates)
+
     if args.decrypt:
         print('\nDecrypted message:')
-        print(decrypt(cryptoscheme, ciphertext, cipher_key))
+        with instrumentation.span('decrypt'):
+            write_decrypted(args.filepath, cipher_key, args.encoding)
+        print()
+
+
+def print_stats(args):
+    if args.stats:
+        print(f'\n{instrumentation.report()}', file=sys.stderr)
+
+    if args.stats_json == '-':
+        print(json.dumps(instrumentation.snapshot()), file=sys.stderr)
+    elif args.stats_json:
+        with open(args.stats_json, 'w') as dst:
+            json.dump(instrumentation.snapshot(), dst, indent=2)
+
+
+def profile(args):
+    # Only profiled runs pay for loading the profiler
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(run, args)
+    finally:
+        profiler.dump_stats(args.profile)
+        print(f'\nProfile saved to {args.profile}', file=sys.stderr)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(PROFILE_LINES)
+
+
+def main():
+    args = parse_arguments()
+    if args.stats or args.stats_json:
+        instrumentation.enable()
+
+    if args.connect and crack_in_daemon(args):
+        return
+
+    if args.profile:
+        profile(args)
+    else:
+        run(args)
+
+    print_stats(args)
 
 
 if __name__ == '__main__':
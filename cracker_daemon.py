@@ -0,0 +1,380 @@
+import argparse
+import asyncio
+import functools
+import json
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import cracker
+from classiccrypto.cryptoschemes import compiled
+from classiccrypto.cryptoschemes.cracking import affine as affine_cracking
+from classiccrypto.cryptoschemes.cracking import identify, sampling, vigenere
+from classiccrypto.cryptoschemes.keys.affine import AffineKey
+from classiccrypto.cryptoschemes.keys.caesar import CaesarKey
+from classiccrypto.cryptoschemes.schemes import key_from_string
+from classiccrypto.utils import Cryptoscheme, Language, Mode
+from classiccrypto.utils import alphabets, cleaning, frequency
+from classiccrypto.utils.ngrams import NgramModel
+
+# Maximum size of a single request line, which may carry a whole message
+MAX_REQUEST_SIZE = 1 << 28
+
+
+def parse_arguments() -> object:
+    # Create the parser
+    parser = argparse.ArgumentParser(description='Classic Encryption Cracker daemon. '
+                                                 'Serves encrypt, decrypt and crack requests on a Unix socket, '
+                                                 'keeping language profiles and cipher tables warm.')
+
+    parser.add_argument('--socket',
+                        metavar='socket',
+                        type=str,
+                        default=cracker.DEFAULT_SOCKET_PATH,
+                        help=f'Path of the Unix socket to listen on (defaults to {cracker.DEFAULT_SOCKET_PATH})')
+
+    parser.add_argument('--workers',
+                        metavar='workers',
+                        type=int,
+                        default=os.cpu_count(),
+                        help='Number of worker processes (defaults to the number of CPUs)')
+
+    return parser.parse_args()
+
+
+def warm_up():
+    """
+    Build, in the current worker process, the alphabets, language profiles and cipher tables which
+    are shared by all requests.
+    """
+    for lang in Language:
+        alphabet = alphabets.get_alphabet(lang)
+        frequency.language_histogram(lang)
+
+        for shift in range(alphabet.size):
+            compiled.compile(CaesarKey(shift, lang))
+
+        a_values, b_values = affine_cracking.valid_keys(alphabet.size)
+        for a, b in zip(a_values.tolist(), b_values.tolist()):
+            compiled.compile(AffineKey(a, b, lang))
+
+
+def read_text(request: dict) -> str:
+    if 'text' in request:
+        return request['text']
+
+    with open(request['path'], 'r', encoding=request.get('encoding') or 'utf-8') as src:
+        return src.read()
+
+
+def request_number(request: dict,
+                   name: str,
+                   default: int | float = None,
+                   minimum: int | float = None,
+                   integer: bool = True) -> int | float | None:
+    """
+    Get an optional numeric field of a request.
+
+    :param dict request: The decoded request.
+    :param str name: The name of the field.
+    :param int | float, optional default: The value of the field if it is missing or null.
+    :param int | float, optional minimum: The smallest value accepted, if any.
+    :param bool, optional integer: If True, the field must be an integer. Defaults to True.
+
+    :return: The value of the field, or `default` if it is missing.
+    :rtype: int | float | None
+
+    :raises ValueError: If the field is not a number, or not an integer if `integer` is set, or if it
+                        is below `minimum`.
+    """
+    value = request.get(name)
+    if value is None:
+        return default
+
+    if isinstance(value, bool) or not isinstance(value, int if integer else (int, float)):
+        raise ValueError(f"{name} must be {'an integer' if integer else 'a number'}, not {value!r}")
+    if minimum is not None and value < minimum:
+        raise ValueError(f"{name} must be at least {minimum}, not {value}")
+    return value
+
+
+@functools.lru_cache(maxsize=None)
+def load_ngram_model(path: str, lang: Language) -> NgramModel | None:
+    """
+    Load an n-gram model, keeping it in memory for the next requests.
+
+    :param str path: The path to the model, or None.
+    :param Language lang: The language of the model.
+
+    :return: The model, or None if no path is given.
+    :rtype: NgramModel | None
+    """
+    if not path:
+        return None
+
+    return NgramModel.load(path, lang)
+
+
+def handle_request(request: dict) -> dict:
+    """
+    Serve a single request, in a worker process.
+
+    Requests are JSON objects with the following fields:
+    - op: "encrypt", "decrypt" or "crack".
+    - scheme: "caesar", "affine" or "vigenere", or "auto" to identify it (crack only). The response
+      then holds the "scheme" identified and the "confidence" of the identification.
+    - lang: "ESP" or "ENG".
+    - text, or path: the message itself, or the path to a file holding it.
+    - encoding: encoding of the file given by `path` (optional, UTF-8 by default).
+    - fold_accents: whether accented letters count as their base letter, as the --fold-accents
+      option of cracker.py (crack only, optional).
+    - key: the key, as accepted by `key_from_string` (encrypt and decrypt only).
+    - fast, key_length, max_key_length, ngram_model, restarts, decrypt: as the cracker.py options
+      (crack only, optional). The key length of Vigenere messages is always estimated automatically
+      if not given.
+    - sample, sample_growth, sample_margin: the sampling policy, as the --sample, --sample-growth and
+      --sample-margin options of cracker.py (crack only, optional).
+    - top_k: if given, the response also holds the "candidates" list, with the "key" and "score" of
+      the top_k most likely keys, which are always ranked by their full score, so fast cannot be given
+      (crack only, optional).
+
+    :param dict request: The decoded request.
+
+    :return: The response, with "ok" set to True and the results ("key" and/or "text"/"plaintext"),
+             or with "ok" set to False and an "error" message.
+    :rtype: dict
+    """
+    try:
+        lang = Language.from_string(request['lang'])
+        op = request['op']
+        scheme = Cryptoscheme.from_string(request['scheme'])
+        if lang is None or (scheme is None and (op, request['scheme']) != ('crack', 'auto')):
+            raise ValueError("Unknown language or cryptoscheme")
+
+        if op in ('encrypt', 'decrypt'):
+            cipher = compiled.compile(key_from_string(scheme, request['key'], lang))
+            mode = Mode.ENCRYPTION if op == 'encrypt' else Mode.DECRYPTION
+            return {'ok': True, 'text': cipher.translate(read_text(request), mode)}
+
+        if op != 'crack':
+            raise ValueError(f"Unknown operation: {op}")
+
+        if 'text' in request:
+            text = request['text']
+            clean_ciphertext = cleaning.Cleaner(lang, bool(request.get('fold_accents'))).clean(text)
+        else:
+            text = None
+            clean_ciphertext = cracker.read_clean_ciphertext(request['path'],
+                                                             lang,
+                                                             request.get('encoding') or 'utf-8',
+                                                             bool(request.get('fold_accents')))
+
+        max_key_length = request_number(request, 'max_key_length', vigenere.DEFAULT_MAX_KEY_LENGTH, 1)
+
+        identification = None
+        if scheme is None:
+            identification = identify.identify(clean_ciphertext, lang, max_key_length)
+            if identification.scheme is None:
+                raise ValueError(f"Could not identify the cryptoscheme: {identification}")
+            scheme = identification.scheme
+
+        # There is nobody to ask for the key length, so it is always estimated if not given. Requests
+        # already run in the pool of the daemon, so the key is refined in their own worker (workers=1)
+        options = (request_number(request, 'key_length', minimum=1),
+                   True,
+                   max_key_length,
+                   load_ngram_model(request.get('ngram_model'), lang),
+                   request_number(request, 'restarts', vigenere.DEFAULT_RESTARTS, 1))
+
+        policy = None
+        sample = request_number(request, 'sample', minimum=1)
+        if sample is not None:
+            policy = sampling.SamplingPolicy(sample,
+                                             request_number(request, 'sample_growth', sampling.DEFAULT_GROWTH, 2),
+                                             request_number(request,
+                                                            'sample_margin',
+                                                            sampling.DEFAULT_MIN_MARGIN,
+                                                            0,
+                                                            integer=False))
+
+        top_k = request_number(request, 'top_k', minimum=1)
+        if top_k is not None:
+            if request.get('fast'):
+                raise ValueError("fast cannot be used with top_k")
+            candidates = cracker.crack_top_k(scheme, clean_ciphertext, lang, True, top_k, *options, policy, workers=1)
+            key = candidates[0][0]
+            response = {'ok': True,
+                        'key': key.to_string(),
+                        'candidates': [{'key': candidate.to_string(), 'score': score}
+                                       for candidate, score in candidates]}
+        else:
+            key = cracker.crack(scheme,
+                                clean_ciphertext,
+                                lang,
+                                True,
+                                bool(request.get('fast')),
+                                *options,
+                                policy,
+                                workers=1)
+            response = {'ok': True, 'key': key.to_string()}
+
+        if identification is not None:
+            response['scheme'] = Cryptoscheme.to_string(scheme)
+            response['confidence'] = identification.confidence
+
+        if request.get('decrypt'):
+            response['plaintext'] = compiled.compile(key).decrypt(text if text is not None else read_text(request))
+        return response
+    except Exception as e:
+        # Whatever goes wrong with a request, its client gets a response
+        return {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+
+
+class CrackerDaemon:
+    """
+    Class serving JSON-lines requests received on a Unix socket with a pool of warm worker processes.
+
+    Every line received is a request (see `handle_request`), and every line sent back is the response
+    to one of them. Requests on the same connection are served concurrently, so responses may come in
+    a different order: the "id" field of a request, if present, is copied into its response.
+
+    :ivar str socket_path: Path of the Unix socket to listen on.
+    :ivar int workers: Number of worker processes.
+    :ivar ProcessPoolExecutor executor: The pool of worker processes, replaced whenever one of them dies.
+    """
+
+    def __init__(self, socket_path: str, workers: int):
+        """
+        Initialize a new CrackerDaemon instance.
+
+        :param str socket_path: Path of the Unix socket to listen on.
+        :param int workers: Number of worker processes.
+        """
+        self.socket_path = socket_path
+        self.workers = workers
+        self.executor = self.start_pool()
+
+    def start_pool(self) -> ProcessPoolExecutor:
+        """
+        Start a new pool of warm worker processes.
+
+        The workers are forked from a server process started along with the first pool, before any
+        connection is accepted, so that they never inherit the sockets of the connections open at the time,
+        which would then never be closed for the clients.
+
+        :return: The new pool.
+        :rtype: ProcessPoolExecutor
+        """
+        return ProcessPoolExecutor(max_workers=self.workers,
+                                   mp_context=multiprocessing.get_context('forkserver'),
+                                   initializer=warm_up)
+
+    async def serve(self):
+        """
+        Listen on the socket until the process is interrupted or terminated.
+        """
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        # The workers are started, and warmed up, before accepting connections
+        await asyncio.get_running_loop().run_in_executor(self.executor, int)
+
+        server = await asyncio.start_unix_server(self.handle_connection, self.socket_path, limit=MAX_REQUEST_SIZE)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signal_number, stop.set)
+
+        print(f"Listening on {self.socket_path}")
+        async with server:
+            await stop.wait()
+
+        os.unlink(self.socket_path)
+        self.executor.shutdown(cancel_futures=True)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serve all the requests received on a connection, until the client closes it.
+
+        :param asyncio.StreamReader reader: The incoming side of the connection.
+        :param asyncio.StreamWriter writer: The outgoing side of the connection.
+        """
+        write_lock = asyncio.Lock()
+        pending = set()
+
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self.handle_line(line, writer, write_lock))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+
+            # A request which failed must not keep the responses of the others from being sent
+            await asyncio.gather(*pending, return_exceptions=True)
+        except (ConnectionError, ValueError):
+            # Client gone, or request line above MAX_REQUEST_SIZE
+            pass
+        finally:
+            writer.close()
+
+    async def run_request(self, request: dict) -> dict:
+        """
+        Serve a request in the worker pool, replacing the pool if one of its workers dies.
+
+        A request failed by the death of a worker (e.g. killed) is retried once in the new pool, as it may
+        well not be the cause of it. A request which also breaks the new pool is failed.
+
+        :param dict request: The decoded request.
+        :return: The response to the request.
+        :rtype: dict
+        """
+        loop = asyncio.get_running_loop()
+        for _ in range(2):
+            executor = self.executor
+            try:
+                return await loop.run_in_executor(executor, handle_request, request)
+            except BrokenProcessPool as e:
+                # Only the first of the requests failed along with the pool replaces it
+                if self.executor is executor:
+                    executor.shutdown(wait=False)
+                    self.executor = self.start_pool()
+                error = e
+            except Exception as e:
+                return {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+
+        return {'ok': False, 'error': f"{type(error).__name__}: {error}"}
+
+    async def handle_line(self, line: bytes, writer: asyncio.StreamWriter, write_lock: asyncio.Lock):
+        """
+        Serve one request line in the worker pool and send its response back.
+
+        :param bytes line: The JSON-encoded request.
+        :param asyncio.StreamWriter writer: The outgoing side of the connection.
+        :param asyncio.Lock write_lock: Lock serializing the responses written to the connection.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response = {'ok': False, 'error': f"Invalid request: {e}"}
+        else:
+            if isinstance(request, dict):
+                response = await self.run_request(request)
+                if 'id' in request:
+                    response['id'] = request['id']
+            else:
+                response = {'ok': False, 'error': "Invalid request: not a JSON object"}
+
+        async with write_lock:
+            writer.write(json.dumps(response).encode('utf-8') + b'\n')
+            await writer.drain()
+
+
+def main():
+    args = parse_arguments()
+    asyncio.run(CrackerDaemon(args.socket, args.workers).serve())
+
+
+if __name__ == '__main__':
+    main()
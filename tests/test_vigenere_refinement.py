@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from classiccrypto.cryptoschemes.cracking import vigenere
+from classiccrypto.utils import Language
+from classiccrypto.utils.ngrams import NgramModel
+
+
+@pytest.fixture(scope='module')
+def model() -> NgramModel:
+    # Texts shorter than n only used to fail from n = 5 on. The model is never trained, only its shape matters
+    return NgramModel(np.zeros(27 ** 5), Language.ESP)
+
+
+@pytest.mark.parametrize('length', [1, 2, 3, 4])
+def test_codes_of_text_shorter_than_n(model, length):
+    indices = np.arange(length)
+    assert model.codes(indices).shape == (0,)
+    assert model.score(indices) == 0.0
+
+
+@pytest.mark.parametrize('ciphertext', ['A', 'AB', 'ABC', 'ABCD'])
+def test_refine_ciphertext_shorter_than_n(model, ciphertext):
+    key = vigenere.crack(ciphertext, Language.ESP, True, key_length=1, ngram_model=model)
+    assert len(key.key) == 1
+
+    candidates = vigenere.crack_top_k(ciphertext, Language.ESP, 3, True, key_length=1, ngram_model=model)
+    assert len(candidates) == 3